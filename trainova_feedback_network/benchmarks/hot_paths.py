@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmarks for the prediction and utility hot paths.
+
+Each benchmark is timed across a range of history sizes and the results are
+written to a JSON baseline. A later run can be compared against that baseline
+to flag slowdowns larger than a threshold.
+
+Run from the project directory:
+    python -m benchmarks.hot_paths --save benchmarks/baseline.json
+    python -m benchmarks.hot_paths --compare benchmarks/baseline.json --threshold 0.2
+"""
+
+import argparse
+import copy
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.cli.data_collection import DataCollector
+from src.features.feature_engineering import create_engineered_features, calculate_trend
+from src.features.trend_analysis import analyze_trend, calculate_weight_trend
+from src.models.feedback_prediction_model import FeedbackBasedPredictionModel
+from src.utils.feedback_utils import calculate_feedback_adjustment
+from src.utils.weight_calculation import calculate_one_rep_max
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+
+def make_history(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build a Squat history of the given size in the /predict payload format.
+
+    Args:
+        size: Number of workouts
+        seed: Seed for the mock data generator
+
+    Returns:
+        List of workout dictionaries with ISO date strings
+    """
+    df = DataCollector().generate_mock_data(num_samples=size, exercises=["Squat"], seed=seed)
+    df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict("records")
+
+
+def make_feedback_history(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build a feedback history of the given size spread over a few exercises.
+
+    Args:
+        size: Number of feedback entries
+        seed: Seed for the generated scores
+
+    Returns:
+        List of feedback dictionaries
+    """
+    rng = random.Random(seed)
+    exercises = ["Squat", "Bench Press", "Deadlift"]
+    return [{"exercise": rng.choice(exercises), "score": rng.uniform(-0.3, 0.3)} for _ in range(size)]
+
+
+def _bench_predict(size: int) -> Callable[[], Callable[[], Any]]:
+    history = make_history(size)
+
+    def setup():
+        # predict() parses dates in place, so every repeat gets a fresh payload
+        model = FeedbackBasedPredictionModel()
+        workouts = copy.deepcopy(history)
+        return lambda: model.predict("Squat", workouts)
+    return setup
+
+
+def _bench_provide_feedback(size: int) -> Callable[[], Callable[[], Any]]:
+    rng = random.Random(0)
+    history = make_history(10)
+    offsets = [(rng.uniform(-10, 10), rng.random() < 0.8, rng.randint(0, 4)) for _ in range(size)]
+
+    def setup():
+        # Feedback on predictions the model made (a pool of users, reused
+        # cyclically), so the buffered gradient steps run
+        model = FeedbackBasedPredictionModel()
+        users = [f"user_{i:03d}" for i in range(min(size, 256))]
+        predicted = [model.predict("Squat", [dict(w) for w in history], user=user)["weight"] for user in users]
+        calls = [(predicted[i % len(users)], predicted[i % len(users)] + offset, success, rir, users[i % len(users)])
+                 for i, (offset, success, rir) in enumerate(offsets)]
+
+        def run():
+            for predicted, actual, success, rir, user in calls:
+                model.provide_feedback("Squat", predicted, actual, success, reps=5, rir=rir, user=user)
+        return run
+    return setup
+
+
+def _bench_one_rep_max(size: int) -> Callable[[], Callable[[], Any]]:
+    rows = [(float(w["weight"]), int(w["reps"])) for w in make_history(size)]
+
+    def run():
+        for weight, reps in rows:
+            calculate_one_rep_max(weight, reps)
+    return lambda: run
+
+
+def _bench_intensity_reps(size: int) -> Callable[[], Callable[[], Any]]:
+    rows = [(float(w["weight"]), int(w["reps"])) for w in make_history(size)]
+
+    def setup():
+        model = FeedbackBasedPredictionModel()
+
+        def run():
+            for weight, reps in rows:
+                model._generate_intensity_based_reps(weight, reps, weight + 2.5)
+        return run
+    return setup
+
+
+def _bench_feedback_adjustment(size: int) -> Callable[[], Callable[[], Any]]:
+    feedback_history = make_feedback_history(size)
+    return lambda: (lambda: calculate_feedback_adjustment(feedback_history, "Squat"))
+
+
+def _bench_feature(function: Callable[[List[Dict[str, Any]]], Any]):
+    def factory(size: int) -> Callable[[], Callable[[], Any]]:
+        history = make_history(size)
+        return lambda: (lambda: function(history))
+    return factory
+
+
+BENCHMARKS = {
+    "predict": _bench_predict,
+    "provide_feedback": _bench_provide_feedback,
+    "calculate_one_rep_max": _bench_one_rep_max,
+    "generate_intensity_based_reps": _bench_intensity_reps,
+    "calculate_feedback_adjustment": _bench_feedback_adjustment,
+    "create_engineered_features": _bench_feature(create_engineered_features),
+    "calculate_trend": _bench_feature(calculate_trend),
+    "analyze_trend": _bench_feature(analyze_trend),
+    "calculate_weight_trend": _bench_feature(calculate_weight_trend),
+}
+
+
+def time_benchmark(setup: Callable[[], Callable[[], Any]],
+                   repeats: int = 5,
+                   min_time: float = 0.2,
+                   max_time: float = 10.0) -> Dict[str, Any]:
+    """
+    Time a benchmark, repeating until enough samples have been collected.
+
+    Args:
+        setup: Callable returning a fresh zero-argument function to time
+        repeats: Minimum number of timed runs
+        min_time: Keep repeating until this many seconds have been measured
+        max_time: Stop repeating once this many seconds have been measured
+
+    Returns:
+        Dictionary with min/median/mean seconds and the number of runs
+    """
+    timings = []
+    while True:
+        fn = setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+        total = sum(timings)
+        if total >= max_time:
+            break
+        if len(timings) >= repeats and total >= min_time:
+            break
+
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.fmean(timings),
+        "runs": len(timings)
+    }
+
+
+def run_benchmarks(names: List[str], sizes: List[int], repeats: int = 5,
+                   verbose: bool = True) -> Dict[str, Any]:
+    """
+    Run the selected benchmarks across all sizes.
+
+    Args:
+        names: Benchmark names to run
+        sizes: History sizes to run each benchmark at
+        repeats: Minimum number of timed runs per case
+        verbose: Print progress while running
+
+    Returns:
+        Results document with metadata and per-benchmark timings
+    """
+    results = {}
+    for name in names:
+        results[name] = {}
+        for size in sizes:
+            setup = BENCHMARKS[name](size)
+            timing = time_benchmark(setup, repeats=repeats)
+            results[name][str(size)] = timing
+            if verbose:
+                print(f"{name:32s} n={size:<8d} median={timing['median_s'] * 1000:10.3f} ms "
+                      f"({timing['runs']} runs)", file=sys.stderr)
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sizes": sizes
+        },
+        "results": results
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compare current results against a baseline.
+
+    Args:
+        baseline: Results document from a previous run
+        current: Results document from this run
+        threshold: Relative slowdown above which a case is flagged (0.2 = 20%)
+
+    Returns:
+        One entry per case present in both documents, with a 'regression' flag
+    """
+    comparisons = []
+    for name, sizes in current["results"].items():
+        for size, timing in sizes.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if base is None or base["median_s"] <= 0:
+                continue
+            ratio = timing["median_s"] / base["median_s"]
+            comparisons.append({
+                "benchmark": name,
+                "size": int(size),
+                "baseline_median_s": base["median_s"],
+                "current_median_s": timing["median_s"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold
+            })
+    return comparisons
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the command-line argument parser for the benchmark suite.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="trainova-bench",
+        description="Benchmark the Trainova prediction and utility hot paths"
+    )
+    parser.add_argument("--benchmarks", type=str,
+                        help=f"Comma-separated benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--sizes", type=str, default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated history sizes (default: 10,100,1000,10000,100000)")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Minimum timed runs per case (default: 5)")
+    parser.add_argument("--save", type=str, help="Write the results to this baseline file")
+    parser.add_argument("--compare", type=str, help="Compare the results against this baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (default: 0.2)")
+    return parser
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    """
+    Entry point for the benchmark suite.
+
+    Args:
+        args: Command-line arguments (uses sys.argv if None)
+
+    Returns:
+        Exit code (0 for success, 1 if a regression was found)
+    """
+    parsed_args = create_parser().parse_args(args)
+
+    names = parsed_args.benchmarks.split(",") if parsed_args.benchmarks else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    sizes = [int(size) for size in parsed_args.sizes.split(",")]
+
+    current = run_benchmarks(names, sizes, repeats=parsed_args.repeats)
+
+    if parsed_args.save:
+        with open(parsed_args.save, "w") as file:
+            json.dump(current, file, indent=2)
+            file.write("\n")
+        print(f"Saved results to {parsed_args.save}", file=sys.stderr)
+
+    if not parsed_args.compare:
+        if not parsed_args.save:
+            print(json.dumps(current, indent=2))
+        return 0
+
+    with open(parsed_args.compare) as file:
+        baseline = json.load(file)
+
+    comparisons = compare_results(baseline, current, parsed_args.threshold)
+    regressions = [c for c in comparisons if c["regression"]]
+    print(json.dumps({"threshold": parsed_args.threshold,
+                      "comparisons": comparisons,
+                      "regressions": len(regressions)}, indent=2))
+
+    for regression in regressions:
+        print(f"REGRESSION {regression['benchmark']} n={regression['size']}: "
+              f"{regression['ratio']:.2f}x baseline", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
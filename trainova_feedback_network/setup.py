@@ -14,6 +14,10 @@ setup(
         'pandas>=1.1.0',
         'scikit-learn>=0.24.0',
     ],
+    extras_require={
+        'parquet': ['pyarrow>=7.0.0'],
+        'zstd': ['zstandard>=0.15'],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
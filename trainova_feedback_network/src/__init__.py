@@ -1,4 +1,10 @@
-from .prediction.predictor import WorkoutPredictor
+__all__ = ['WorkoutPredictor']
 
-# Export the main class for easy importing
-__all__ = ['WorkoutPredictor']
\ No newline at end of file
+
+def __getattr__(name):
+    # Import the predictor (and pandas) on first use, so light entry points
+    # such as the CLI daemon client start quickly
+    if name == 'WorkoutPredictor':
+        from .prediction.predictor import WorkoutPredictor
+        return WorkoutPredictor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
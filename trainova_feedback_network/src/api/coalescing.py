@@ -0,0 +1,126 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def request_fingerprint(payload: Any) -> str:
+    """
+    Build a stable fingerprint for a request payload.
+
+    Key order and whitespace do not matter, so two clients sending the same
+    workout history produce the same fingerprint.
+
+    Args:
+        payload: JSON-compatible request payload
+
+    Returns:
+        Hex digest identifying the payload
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """A single in-flight computation that followers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical computations into one.
+
+    The first caller for a key (the leader) runs the computation; callers that
+    arrive while it is running wait for it and share its result. Successful
+    results are kept for a short TTL so retries that arrive just after the
+    leader finished are answered without recomputing.
+
+    `clear()` starts a new generation: results cached before it are dropped,
+    callers after it do not join computations started before it, and those
+    computations do not cache their (possibly stale) results.
+    """
+
+    def __init__(self, ttl: float = 2.0, max_entries: int = 1024):
+        """
+        Initialize the coalescer.
+
+        Args:
+            ttl: Seconds to keep a finished result (0 disables result caching)
+            max_entries: Maximum number of finished results to keep
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Call] = {}
+        self._results: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generation = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run `fn` once for all concurrent callers using the same key.
+
+        Args:
+            key: Fingerprint identifying the computation
+            fn: Zero-argument callable producing the result
+
+        Returns:
+            The (possibly shared) result of `fn`
+        """
+        with self._lock:
+            cached = self._get_cached(key)
+            if cached is not None:
+                return cached[1]
+
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._inflight[key] = call
+                generation = self._generation
+
+        if not is_leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    if self._inflight.get(key) is call:
+                        del self._inflight[key]
+                    if call.error is None and self.ttl > 0 and generation == self._generation:
+                        self._store(key, call.result)
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def clear(self) -> None:
+        """Drop all finished results and detach in-flight computations from new callers."""
+        with self._lock:
+            self._generation += 1
+            self._results.clear()
+            self._inflight.clear()
+
+    def _get_cached(self, key: str) -> Optional[tuple]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._results[key]
+            return None
+        return entry
+
+    def _store(self, key: str, result: Any) -> None:
+        self._results[key] = (time.monotonic() + self.ttl, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
@@ -0,0 +1,409 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Load generator for the Trainova Feedback Network HTTP API.
+
+Runs a configurable mix of /predict and /feedback calls at a target rate
+against either a local waitress instance of `api/main.py` (the default) or an
+already running server, and reports throughput, latency percentiles and error
+rate as JSON.
+
+Example:
+    python -m src.api.loadgen --rate 200 --duration 30 --history-lengths 10,100,1000
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from ..cli.data_collection import DataCollector
+
+DEFAULT_EXERCISES = ["Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row"]
+
+
+def build_payloads(history_lengths: List[int],
+                   exercises: List[str],
+                   payloads_per_length: int = 10,
+                   seed: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Build realistic /predict and /feedback payloads from mock workout data.
+
+    Each history gets its own user. The feedback payloads' predicted weights
+    are placeholders until `prime_feedback` replaces them with the server's
+    predictions, which the server only trains on for predictions it made.
+
+    Args:
+        history_lengths: Number of previous workouts to send per /predict request
+        exercises: Exercises mixed into each generated history
+        payloads_per_length: Distinct payloads to generate per history length
+        seed: Seed for reproducible payloads
+
+    Returns:
+        Dictionary with 'predict' and 'feedback' payload lists
+    """
+    rng = random.Random(seed)
+    data_collector = DataCollector()
+    predict_payloads = []
+    feedback_payloads = []
+
+    for history_length in history_lengths:
+        for _ in range(payloads_per_length):
+            df = data_collector.generate_mock_data(num_samples=max(history_length, len(exercises)),
+                                                   exercises=exercises, seed=rng.getrandbits(32))
+            df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+            df = df.astype(object).where(df.notna(), None)
+            workouts = df.to_dict("records")
+
+            exercise = rng.choice(exercises)
+            user = f"load_{len(predict_payloads):05d}"
+            predict_payloads.append({
+                "exercise": exercise,
+                "previous_workouts": workouts,
+                "user": user
+            })
+
+            last = [w for w in workouts if w["exercise"] == exercise][-1]
+            feedback_payloads.append({
+                "exercise": exercise,
+                "user": user,
+                "predicted_weight": last["weight"] + 2.5,
+                "actual_weight": last["weight"] + rng.choice([-2.5, 0.0, 2.5]),
+                "success": rng.random() < 0.85,
+                "reps": last["reps"],
+                "rir": last["rir"]
+            })
+
+    return {"predict": predict_payloads, "feedback": feedback_payloads}
+
+
+def prime_feedback(base_url: str, payloads: Dict[str, List[Dict[str, Any]]], timeout: float = 30.0) -> int:
+    """
+    Send every /predict payload once and use the returned weights in the matching /feedback payloads.
+
+    Args:
+        base_url: Base URL of the server
+        payloads: Output of `build_payloads`, updated in place
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        Number of feedback payloads that now refer to a server prediction
+    """
+    parsed = urlparse(base_url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=timeout)
+    primed = 0
+    try:
+        for predict, feedback in zip(payloads["predict"], payloads["feedback"]):
+            connection.request("POST", "/predict", body=json.dumps(predict).encode("utf-8"),
+                               headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            prediction = json.loads(response.read())
+            if response.status == 200 and prediction.get("weight"):
+                feedback["predicted_weight"] = prediction["weight"]
+                primed += 1
+    finally:
+        connection.close()
+    return primed
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parse an endpoint mix such as 'predict=0.8,feedback=0.2'.
+
+    Args:
+        mix: Comma-separated endpoint=weight pairs
+
+    Returns:
+        Dictionary of normalized endpoint weights
+    """
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("predict", "feedback"):
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        weights[name] = float(weight) if weight else 1.0
+
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Endpoint mix weights must sum to a positive value")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def start_local_server(threads: int = 4, coalesce_ttl: Optional[float] = None) -> Tuple[Any, str]:
+    """
+    Start `api/main.py` under waitress on a free local port in a background thread.
+
+    Args:
+        threads: Number of waitress worker threads
+        coalesce_ttl: Override for the /predict coalescing TTL (seconds)
+
+    Returns:
+        Tuple of (server, base_url)
+    """
+    from waitress import create_server
+    from . import main as api
+
+    if coalesce_ttl is not None:
+        api.prediction_coalescer.ttl = coalesce_ttl
+
+    # Queue depth warnings are expected under load and would drown the report
+    logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+
+    server = create_server(api.app, host="127.0.0.1", port=0, threads=threads)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.effective_port}"
+
+
+class LoadGenerator:
+    """
+    Open-loop load generator.
+
+    Requests are scheduled at fixed intervals derived from the target rate, so
+    a slow server shows up as higher latency and lower throughput instead of
+    silently lowering the offered load.
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 payloads: Dict[str, List[Dict[str, Any]]],
+                 mix: Dict[str, float],
+                 rate: float,
+                 duration: float,
+                 concurrency: int = 8,
+                 timeout: float = 30.0,
+                 seed: Optional[int] = None):
+        self.base_url = base_url
+        self.payloads = payloads
+        self.mix = mix
+        self.rate = rate
+        self.duration = duration
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.random = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self._total_requests = int(rate * duration)
+        self._results = []
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the load test and return the report.
+
+        Returns:
+            Dictionary with throughput, latency percentiles and error rate
+        """
+        # Pre-draw the endpoint and payload for every request so the workers
+        # do nothing but send requests
+        endpoints = list(self.mix.keys())
+        probabilities = [self.mix[name] for name in endpoints]
+        self._plan = []
+        for _ in range(self._total_requests):
+            endpoint = self.random.choices(endpoints, probabilities)[0]
+            body = json.dumps(self.random.choice(self.payloads[endpoint])).encode("utf-8")
+            self._plan.append((endpoint, body))
+
+        self._start = time.perf_counter() + 0.1
+        workers = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - self._start
+
+        return self._report(elapsed)
+
+    def _claim(self) -> Optional[int]:
+        with self._lock:
+            if self._next_index >= self._total_requests:
+                return None
+            index = self._next_index
+            self._next_index += 1
+            return index
+
+    def _worker(self) -> None:
+        parsed = urlparse(self.base_url)
+        connection = None
+
+        while True:
+            index = self._claim()
+            if index is None:
+                break
+
+            # Wait for this request's scheduled send time
+            delay = self._start + index / self.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            endpoint, body = self._plan[index]
+            if connection is None:
+                connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=self.timeout)
+
+            sent = time.perf_counter()
+            try:
+                connection.request("POST", f"/{endpoint}", body=body,
+                                   headers={"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except Exception:
+                status = None
+                connection.close()
+                connection = None
+            latency = time.perf_counter() - sent
+
+            with self._lock:
+                self._results.append((endpoint, status, latency))
+
+        if connection is not None:
+            connection.close()
+
+    def _report(self, elapsed: float) -> Dict[str, Any]:
+        report = {
+            "target_rate": self.rate,
+            "duration_s": round(elapsed, 3),
+            "concurrency": self.concurrency,
+            "mix": self.mix,
+        }
+        report.update(_summarize(self._results, elapsed))
+        report["by_endpoint"] = {
+            endpoint: _summarize([r for r in self._results if r[0] == endpoint], elapsed)
+            for endpoint in self.mix
+        }
+        return report
+
+
+def _summarize(results: List[Tuple[str, Optional[int], float]], elapsed: float) -> Dict[str, Any]:
+    if not results:
+        return {"requests": 0, "errors": 0, "error_rate": 0.0, "throughput_rps": 0.0}
+
+    latencies_ms = np.array([r[2] for r in results]) * 1000
+    errors = sum(1 for r in results if r[1] is None or r[1] >= 400)
+    status_counts = {}
+    for r in results:
+        key = str(r[1]) if r[1] is not None else "connection_error"
+        status_counts[key] = status_counts.get(key, 0) + 1
+
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(float(latencies_ms.mean()), 3),
+            "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p95": round(float(np.percentile(latencies_ms, 95)), 3),
+            "p99": round(float(np.percentile(latencies_ms, 99)), 3),
+            "max": round(float(latencies_ms.max()), 3)
+        },
+        "status_codes": status_counts
+    }
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the command-line argument parser for the load generator.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="trainova-loadgen",
+        description="Run a /predict and /feedback load test against the Trainova API"
+    )
+    parser.add_argument("--url", type=str,
+                        help="Base URL of a running server (default: start a local waitress instance)")
+    parser.add_argument("--server-threads", type=int, default=4,
+                        help="Waitress threads for the local server (default: 4)")
+    parser.add_argument("--coalesce-ttl", type=float,
+                        help="Override the /predict coalescing TTL of the local server (seconds)")
+    parser.add_argument("--rate", type=float, default=50.0,
+                        help="Target request rate in requests per second (default: 50)")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Test duration in seconds (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Number of client connections (default: 8)")
+    parser.add_argument("--mix", type=str, default="predict=0.8,feedback=0.2",
+                        help="Endpoint mix (default: predict=0.8,feedback=0.2)")
+    parser.add_argument("--history-lengths", type=str, default="10,50,200",
+                        help="Comma-separated history lengths for /predict payloads (default: 10,50,200)")
+    parser.add_argument("--exercises", type=str,
+                        help="Comma-separated list of exercises to mix into each history")
+    parser.add_argument("--payloads", type=int, default=10,
+                        help="Distinct payloads per history length (default: 10)")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible payloads and request order")
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file instead of stdout")
+    return parser
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    """
+    Entry point for the load generator.
+
+    Args:
+        args: Command-line arguments (uses sys.argv if None)
+
+    Returns:
+        Exit code (0 for success, non-zero for errors)
+    """
+    parsed_args = create_parser().parse_args(args)
+
+    exercises = parsed_args.exercises.split(",") if parsed_args.exercises else DEFAULT_EXERCISES
+    history_lengths = [int(length) for length in parsed_args.history_lengths.split(",")]
+    mix = parse_mix(parsed_args.mix)
+
+    payloads = build_payloads(history_lengths, exercises, parsed_args.payloads, parsed_args.seed)
+
+    server = None
+    base_url = parsed_args.url
+    if not base_url:
+        server, base_url = start_local_server(parsed_args.server_threads, parsed_args.coalesce_ttl)
+
+    try:
+        # Feedback only exercises the training path for predictions the server made
+        primed = prime_feedback(base_url, payloads, parsed_args.timeout) if "feedback" in mix else 0
+        generator = LoadGenerator(
+            base_url=base_url,
+            payloads=payloads,
+            mix=mix,
+            rate=parsed_args.rate,
+            duration=parsed_args.duration,
+            concurrency=parsed_args.concurrency,
+            timeout=parsed_args.timeout,
+            seed=parsed_args.seed
+        )
+        report = generator.run()
+    finally:
+        if server is not None:
+            server.close()
+
+    report["target"] = base_url
+    report["primed_feedback"] = primed
+    report["history_lengths"] = history_lengths
+    report["exercises"] = exercises
+    output = json.dumps(report, indent=2)
+
+    if parsed_args.output:
+        with open(parsed_args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
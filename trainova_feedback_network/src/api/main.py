@@ -10,12 +10,24 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ..models.feedback_prediction_model import FeedbackBasedPredictionModel
+from .coalescing import SingleFlight, request_fingerprint
+from .profiling import RequestProfiler
 
 app = Flask(__name__)
 
 # Initialize the model
 prediction_model = FeedbackBasedPredictionModel()
 
+# Identical concurrent /predict requests share one computation; results are
+# kept for a short TTL (seconds) so aggressive client retries are cheap too
+prediction_coalescer = SingleFlight(ttl=float(os.environ.get("PREDICT_COALESCE_TTL", 2.0)))
+
+# On-demand profiling of individual requests (header or sampling rate),
+# written to data/profiles unless TRAINOVA_PROFILE_DIR is set
+request_profiler = RequestProfiler.from_env(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "profiles")
+)
+
 @app.route('/')
 def home():
     """Welcome endpoint for the API"""
@@ -35,6 +47,7 @@ def health():
     return jsonify({"status": "healthy"})
 
 @app.route('/predict', methods=['POST'])
+@request_profiler.profiled
 def predict_weight():
     """
     Predict the weight for the next workout based on previous workout data.
@@ -52,6 +65,7 @@ def predict_weight():
                 "rir": int (optional)
             }
         ],
+        "user": "string" (optional, matched against feedback),
         "debug": bool (optional)
     }
     """
@@ -63,6 +77,7 @@ def predict_weight():
             
         exercise = data.get('exercise')
         previous_workouts = data.get('previous_workouts', [])
+        user = data.get('user')
         debug = data.get('debug', False)
         
         if not exercise:
@@ -71,8 +86,17 @@ def predict_weight():
         if not previous_workouts:
             return jsonify({"error": "No previous workout data provided"}), 400
         
-        # Make prediction
-        prediction = prediction_model.predict(exercise, previous_workouts, debug)
+        # Make prediction, coalescing identical in-flight requests
+        fingerprint = request_fingerprint({
+            "exercise": exercise,
+            "previous_workouts": previous_workouts,
+            "user": user,
+            "debug": debug
+        })
+        prediction = prediction_coalescer.do(
+            fingerprint,
+            lambda: prediction_model.predict(exercise, previous_workouts, debug, user=user)
+        )
         
         return jsonify(prediction)
         
@@ -80,6 +104,7 @@ def predict_weight():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/feedback', methods=['POST'])
+@request_profiler.profiled
 def provide_feedback():
     """
     Provide feedback on a prediction to improve future predictions.
@@ -91,8 +116,13 @@ def provide_feedback():
         "actual_weight": float,
         "success": bool (optional),
         "reps": int (optional),
-        "rir": int (optional)
+        "rir": int (optional),
+        "user": "string" (optional, as sent to /predict)
     }
+
+    The response's `sample_buffered` is false when this server did not make
+    the prediction (e.g. another worker or before a restart); such feedback
+    is recorded but does not train the prediction weights.
     """
     try:
         data = request.get_json()
@@ -106,6 +136,7 @@ def provide_feedback():
         success = data.get('success', True)
         reps = data.get('reps')
         rir = data.get('rir')
+        user = data.get('user')
         
         if not all([exercise, predicted_weight is not None, actual_weight is not None]):
             return jsonify({"error": "Missing required fields"}), 400
@@ -117,9 +148,15 @@ def provide_feedback():
             actual_weight=actual_weight,
             success=success,
             reps=reps,
-            rir=rir
+            rir=rir,
+            user=user
         )
         
+        # Feedback is applied in mini-batches; once a batch changes the
+        # prediction weights, cached results are stale
+        if feedback_result.get('weights_updated'):
+            prediction_coalescer.clear()
+        
         return jsonify(feedback_result)
         
     except Exception as e:
@@ -0,0 +1,142 @@
+import cProfile
+import functools
+import glob
+import hmac
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from flask import request
+
+
+class RequestProfiler:
+    """
+    Profiles individual API requests on demand.
+
+    A request is profiled when it carries the profiling header with the
+    configured token (the header is ignored when no token is set) or when it
+    is picked by the sampling rate. Only one request is profiled at a time;
+    concurrent requests run unprofiled while the profiler is busy. The
+    cProfile stats are written to a rotating directory, with the route,
+    history length and latency encoded in the file name, so they can be
+    inspected later with `pstats` or snakeviz.
+    """
+
+    header_name = "X-Trainova-Profile"
+
+    def __init__(self,
+                 profile_dir: str,
+                 sample_rate: float = 0.0,
+                 token: Optional[str] = None,
+                 max_files: int = 200):
+        """
+        Initialize the request profiler.
+
+        Args:
+            profile_dir: Directory to write profile files to
+            sample_rate: Fraction of requests to profile without the header (0-1)
+            token: Header value that enables profiling (None: header disabled)
+            max_files: Number of profile files to keep before the oldest are removed
+        """
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.token = token
+        self.max_files = max_files
+        self._rotate_lock = threading.Lock()
+        # cProfile allows a single active profiler per process (Python 3.12+)
+        self._profile_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, default_dir: str) -> "RequestProfiler":
+        """
+        Create a profiler configured from TRAINOVA_PROFILE_* environment variables.
+
+        Args:
+            default_dir: Profile directory used when TRAINOVA_PROFILE_DIR is not set
+
+        Returns:
+            Configured RequestProfiler instance
+        """
+        return cls(
+            profile_dir=os.environ.get("TRAINOVA_PROFILE_DIR", default_dir),
+            sample_rate=float(os.environ.get("TRAINOVA_PROFILE_SAMPLE_RATE", 0.0)),
+            token=os.environ.get("TRAINOVA_PROFILE_TOKEN") or None,
+            max_files=int(os.environ.get("TRAINOVA_PROFILE_MAX_FILES", 200))
+        )
+
+    def should_profile(self) -> bool:
+        """
+        Decide whether the current request should be profiled.
+
+        Returns:
+            True if the request asked for profiling or was sampled
+        """
+        header_value = request.headers.get(self.header_name)
+        if header_value and self.token is not None:
+            return hmac.compare_digest(header_value.encode(), self.token.encode())
+
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def profiled(self, view: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Decorator that runs a Flask view under the profiler when requested.
+
+        Args:
+            view: Flask view function
+
+        Returns:
+            Wrapped view function
+        """
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.should_profile() or not self._profile_lock.acquire(blocking=False):
+                return view(*args, **kwargs)
+
+            try:
+                profiler = cProfile.Profile()
+                start = time.perf_counter()
+                response = profiler.runcall(view, *args, **kwargs)
+                latency_ms = (time.perf_counter() - start) * 1000
+            finally:
+                self._profile_lock.release()
+
+            try:
+                self._write(profiler, request.path, self._history_length(), latency_ms)
+            except OSError as e:
+                print(f"Error writing request profile: {e}")
+
+            return response
+
+        return wrapper
+
+    def _history_length(self) -> int:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict) and isinstance(data.get("previous_workouts"), list):
+            return len(data["previous_workouts"])
+        return 0
+
+    def _write(self, profiler: cProfile.Profile, route: str, history_length: int, latency_ms: float) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+        route_tag = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        file_name = f"{timestamp}_{route_tag}_n{history_length}_{latency_ms:.0f}ms_{os.getpid()}.prof"
+        file_path = os.path.join(self.profile_dir, file_name)
+
+        profiler.dump_stats(file_path)
+        self._rotate()
+        return file_path
+
+    def _rotate(self) -> None:
+        with self._rotate_lock:
+            # File names start with a timestamp, so lexical order is age order
+            profiles = sorted(glob.glob(os.path.join(self.profile_dir, "*.prof")))
+            for old_profile in profiles[:max(len(profiles) - self.max_files, 0)]:
+                try:
+                    os.remove(old_profile)
+                except OSError:
+                    pass
@@ -3,12 +3,20 @@
 
 import os
 import sys
+import time
 import argparse
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from ..models.calibration import CALIBRATION_WEIGHTS, MIN_CALIBRATION_ROWS
+from ..features.feature_store import FeatureStore
+from ..prediction.backtest import backtest
+from ..prediction.batch import predict_all
 from ..prediction.predictor import WorkoutPredictor
+from ..prediction.sweep import default_parameters, parameter_grid, parse_parameter_space, random_parameters, run_sweep
+from ..storage.exporter import export_chunks, infer_export_options
+from ..storage.synthetic import shard_paths
 from .data_collection import DataCollector
 
 class CommandHandler:
@@ -16,10 +24,18 @@ class CommandHandler:
     Handles the execution of CLI commands for the Trainova feedback network.
     """
     
-    def __init__(self):
-        """Initialize the command handler with data collector and predictor."""
-        self.data_collector = DataCollector()
-        self.predictor = WorkoutPredictor()
+    def __init__(self, storage: Optional[str] = None):
+        """
+        Initialize the command handler with data collector and predictor.
+        
+        Args:
+            storage: Storage backend for workout data (None uses the default)
+        """
+        self.data_collector = DataCollector(backend=storage)
+        
+        # Model state persists between runs in data/models (or $TRAINOVA_MODEL_DIR)
+        model_dir = os.environ.get("TRAINOVA_MODEL_DIR") or os.path.join(self.data_collector.data_dir, "models")
+        self.predictor = WorkoutPredictor(model_dir=model_dir)
     
     def handle_pretrain(self, args: argparse.Namespace) -> None:
         """
@@ -36,7 +52,9 @@ class CommandHandler:
             exercises = args.exercises.split(',') if args.exercises else None
             self.data_collector.generate_and_save_mock_data(
                 num_samples=args.samples,
-                exercises=exercises
+                exercises=exercises,
+                users=args.users,
+                seed=args.seed
             )
         
         # If importing from a CSV file was requested
@@ -46,7 +64,9 @@ class CommandHandler:
                 return
                 
             print(f"Importing data from {args.import_file}...")
-            self.data_collector.import_from_csv(args.import_file, is_pretraining=True)
+            if self._import_files(args.import_file, is_pretraining=True) is None:
+                print("Failed to import data.")
+                return
         
         # Load the training data
         print("Loading training data...")
@@ -58,9 +78,20 @@ class CommandHandler:
         
         # Train the model
         print(f"Pretraining model with {len(training_data)} workout records...")
-        self.predictor.fit_model(training_data)
+        calibration = self.predictor.fit_model(training_data).model.calibration
         
-        print("Model pretraining complete!")
+        fitted = [exercise for exercise in calibration if exercise in set(training_data["exercise"])]
+        if not fitted:
+            print(f"Not enough data to calibrate any exercise (at least {MIN_CALIBRATION_ROWS} consecutive workouts needed).")
+            return
+        print(f"\n{'Exercise':<20} {'Rows':>8} {'Progress/session':>17} {'Avg reps':>9} {'Blend (lw/prog/cons/vol)':>26}")
+        for exercise in sorted(fitted):
+            values = calibration[exercise]
+            blend = "/".join(f"{values['prediction_weights'][name]:.2f}" for name in CALIBRATION_WEIGHTS)
+            print(f"{exercise:<20} {values['rows']:>8} {values['progression_rate']:>14.2f} kg "
+                  f"{values['rep_mean']:>9.1f} {blend:>26}")
+        
+        print("\nModel pretraining complete!")
     
     def handle_collect(self, args: argparse.Namespace) -> None:
         """
@@ -71,16 +102,18 @@ class CommandHandler:
         """
         print("\n=== Collecting Workout Data ===")
         
-        # Interactive data collection
-        workout_data = self.data_collector.interactive_data_entry(args.exercise)
-        
-        # Save the data
-        self.data_collector.save_workout_data(workout_data, is_pretraining=args.pretraining)
-        
-        # Ask if the user wants to add more data
-        while input("\nAdd another workout? (y/n): ").lower().startswith('y'):
+        # Keep one buffered appender open for the whole collection session
+        with self.data_collector.bulk_appender(is_pretraining=args.pretraining) as appender:
+            # Interactive data collection
             workout_data = self.data_collector.interactive_data_entry(args.exercise)
-            self.data_collector.save_workout_data(workout_data, is_pretraining=args.pretraining)
+            appender.append(workout_data)
+            
+            # Ask if the user wants to add more data
+            while input("\nAdd another workout? (y/n): ").lower().startswith('y'):
+                workout_data = self.data_collector.interactive_data_entry(args.exercise)
+                appender.append(workout_data)
+        
+        print(f"Saved {appender.rows_written} workouts to {self.data_collector._storage_location(args.pretraining)}")
     
     def handle_interactive_training(self, args: argparse.Namespace) -> None:
         """
@@ -91,23 +124,20 @@ class CommandHandler:
         """
         print("\n=== Interactive Training ===")
         
-        # Check if there's any data to work with
-        training_data = self.data_collector.load_training_data(include_pretraining=True)
-        
-        if training_data.empty:
-            print("No training data available. Please collect some data first.")
-            return
-        
-        # Fit the model if not already trained
-        print("Ensuring model is trained with existing data...")
-        self.predictor.fit_model(training_data)
+        user = getattr(args, 'user', None)
         
         # Exercise selection for prediction
         if args.exercise:
             exercise = args.exercise
         else:
-            # List available exercises from the data
-            available_exercises = training_data['exercise'].unique()
+            # List available exercises without loading the workouts
+            available_exercises = self.data_collector.list_exercises(include_pretraining=True, user=user)
+            
+            # Check if there's any data to work with
+            if not available_exercises:
+                print("No training data available. Please collect some data first.")
+                return
+            
             print("\nAvailable exercises:")
             for i, ex in enumerate(available_exercises, 1):
                 print(f"{i}. {ex}")
@@ -123,7 +153,12 @@ class CommandHandler:
                 exercise = input().strip()
         
         # Get previous workouts for this exercise
-        exercise_data = training_data[training_data['exercise'] == exercise]
+        exercise_data = self.data_collector.load_training_data(include_pretraining=True, exercise=exercise, user=user)
+        
+        # Fit the model if not already trained
+        print("Ensuring model is trained with existing data...")
+        if not self.predictor.is_fitted(exercise):
+            self.predictor.fit_model(exercise_data, save=False)
         
         if len(exercise_data) == 0:
             print(f"No previous data for {exercise}. Starting with a new exercise.")
@@ -133,7 +168,7 @@ class CommandHandler:
             previous_workouts = exercise_data.to_dict('records')
         
         # Make a prediction
-        prediction_result = self.predictor.predict_workout(exercise, previous_workouts)
+        prediction_result = self.predictor.predict_workout(exercise, previous_workouts, user=user)
         
         print(f"\nPredicted weight for {exercise}: {prediction_result['weight']} kg/lb")
         print(f"Confidence: {prediction_result['confidence']:.2f}")
@@ -163,13 +198,15 @@ class CommandHandler:
                 actual_weight=actual_weight,
                 success=success,
                 reps=reps,
-                rir=rir
+                rir=rir,
+                user=user
             )
             
             print(f"\nFeedback recorded: {feedback['message']}")
             
             # Save this workout to the training data
             workout_data = {
+                "user": user,
                 "exercise": exercise,
                 "weight": actual_weight,
                 "reps": reps,
@@ -184,7 +221,7 @@ class CommandHandler:
             # Make a new prediction with the updated data
             print("\nUpdating prediction with new feedback...")
             previous_workouts.append(workout_data)
-            new_prediction = self.predictor.predict_workout(exercise, previous_workouts)
+            new_prediction = self.predictor.predict_workout(exercise, previous_workouts, user=user)
             
             print(f"\nNext workout prediction for {exercise}: {new_prediction['weight']} kg/lb")
             print(f"Confidence: {new_prediction['confidence']:.2f}")
@@ -201,22 +238,19 @@ class CommandHandler:
         """
         print("\n=== Making a Prediction ===")
         
-        # Load training data
-        training_data = self.data_collector.load_training_data(include_pretraining=True)
-        
-        if training_data.empty:
-            print("No training data available. Please collect some data first.")
-            return
-        
-        # Ensure model is trained
-        self.predictor.fit_model(training_data)
+        user = getattr(args, 'user', None)
         
         # Get the exercise
         exercise = args.exercise
         
         if not exercise:
-            # List available exercises
-            available_exercises = training_data['exercise'].unique()
+            # List available exercises without loading the workouts
+            available_exercises = self.data_collector.list_exercises(include_pretraining=True, user=user)
+            
+            if not available_exercises:
+                print("No training data available. Please collect some data first.")
+                return
+            
             print("\nAvailable exercises:")
             for i, ex in enumerate(available_exercises, 1):
                 print(f"{i}. {ex}")
@@ -231,13 +265,17 @@ class CommandHandler:
                 print("Invalid selection. Please enter a new exercise name:")
                 exercise = input().strip()
         
-        # Get previous workouts for this exercise
-        exercise_data = training_data[training_data['exercise'] == exercise]
+        # Load only the previous workouts for this exercise
+        exercise_data = self.data_collector.load_training_data(include_pretraining=True, exercise=exercise, user=user)
         
         if len(exercise_data) == 0:
             print(f"No previous data for {exercise}. Cannot make a prediction.")
             return
         
+        # Ensure model is trained (calibrate this exercise for this run if pretrain has not)
+        if not self.predictor.is_fitted(exercise):
+            self.predictor.fit_model(exercise_data, save=False)
+        
         # Convert DataFrame rows to dictionaries
         previous_workouts = exercise_data.to_dict('records')
         
@@ -256,6 +294,167 @@ class CommandHandler:
             print("\nAnalysis:")
             for key, value in prediction_result['analysis'].items():
                 print(f"- {key}: {value}")
+        
+        # Recent trend from the cached feature store; without one, only this
+        # exercise's workouts are featurized. Features are per user, so without
+        # --user (a prediction from everyone's workouts) there is no trend to show
+        features = None
+        if user is not None:
+            store = self.data_collector.load_features(build=False) or FeatureStore.build(exercise_data)
+            features = store.lookup(exercise, user=user)
+        if features:
+            print("\nRecent trend:")
+            print(f"- average weight (last 5): {features['avg_weight_5']:.1f} kg")
+            print(f"- weight slope (last 5 / 10 sessions): {features['weight_slope_5']:+.2f} / "
+                  f"{features['weight_slope_10']:+.2f} kg per session")
+            print(f"- estimated 1RM: {features['one_rep_max']:.1f} kg (best {features['best_one_rep_max']:.1f} kg)")
+    
+    def handle_features(self, args: argparse.Namespace) -> None:
+        """
+        Handle the features command to build (or refresh) the cached feature store.
+        
+        Args:
+            args: Command line arguments
+        """
+        print("\n=== Feature Store ===")
+        
+        start = time.perf_counter()
+        store = self.data_collector.load_features(include_pretraining=not args.exclude_pretraining,
+                                                  rebuild=args.rebuild)
+        elapsed = time.perf_counter() - start
+        
+        if not len(store):
+            print("No training data available. Please collect some data first.")
+            return
+        print(f"{len(store)} workouts in {len(store.series_keys)} histories, "
+              f"{len(store.columns)} features ({elapsed:.2f}s)")
+        
+        if args.output:
+            try:
+                fmt, compression = infer_export_options(args.output, args.format, None)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return
+            rows = export_chunks([store.frame()], args.output, fmt=fmt, compression=compression)
+            print(f"Wrote {rows} feature rows to {args.output}")
+    
+    def handle_predict_all(self, args: argparse.Namespace) -> None:
+        """
+        Handle the predict-all command to predict every exercise of every user.
+        
+        Args:
+            args: Command line arguments
+        """
+        print("\n=== Predicting All Exercises ===")
+        
+        file_path = args.output
+        if not file_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            extension = args.format or "csv"
+            if args.compression == "gzip":
+                extension += ".gz"
+            elif args.compression == "zstd":
+                extension += ".zst"
+            file_path = f"predictions_{timestamp}.{extension}"
+        
+        try:
+            fmt, compression = infer_export_options(file_path, args.format, args.compression)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        if fmt == "parquet":
+            print("Error: predict-all writes csv or ndjson.")
+            return
+        
+        # Load the dataset once; workers get whole (user, exercise) series
+        workouts = self.data_collector.load_training_data(include_pretraining=True, user=args.user)
+        
+        if workouts.empty:
+            print("No training data available. Please collect some data first.")
+            return
+        
+        start = time.perf_counter()
+        results = predict_all(workouts, workers=args.workers, batch_size=args.batch_size,
+                              prediction_weights=self.predictor.model.prediction_weights,
+                              calibration=self.predictor.model.calibration)
+        rows = export_chunks(results, file_path, fmt=fmt, compression=compression)
+        elapsed = time.perf_counter() - start
+        
+        print(f"Wrote {rows} predictions to {file_path} in {elapsed:.1f}s")
+    
+    def handle_backtest(self, args: argparse.Namespace) -> None:
+        """
+        Handle the backtest command to measure prediction accuracy over history.
+        
+        Args:
+            args: Command line arguments
+        """
+        print("\n=== Backtesting Predictions ===")
+        
+        workouts = self.data_collector.load_training_data(
+            include_pretraining=not args.exclude_pretraining,
+            exercise=args.exercise,
+            user=args.user
+        )
+        
+        if workouts.empty:
+            print("No training data available. Please collect some data first.")
+            return
+        
+        start = time.perf_counter()
+        results = backtest(workouts, prediction_weights=self.predictor.model.prediction_weights,
+                           min_history=args.min_history,
+                           progression_factors=self.predictor.model.progression_factors,
+                           calibration=self.predictor.model.calibration)
+        elapsed = time.perf_counter() - start
+        
+        if results.empty:
+            print("Not enough history to backtest (each history needs at least two workouts).")
+            return
+        
+        print(f"\nReplayed {int(results['predictions'].sum())} predictions in {elapsed:.2f}s\n")
+        print(results.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+        
+        if args.output:
+            results.to_csv(args.output, index=False)
+            print(f"\nResults written to {args.output}")
+    
+    def handle_sweep(self, args: argparse.Namespace) -> None:
+        """
+        Handle the sweep command to tune model parameters on the recorded history.
+        
+        Args:
+            args: Command line arguments
+        """
+        print("\n=== Parameter Sweep ===")
+        
+        try:
+            space = parse_parameter_space(args.param)
+            base = default_parameters(self.predictor.model)
+            if args.trials:
+                trials = random_parameters(space, args.trials, seed=args.seed, base=base)
+            else:
+                trials = parameter_grid(space, base=base)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        
+        workouts = self.data_collector.load_training_data(include_pretraining=True, exercise=args.exercise)
+        
+        if workouts.empty:
+            print("No training data available. Please collect some data first.")
+            return
+        
+        print(f"Evaluating {len(trials)} parameter sets...")
+        start = time.perf_counter()
+        results = run_sweep(workouts, trials, workers=args.workers, min_history=args.min_history,
+                            feedback=args.feedback, objective=args.objective,
+                            calibration=self.predictor.model.calibration)
+        elapsed = time.perf_counter() - start
+        
+        results.to_csv(args.output, index=False)
+        print(f"\nEvaluated {len(results)} parameter sets in {elapsed:.1f}s; results written to {args.output}\n")
+        print(results.head(args.top).to_string(index=False, float_format=lambda value: f"{value:.4g}"))
     
     def handle_reset(self, args: argparse.Namespace) -> None:
         """
@@ -268,9 +467,9 @@ class CommandHandler:
         
         reset_type = args.type if args.type else 'all'
         
-        if reset_type not in ['all', 'feedback', 'weights', 'scalers']:
+        if reset_type not in ['all', 'feedback', 'weights', 'calibration', 'scalers']:
             print(f"Invalid reset type: {reset_type}")
-            print("Valid types are: all, feedback, weights, scalers")
+            print("Valid types are: all, feedback, weights, calibration, scalers")
             return
         
         # Confirm reset
@@ -303,12 +502,23 @@ class CommandHandler:
         if not file_path:
             # Generate a default filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_path = f"trainova_data_export_{timestamp}.csv"
-        
-        # Export the data
-        success = self.data_collector.export_to_csv(
+            extension = args.format or "csv"
+            if args.compression == "gzip":
+                extension += ".gz"
+            elif args.compression == "zstd":
+                extension += ".zst"
+            file_path = f"trainova_data_export_{timestamp}.{extension}"
+        
+        # Export the data, streaming it in chunks
+        success = self.data_collector.export_data(
             file_path=file_path,
-            include_pretraining=not args.exclude_pretraining
+            include_pretraining=not args.exclude_pretraining,
+            fmt=args.format,
+            compression=args.compression,
+            exercise=args.exercise,
+            since=args.since,
+            until=args.until,
+            chunksize=args.chunksize
         )
         
         if success:
@@ -330,13 +540,103 @@ class CommandHandler:
             print(f"Error: File not found: {args.file}")
             return
         
-        # Import the data
-        df = self.data_collector.import_from_csv(
-            file_path=args.file,
-            is_pretraining=args.pretraining
+        imported = self._import_files(args.file, is_pretraining=args.pretraining, chunksize=args.chunksize,
+                                      dedup=not args.no_dedup, replace=args.replace)
+        if imported is None:
+            print("Failed to import data.")
+            return
+        
+        print(f"Successfully imported {imported} records from {args.file}")
+    
+    def _import_files(self,
+                      path: str,
+                      is_pretraining: bool = False,
+                      chunksize: int = 100000,
+                      dedup: bool = True,
+                      replace: bool = False) -> Optional[int]:
+        """
+        Import a CSV file, or every shard of a generate manifest, in chunks.
+        
+        Args:
+            path: CSV file or manifest (.json) path
+            is_pretraining: Whether to import into the pretraining dataset
+            chunksize: Number of rows to read per chunk
+            dedup: Whether to skip rows already in the dataset or file
+            replace: Whether to clear the target dataset first
+            
+        Returns:
+            Number of imported rows, or None on error
+        """
+        # A manifest from the generate command imports all of its shards
+        file_paths = shard_paths(path) if path.endswith(".json") else [path]
+        
+        # Import the data in chunks, appending to the existing dataset
+        imported = 0
+        for position, file_path in enumerate(file_paths):
+            stats = self.data_collector.import_from_csv_streaming(
+                file_path=file_path,
+                is_pretraining=is_pretraining,
+                chunksize=chunksize,
+                dedup=dedup,
+                replace=replace and position == 0
+            )
+            if stats is None:
+                return None
+            imported += stats['imported']
+        return imported
+    
+    def handle_compact(self, args: argparse.Namespace) -> None:
+        """
+        Handle the compact command to compact the partitioned store.
+        
+        Args:
+            args: Command line arguments
+        """
+        print("\n=== Compacting Data ===")
+        
+        if not args.watch:
+            self.data_collector.compact_storage()
+            return
+        
+        print(f"Compacting every {args.watch} seconds. Press Ctrl+C to stop.")
+        try:
+            while self.data_collector.compact_storage() is not None:
+                time.sleep(args.watch)
+        except KeyboardInterrupt:
+            print("\nStopped compacting.")
+    
+    def handle_generate(self, args: argparse.Namespace) -> None:
+        """
+        Handle the generate command to build a sharded synthetic dataset.
+        
+        Args:
+            args: Command line arguments
+        """
+        print("\n=== Generating Synthetic Data ===")
+        
+        exercises = args.exercises.split(',') if args.exercises else None
+        manifest_path = self.data_collector.generate_mock_shards(
+            output_dir=args.output_dir,
+            num_samples=args.samples,
+            exercises=exercises,
+            users=args.users,
+            seed=args.seed,
+            shards=args.shards,
+            workers=args.workers
         )
+        print(f"Import the shards with: trainova-cli import {manifest_path}")
+    
+    def handle_migrate(self, args: argparse.Namespace) -> None:
+        """
+        Handle the migrate command to copy the datasets between storage backends.
         
-        if not df.empty:
-            print(f"Successfully imported {len(df)} records from {args.file}")
-        else:
-            print("Failed to import data.")
\ No newline at end of file
+        Args:
+            args: Command line arguments
+        """
+        print("\n=== Migrating Data ===")
+        
+        migrated = self.data_collector.migrate_storage(target=args.to, source=args.source)
+        
+        if migrated:
+            total = sum(migrated.values())
+            print(f"Successfully migrated {total} records. Use --storage {args.to} (or TRAINOVA_STORAGE={args.to}) to use them.")
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Warm CLI daemon.
+
+The daemon keeps the interpreter, pandas, the datasets and the model loaded
+and runs CLI commands sent over a local Unix domain socket. The client side
+(`forward`) only uses the standard library, so `trainova-cli` can hand a
+command to a running daemon without importing pandas.
+
+Only read-only, non-interactive commands are forwarded; everything else and
+every command when no daemon is running executes in-process as before.
+"""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Commands the daemon answers; others prompt for input or modify data
+DAEMON_COMMANDS = ["predict", "predict-all", "backtest", "export"]
+
+# Environment variables that change what a command reads; the daemon refuses
+# requests from clients whose values differ from its own
+DAEMON_ENVIRONMENT = ["TRAINOVA_STORAGE", "TRAINOVA_MODEL_DIR", "TRAINOVA_DATASET_CACHE"]
+
+# Package root (the directory containing `src`) and default data directory
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DATA_DIR = os.path.join(_PACKAGE_ROOT, "data")
+
+
+def default_socket_path() -> str:
+    """
+    Return the daemon socket path ($TRAINOVA_DAEMON_SOCKET or data/trainova.sock).
+    """
+    return os.environ.get("TRAINOVA_DAEMON_SOCKET") or os.path.join(_DATA_DIR, "trainova.sock")
+
+
+def forward(argv: List[str], socket_path: Optional[str] = None) -> Optional[int]:
+    """
+    Run a CLI command in the daemon if one is running and the command allows it.
+
+    Args:
+        argv: Command-line arguments (without the program name)
+        socket_path: Daemon socket (default: `default_socket_path()`)
+
+    Returns:
+        The command's exit code, or None if it must run in-process (also when
+        the daemon runs with a different DAEMON_ENVIRONMENT)
+    """
+    if os.environ.get("TRAINOVA_DAEMON", "1").lower() in ("0", "false", "no"):
+        return None
+    if not _forwardable(argv):
+        return None
+
+    try:
+        response = request({"argv": argv, "cwd": os.getcwd(), "env": _environment()},
+                           socket_path or default_socket_path())
+    except (OSError, ValueError):
+        # No daemon, a stale socket or a daemon that died mid-request
+        return None
+    if response.get("refused"):
+        return None
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("status", 1))
+
+
+def request(message: Dict[str, Any], socket_path: str, connect_timeout: float = 0.5) -> Dict[str, Any]:
+    """
+    Send one JSON request to the daemon and wait for its JSON response.
+
+    Args:
+        message: Request payload
+        socket_path: Daemon socket
+        connect_timeout: Seconds to wait for the connection
+
+    Returns:
+        The response payload
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(connect_timeout)
+        sock.connect(socket_path)
+        # Commands such as predict-all may run for a long time
+        sock.settimeout(None)
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise ValueError("Daemon closed the connection without a response")
+    return json.loads(line)
+
+
+def daemon_status(socket_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Query a running daemon.
+
+    Args:
+        socket_path: Daemon socket (default: `default_socket_path()`)
+
+    Returns:
+        Status dictionary (pid, uptime, requests), or None if no daemon is running
+    """
+    try:
+        return request({"control": "status"}, socket_path or default_socket_path())
+    except (OSError, ValueError):
+        return None
+
+
+def start_daemon(socket_path: Optional[str] = None, timeout: float = 30.0) -> Optional[int]:
+    """
+    Start the daemon in the background and wait until it accepts connections.
+
+    Args:
+        socket_path: Daemon socket (default: `default_socket_path()`)
+        timeout: Seconds to wait for the daemon to come up
+
+    Returns:
+        PID of the running daemon, or None if it did not start
+    """
+    socket_path = socket_path or default_socket_path()
+    status = daemon_status(socket_path)
+    if status is not None:
+        return status["pid"]
+
+    subprocess.Popen(
+        [sys.executable, "-m", "src.cli.daemon", socket_path],
+        cwd=_PACKAGE_ROOT,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = daemon_status(socket_path)
+        if status is not None:
+            return status["pid"]
+        time.sleep(0.05)
+    return None
+
+
+def stop_daemon(socket_path: Optional[str] = None) -> bool:
+    """
+    Ask a running daemon to shut down.
+
+    Args:
+        socket_path: Daemon socket (default: `default_socket_path()`)
+
+    Returns:
+        True if a daemon was running and stopped
+    """
+    try:
+        request({"control": "stop"}, socket_path or default_socket_path())
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _forwardable(argv: List[str]) -> bool:
+    command = next((arg for i, arg in enumerate(argv)
+                    if not arg.startswith("-") and (i == 0 or argv[i - 1] != "--storage")), None)
+    if command not in DAEMON_COMMANDS or "-h" in argv or "--help" in argv:
+        return False
+    # Without an exercise, predict asks for one interactively
+    if command == "predict":
+        return any(arg == "--exercise" or arg.startswith("--exercise=") for arg in argv)
+    return True
+
+
+class CLIDaemon:
+    """
+    Serves CLI commands over a Unix domain socket, one request at a time.
+
+    Each storage backend gets a long-lived `CommandHandler`, so the dataset
+    cache's memory-mapped arrays stay loaded between requests. The predictor
+    is loaded from the model state file for every request: predictions
+    change the model (rep variety counter, lazily fitted calibration), so a
+    shared one would answer differently than a fresh in-process run.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        """
+        Args:
+            socket_path: Daemon socket (default: `default_socket_path()`)
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.handlers: Dict[Optional[str], Any] = {}
+        self.started = time.time()
+        self.requests = 0
+        self._running = False
+
+    def serve_forever(self) -> None:
+        """
+        Bind the socket and answer requests until a stop request arrives.
+        """
+        # Warm up the imports before accepting connections
+        from .main import create_parser  # noqa: F401
+
+        if os.path.exists(self.socket_path):
+            if daemon_status(self.socket_path) is not None:
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+
+        self._running = True
+        try:
+            while self._running:
+                conn, _ = server.accept()
+                with conn:
+                    self._handle(conn)
+        finally:
+            server.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn.makefile("rb") as stream:
+            line = stream.readline()
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return
+
+        if message.get("control") == "status":
+            response = {"pid": os.getpid(), "uptime": time.time() - self.started, "requests": self.requests}
+        elif message.get("control") == "stop":
+            self._running = False
+            response = {"stopped": True}
+        elif message.get("env", {}) != _environment():
+            # The client expects other storage, model or cache settings
+            response = {"refused": "environment differs from the daemon's"}
+        else:
+            self.requests += 1
+            response = self.run(message.get("argv", []), message.get("cwd"))
+
+        with contextlib.suppress(OSError):
+            conn.sendall(json.dumps(response).encode("utf-8") + b"\n")
+
+    def run(self, argv: List[str], cwd: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run one CLI command with its output captured.
+
+        Args:
+            argv: Command-line arguments (without the program name)
+            cwd: Working directory of the client, for relative paths
+
+        Returns:
+            Dictionary with the exit status and the captured stdout/stderr
+        """
+        from .main import create_parser, run_command
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        previous_cwd = os.getcwd()
+        status = 1
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                parser = create_parser()
+                parsed_args = parser.parse_args(argv)
+                status = run_command(self._handler(parsed_args.storage), parsed_args, parser)
+            except SystemExit as e:
+                # argparse errors and --help
+                status = e.code if isinstance(e.code, int) else 1
+            except OSError as e:
+                print(f"Error: {e}")
+            finally:
+                os.chdir(previous_cwd)
+        return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def _handler(self, storage: Optional[str]) -> Any:
+        """Return the warm command handler of a storage backend, with a freshly loaded predictor."""
+        from ..prediction.predictor import WorkoutPredictor
+        from .commands import CommandHandler
+
+        handler = self.handlers.get(storage)
+        if handler is None:
+            handler = self.handlers[storage] = CommandHandler(storage=storage)
+        else:
+            handler.predictor = WorkoutPredictor(model_dir=handler.predictor.model_dir)
+        return handler
+
+
+def _environment() -> Dict[str, Optional[str]]:
+    return {name: os.environ.get(name) for name in DAEMON_ENVIRONMENT}
+
+
+if __name__ == "__main__":
+    CLIDaemon(sys.argv[1] if len(sys.argv) > 1 else None).serve_forever()
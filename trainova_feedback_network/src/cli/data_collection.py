@@ -4,10 +4,23 @@
 import os
 import csv
 import json
+import hashlib
+import itertools
 import pandas as pd
-from datetime import datetime, timedelta
-import random
-from typing import Dict, List, Any, Optional
+from datetime import datetime
+from typing import Dict, Iterator, List, Any, Optional
+
+from ..features.feature_store import FEATURE_WINDOWS, FeatureStore
+from ..storage.appender import CSVWorkoutAppender, StoreWorkoutAppender
+from ..storage.dataset_cache import DatasetCache
+from ..storage.exporter import export_chunks, infer_export_options
+from ..storage.importer import stream_import
+from ..storage.schema import (REQUIRED_COLUMNS, WORKOUT_COLUMNS, TRAINING_DATASET, PRETRAINING_DATASET,
+                              coerce_workouts, filter_workouts, format_dates, parse_dates)
+from ..storage.synthetic import generate_shards, generate_workouts
+
+# Storage backends supported by DataCollector
+STORAGE_BACKENDS = ["csv", "sqlite", "parquet", "partitioned"]
 
 class DataCollector:
     """
@@ -15,12 +28,16 @@ class DataCollector:
     This class provides methods to collect and preprocess training data.
     """
     
-    def __init__(self, data_dir: str = None):
+    def __init__(self, data_dir: str = None, backend: str = None, use_cache: Optional[bool] = None):
         """
         Initialize the data collector with a specific data directory.
         
         Args:
             data_dir: Directory to store collected data
+            backend: Storage backend ('csv', 'sqlite', 'parquet' or 'partitioned'); defaults to the
+                TRAINOVA_STORAGE environment variable, then 'csv'
+            use_cache: Whether CSV datasets are loaded through the binary dataset
+                cache; defaults to the TRAINOVA_DATASET_CACHE environment variable, then True
         """
         # Set default data directory if none provided
         self.data_dir = data_dir or os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
@@ -32,6 +49,61 @@ class DataCollector:
         # Set default file paths
         self.training_data_path = os.path.join(self.datasets_dir, "training_data.csv")
         self.pretraining_data_path = os.path.join(self.datasets_dir, "pretraining_data.csv")
+        self.sqlite_path = os.path.join(self.datasets_dir, "workouts.db")
+        self.parquet_dir = os.path.join(self.datasets_dir, "parquet")
+        self.features_dir = os.path.join(self.datasets_dir, ".cache", "features")
+        self.partitioned_dir = os.path.join(self.datasets_dir, "partitioned")
+        
+        # Select the storage backend; CSV files remain the default
+        self.backend = backend or os.environ.get("TRAINOVA_STORAGE", "csv")
+        if self.backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {self.backend}. Valid backends are: {', '.join(STORAGE_BACKENDS)}")
+        self.store = self._open_store(self.backend)
+        
+        # Parsed CSV datasets are cached next to the CSV files
+        if use_cache is None:
+            use_cache = os.environ.get("TRAINOVA_DATASET_CACHE", "1") not in ("0", "false", "no")
+        self.dataset_cache = DatasetCache(os.path.join(self.datasets_dir, ".cache")) if use_cache else None
+    
+    def _open_store(self, backend: str):
+        """
+        Open the workout store for a non-CSV backend.
+        
+        Args:
+            backend: Storage backend name
+            
+        Returns:
+            Store instance, or None for the CSV backend
+        """
+        if backend == "sqlite":
+            from ..storage.sqlite_store import SQLiteWorkoutStore
+            return SQLiteWorkoutStore(self.sqlite_path)
+        if backend == "parquet":
+            from ..storage.parquet_store import ParquetWorkoutStore
+            return ParquetWorkoutStore(self.parquet_dir)
+        if backend == "partitioned":
+            from ..storage.partitioned_store import PartitionedWorkoutStore
+            compact_interval = float(os.environ.get("TRAINOVA_COMPACT_INTERVAL", 0))
+            return PartitionedWorkoutStore(self.partitioned_dir, compact_interval=compact_interval)
+        return None
+    
+    def _storage_location(self, is_pretraining: bool = False) -> str:
+        """
+        Describe where data of the given kind is stored, for user messages.
+        
+        Args:
+            is_pretraining: Whether this refers to pretraining data
+            
+        Returns:
+            File path of the storage location
+        """
+        if self.backend == "sqlite":
+            return self.sqlite_path
+        if self.backend == "parquet":
+            return self.parquet_dir
+        if self.backend == "partitioned":
+            return self.partitioned_dir
+        return self.pretraining_data_path if is_pretraining else self.training_data_path
         
     def interactive_data_entry(self, exercise_type: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -141,7 +213,9 @@ class DataCollector:
     
     def save_workout_data(self, workout_data: Dict[str, Any], is_pretraining: bool = False) -> str:
         """
-        Save workout data to the appropriate CSV file.
+        Save a single workout to the appropriate dataset.
+        
+        For many workouts in a row, use `bulk_appender` instead.
         
         Args:
             workout_data: Dictionary containing workout data
@@ -150,185 +224,201 @@ class DataCollector:
         Returns:
             Path to the saved file
         """
+        if self.store is not None:
+            dataset = PRETRAINING_DATASET if is_pretraining else TRAINING_DATASET
+            self.store.append([workout_data], dataset=dataset)
+            target_path = self._storage_location(is_pretraining)
+            print(f"Data saved to {target_path}")
+            return target_path
+        
         # Determine the file path
         file_path = self.pretraining_data_path if is_pretraining else self.training_data_path
         
-        # Check if the file exists to determine if we need to write headers
-        file_exists = os.path.isfile(file_path)
-        
         # Ensure all values are JSON serializable
         for key, value in list(workout_data.items()):
             if isinstance(value, (datetime, pd.Timestamp)):
                 workout_data[key] = value.isoformat()
         
-        # Get the fieldnames from the workout data
-        fieldnames = list(workout_data.keys())
-        
-        # Write to the CSV file
-        with open(file_path, mode='a', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            
-            # Write header if file doesn't exist
-            if not file_exists:
-                writer.writeheader()
-            
-            # Write the data row
-            writer.writerow(workout_data)
+        # Write the row using the file's fixed column layout
+        with self.bulk_appender(is_pretraining, max_rows=1) as appender:
+            appender.append(workout_data)
         
         print(f"Data saved to {file_path}")
         return file_path
     
-    def generate_mock_data(self, num_samples: int = 100, exercises: Optional[List[str]] = None) -> pd.DataFrame:
+    def bulk_appender(self, is_pretraining: bool = False, max_rows: int = 1000, max_delay: float = 1.0):
+        """
+        Open a buffered appender for adding many workouts one at a time.
+        
+        The appender keeps one file handle (or store) open, writes rows with
+        a fixed schema and flushes when `max_rows` rows are buffered or
+        `max_delay` seconds have passed. Use it as a context manager so the
+        remaining rows are flushed on exit:
+        
+            with data_collector.bulk_appender() as appender:
+                for workout in workouts:
+                    appender.append(workout)
+        
+        Args:
+            is_pretraining: Whether to append to the pretraining dataset
+            max_rows: Number of buffered rows that triggers a flush
+            max_delay: Seconds after which buffered rows are flushed
+            
+        Returns:
+            BufferedAppender instance
+        """
+        if self.store is not None:
+            dataset = PRETRAINING_DATASET if is_pretraining else TRAINING_DATASET
+            return StoreWorkoutAppender(self.store, dataset, max_rows=max_rows, max_delay=max_delay)
+        
+        file_path = self.pretraining_data_path if is_pretraining else self.training_data_path
+        return CSVWorkoutAppender(file_path, max_rows=max_rows, max_delay=max_delay)
+    
+    def generate_mock_data(self, num_samples: int = 100, exercises: Optional[List[str]] = None,
+                           seed: Optional[int] = None) -> pd.DataFrame:
         """
         Generate mock workout data for pretraining with realistic progression rates.
         
         Args:
             num_samples: Number of samples to generate
             exercises: List of exercises to generate data for
+            seed: Random seed for reproducible data
             
         Returns:
             DataFrame containing the generated data
         """
-        if exercises is None:
-            exercises = ["Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row"]
-        
-        # Lists to store the generated data
-        data_rows = []
-        
-        # Generate data for each exercise
-        for exercise in exercises:
-            # Generate a reasonable starting weight for each exercise
-            if exercise == "Squat":
-                base_weight = random.uniform(60, 100)
-            elif exercise == "Bench Press":
-                base_weight = random.uniform(40, 80)
-            elif exercise == "Deadlift":
-                base_weight = random.uniform(80, 120)
-            elif exercise == "Overhead Press":
-                base_weight = random.uniform(30, 50)
-            else:  # Default for other exercises
-                base_weight = random.uniform(40, 70)
-            
-            # Generate samples per exercise
-            samples_per_exercise = num_samples // len(exercises)
-            
-            # Generate a date range starting from 6 months ago
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=180)
-            date_range = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
-            
-            # Ensure we have enough dates
-            if len(date_range) < samples_per_exercise:
-                date_range = date_range * (samples_per_exercise // len(date_range) + 1)
-            
-            # Shuffle and select dates
-            random.shuffle(date_range)
-            workout_dates = sorted(date_range[:samples_per_exercise])
-            
-            # Progressive overload simulation with more realistic progression
-            current_weight = base_weight
-            
-            # Approximate training frequency (workouts per week)
-            workouts_per_week = len(workout_dates) / 26  # 26 weeks in 6 months
-            
-            # Calculate a realistic progression rate (based on 5-10kg per year for most lifts)
-            # This would be roughly 0.1-0.2kg per week, or ~0.05kg per workout
-            progression_per_workout = random.uniform(0.05, 0.1)
-            
-            # Track consecutive workouts with the same weight to simulate plateaus
-            same_weight_count = 0
-            
-            for i in range(samples_per_exercise):
-                # Slow, realistic progression
-                if i > 0:
-                    # Add progressive overload less frequently (15% chance)
-                    if random.random() < 0.15:
-                        # Most increases will be 2.5kg
-                        current_weight += 2.5
-                        same_weight_count = 0
-                    # Small chance (5%) of decreasing weight (deload week)
-                    elif random.random() < 0.05:
-                        current_weight -= 2.5
-                        same_weight_count = 0
-                    else:
-                        # No change in weight
-                        same_weight_count += 1
-                
-                # Simulate plateaus being broken after several workouts at same weight
-                if same_weight_count >= 5 and random.random() < 0.5:
-                    current_weight += 2.5
-                    same_weight_count = 0
-                
-                # Round to nearest 2.5
-                current_weight = round(current_weight / 2.5) * 2.5
-                
-                # Ensure weight doesn't go below a minimum
-                current_weight = max(current_weight, 20)
-                
-                # Generate reps, sets, RIR, RPE with more variation
-                reps = random.randint(3, 12)
-                sets = random.randint(1, 5)
-                rir = random.randint(0, 4) if random.random() < 0.8 else None  # 80% chance of having RIR
-                rpe = round(random.uniform(6, 10), 1) if random.random() < 0.6 else None  # 60% chance of having RPE
-                
-                # Create the data row
-                row = {
-                    "exercise": exercise,
-                    "weight": current_weight,
-                    "reps": reps,
-                    "sets": sets,
-                    "date": workout_dates[i].isoformat(),
-                    "rir": rir,
-                    "rpe": rpe
-                }
-                
-                data_rows.append(row)
+        chunks = list(generate_workouts(num_samples, exercises=exercises, seed=seed))
+        if not chunks:
+            return pd.DataFrame(columns=["exercise", "weight", "reps", "sets", "date", "rir", "rpe"])
         
         # Convert to DataFrame
-        df = pd.DataFrame(data_rows)
+        df = pd.concat(chunks, ignore_index=True)
+        df["exercise"] = df["exercise"].astype(str)
         
         # Sort by date
-        df["date"] = pd.to_datetime(df["date"])
-        df = df.sort_values("date")
+        df["date"] = pd.to_datetime(df["date"].astype(str))
+        df = df.sort_values("date", kind="stable")
         
         return df
     
-    def generate_and_save_mock_data(self, num_samples: int = 100, exercises: Optional[List[str]] = None) -> str:
+    def generate_and_save_mock_data(self, 
+                                    num_samples: int = 100, 
+                                    exercises: Optional[List[str]] = None,
+                                    users: int = 1,
+                                    seed: Optional[int] = None,
+                                    chunksize: int = 100000) -> str:
         """
         Generate mock data and save it to the pretraining data file.
         
+        Data is generated and written in chunks of whole users, so memory use
+        is bounded by `chunksize` rather than `num_samples`.
+        
         Args:
             num_samples: Number of samples to generate
             exercises: List of exercises to generate data for
+            users: Number of simulated users
+            seed: Random seed for reproducible data
+            chunksize: Approximate number of rows generated and written at a time
             
         Returns:
             Path to the saved file
         """
-        df = self.generate_mock_data(num_samples, exercises)
+        self.clear_dataset(is_pretraining=True)
         
-        # Save to CSV
-        df.to_csv(self.pretraining_data_path, index=False)
+        total = 0
+        for chunk in generate_workouts(num_samples, exercises=exercises, users=users, seed=seed, chunksize=chunksize):
+            if self.store is not None:
+                self.store.append(chunk.astype({"exercise": str, "date": str}), dataset=PRETRAINING_DATASET)
+            else:
+                # Save to CSV
+                chunk.to_csv(self.pretraining_data_path, mode='a', header=total == 0, index=False)
+            total += len(chunk)
         
-        print(f"Generated {len(df)} mock workout records and saved to {self.pretraining_data_path}")
-        return self.pretraining_data_path
+        target_path = self._storage_location(is_pretraining=True)
+        print(f"Generated {total} mock workout records and saved to {target_path}")
+        return target_path
     
-    def load_training_data(self, include_pretraining: bool = True) -> pd.DataFrame:
+    def generate_mock_shards(self, 
+                             output_dir: Optional[str] = None,
+                             num_samples: int = 100,
+                             exercises: Optional[List[str]] = None,
+                             users: int = 1,
+                             seed: Optional[int] = None,
+                             shards: Optional[int] = None,
+                             workers: Optional[int] = None,
+                             chunksize: int = 100000) -> str:
         """
-        Load training data from CSV files.
+        Generate mock data as CSV shards using a pool of worker processes.
+        
+        Each shard holds a disjoint set of simulated users and has its own
+        reproducible seed stream. A manifest.json next to the shards lists
+        them and can be passed to the import command.
+        
+        Args:
+            output_dir: Directory for the shards (default: datasets/synthetic)
+            num_samples: Number of samples to generate
+            exercises: List of exercises to generate data for
+            users: Number of simulated users
+            seed: Random seed for reproducible data
+            shards: Number of shard files (default: number of workers)
+            workers: Number of worker processes (default: CPU count)
+            chunksize: Approximate number of rows generated and written at a time
+            
+        Returns:
+            Path to the manifest file
+        """
+        output_dir = output_dir or os.path.join(self.datasets_dir, "synthetic")
+        manifest = generate_shards(output_dir, num_samples, exercises=exercises, users=users, seed=seed,
+                                   shards=shards, workers=workers, chunksize=chunksize)
+        
+        manifest_path = os.path.join(output_dir, "manifest.json")
+        print(f"Generated {manifest['num_samples']} mock workout records in {len(manifest['shards'])} shards, "
+              f"manifest saved to {manifest_path}")
+        return manifest_path
+    
+    def load_training_data(self, 
+                           include_pretraining: bool = True,
+                           exercise: Optional[str] = None,
+                           since: Any = None,
+                           until: Any = None,
+                           user: Optional[str] = None,
+                           columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load training data, optionally restricted to matching workouts.
+        
+        Filters are applied while reading: stores push them into their
+        queries and partition pruning, and the CSV dataset cache reads only
+        the matching rows of its exercise index.
         
         Args:
             include_pretraining: Whether to include pretraining data
+            exercise: Load workouts of this exercise (or list of exercises) only
+            since: Load workouts on or after this date
+            until: Load workouts on or before this date
+            user: Load workouts of this user only
+            columns: Columns to return (default: all columns)
             
         Returns:
             DataFrame containing the loaded data
         """
+        filters = dict(exercise=exercise, since=since, until=until, user=user)
+        
+        if self.store is not None:
+            datasets = [TRAINING_DATASET, PRETRAINING_DATASET] if include_pretraining else [TRAINING_DATASET]
+            df = self.store.load(datasets=datasets, columns=columns, **filters)
+            if df.empty:
+                print("No data found in the workout store.")
+                return pd.DataFrame()
+            print(f"Loaded {len(df)} records from {self._storage_location()}")
+            return df
+        
         # Initialize an empty list to store DataFrames
         dfs = []
         
         # Load training data if it exists
         if os.path.isfile(self.training_data_path):
             try:
-                training_df = pd.read_csv(self.training_data_path)
+                training_df = self._read_dataset_csv(self.training_data_path, columns=columns, **filters)
                 print(f"Loaded {len(training_df)} records from {self.training_data_path}")
                 dfs.append(training_df)
             except Exception as e:
@@ -337,7 +427,7 @@ class DataCollector:
         # Load pretraining data if requested and it exists
         if include_pretraining and os.path.isfile(self.pretraining_data_path):
             try:
-                pretraining_df = pd.read_csv(self.pretraining_data_path)
+                pretraining_df = self._read_dataset_csv(self.pretraining_data_path, columns=columns, **filters)
                 print(f"Loaded {len(pretraining_df)} records from {self.pretraining_data_path}")
                 dfs.append(pretraining_df)
             except Exception as e:
@@ -349,81 +439,507 @@ class DataCollector:
             
             # Convert date column to datetime
             if "date" in combined_df.columns:
-                combined_df["date"] = pd.to_datetime(combined_df["date"])
-                combined_df = combined_df.sort_values("date")
+                combined_df["date"] = parse_dates(combined_df["date"])
+                combined_df = combined_df.sort_values("date", kind="stable")
             
             return combined_df
         else:
             print("No data files found or all files were empty.")
             return pd.DataFrame()
     
+    def load_features(self, 
+                      include_pretraining: bool = True,
+                      windows=FEATURE_WINDOWS,
+                      build: bool = True,
+                      rebuild: bool = False) -> Optional[FeatureStore]:
+        """
+        Load the feature store of the training data, rebuilding it when the data changed.
+        
+        The store is cached under datasets/.cache/features and tagged with the
+        size and mtime of the storage files, so it is only recomputed after
+        the workouts were modified.
+        
+        Args:
+            include_pretraining: Whether to include pretraining data
+            windows: Rolling window lengths in sessions
+            build: Whether to build a missing or stale store (otherwise return None)
+            rebuild: Recompute the store even if the cached one is current
+            
+        Returns:
+            The feature store, or None if it is not cached and `build` is False
+        """
+        directory = os.path.join(self.features_dir, "all" if include_pretraining else "training")
+        signature = self._dataset_signature(include_pretraining, windows)
+        store = None if rebuild else FeatureStore.load(directory, signature)
+        if store is not None or not (build or rebuild):
+            return store
+        
+        workouts = self.load_training_data(include_pretraining=include_pretraining)
+        store = FeatureStore.build(workouts, windows)
+        if len(store):
+            try:
+                store.save(directory, signature)
+            except OSError as e:
+                print(f"Warning: Could not cache features in {directory} ({e})")
+        return store
+    
+    def _dataset_signature(self, include_pretraining: bool, windows) -> str:
+        """Fingerprint the storage files (paths, sizes, mtimes) and feature windows."""
+        if self.backend == "csv":
+            paths = [self.training_data_path] + ([self.pretraining_data_path] if include_pretraining else [])
+        else:
+            paths = [self._storage_location()]
+        
+        stamps = []
+        for path in paths:
+            if os.path.isdir(path):
+                files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+            else:
+                # SQLite keeps recent writes in its -wal file
+                files = [path, f"{path}-wal"] if self.backend == "sqlite" else [path]
+            for file_path in files:
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                stamps.append([file_path, stat.st_size, stat.st_mtime_ns])
+        payload = json.dumps({"backend": self.backend, "files": stamps, "windows": list(windows)})
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def list_exercises(self, include_pretraining: bool = True, user: Optional[str] = None) -> List[str]:
+        """
+        List the exercises in the training data without loading the workouts.
+        
+        Args:
+            include_pretraining: Whether to include pretraining data
+            user: Restrict to this user's workouts
+            
+        Returns:
+            Exercise names
+        """
+        if self.store is not None:
+            datasets = [TRAINING_DATASET, PRETRAINING_DATASET] if include_pretraining else [TRAINING_DATASET]
+            return self.store.exercises(datasets=datasets, user=user)
+        
+        file_paths = [self.training_data_path]
+        if include_pretraining:
+            file_paths.append(self.pretraining_data_path)
+        
+        exercises = []
+        for file_path in file_paths:
+            if not os.path.isfile(file_path) or os.path.getsize(file_path) == 0:
+                continue
+            df = self._read_dataset_csv(file_path, user=user, columns=["exercise"])
+            exercises.extend(name for name in df["exercise"].dropna().unique() if name not in exercises)
+        return exercises
+    
+    def _read_dataset_csv(self, 
+                          file_path: str,
+                          exercise: Optional[str] = None,
+                          since: Any = None,
+                          until: Any = None,
+                          user: Optional[str] = None,
+                          columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read a dataset CSV file, through the dataset cache when enabled.
+        
+        Files that cannot be cached (e.g. with columns outside the workout
+        schema) are read directly and filtered after reading.
+        
+        Args:
+            file_path: Path to the CSV file
+            exercise: Keep workouts of this exercise only
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all columns)
+            
+        Returns:
+            DataFrame containing the file's matching workouts
+        """
+        filters = dict(exercise=exercise, since=since, until=until, user=user)
+        if self.dataset_cache is not None:
+            try:
+                return self.dataset_cache.load(file_path, columns=columns, **filters)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: Dataset cache unavailable for {file_path} ({e}); reading CSV directly")
+        
+        df = filter_workouts(pd.read_csv(file_path), **filters)
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df
+    
     def import_from_csv(self, file_path: str, is_pretraining: bool = False) -> pd.DataFrame:
         """
-        Import workout data from an external CSV file.
+        Import workout data from an external CSV file, replacing the dataset.
+        
+        Kept for compatibility: this runs `import_from_csv_streaming` with
+        `replace=True` and no de-duplication, then loads the imported dataset.
         
         Args:
             file_path: Path to the CSV file to import
             is_pretraining: Whether to save as pretraining data
             
         Returns:
-            DataFrame containing the imported data
+            DataFrame containing the imported data (empty on error)
         """
-        try:
-            # Load the CSV file
-            df = pd.read_csv(file_path)
-            
-            # Check required columns
-            required_columns = ["exercise", "weight", "reps"]
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                print(f"Error: Missing required columns: {', '.join(missing_columns)}")
-                return pd.DataFrame()
+        if self.import_from_csv_streaming(file_path, is_pretraining=is_pretraining, dedup=False, replace=True) is None:
+            return pd.DataFrame()
+        chunks = list(self.iter_dataset_chunks(is_pretraining))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=WORKOUT_COLUMNS)
+    
+    def import_from_csv_streaming(self, 
+                                  file_path: str, 
+                                  is_pretraining: bool = False,
+                                  chunksize: int = 100000,
+                                  dedup: bool = True,
+                                  replace: bool = False) -> Optional[Dict[str, int]]:
+        """
+        Import workout data from an external CSV file in constant memory.
+        
+        The file is read in chunks; each chunk is validated and coerced to
+        the storage schema and appended to the target dataset. Rows whose
+        (exercise, date, weight, reps, sets) already exist in the dataset or
+        earlier in the file are skipped when `dedup` is set.
+        
+        The file is opened and its columns are checked before anything is
+        changed. With `replace`, CSV datasets are imported into a temporary
+        file that replaces the dataset only once the import succeeded; stores
+        are cleared after that check.
+        
+        Args:
+            file_path: Path to the CSV file to import
+            is_pretraining: Whether to save as pretraining data
+            chunksize: Number of rows to read per chunk
+            dedup: Whether to drop duplicate rows
+            replace: Whether to replace the target dataset instead of appending to it
             
-            # Ensure date column exists and is in the correct format
-            if "date" not in df.columns:
-                print("Warning: No date column found. Using current date for all entries.")
-                df["date"] = datetime.now().date().isoformat()
+        Returns:
+            Dictionary with read/imported/duplicates/invalid row counts, or None on error
+        """
+        temp_path = None
+        try:
+            reader = pd.read_csv(file_path, chunksize=chunksize)
+            first = next(reader, None)
+            if first is None:
+                raise ValueError("No columns to parse from file")
+            missing = [col for col in REQUIRED_COLUMNS if col not in first.columns]
+            if missing:
+                raise ValueError(f"Missing required columns: {', '.join(missing)}")
+            chunks = itertools.chain([first], reader)
+            
+            if replace and self.store is None:
+                target = self.pretraining_data_path if is_pretraining else self.training_data_path
+                temp_path = f"{target}.importing"
+                if os.path.isfile(temp_path):
+                    os.remove(temp_path)
+                append = lambda df: self._append_csv(df, temp_path)
+            else:
+                if replace:
+                    self.clear_dataset(is_pretraining)
+                append = lambda df: self.append_workouts(df, is_pretraining)
             
-            # Convert date to datetime
-            df["date"] = pd.to_datetime(df["date"])
+            existing_chunks = self.iter_dataset_chunks(is_pretraining, chunksize) if dedup and not replace else None
+            stats = stream_import(chunks, append=append, existing_chunks=existing_chunks, dedup=dedup)
             
-            # Save to the appropriate file
-            target_path = self.pretraining_data_path if is_pretraining else self.training_data_path
-            df.to_csv(target_path, index=False)
+            if temp_path is not None:
+                if os.path.isfile(temp_path):
+                    os.replace(temp_path, target)
+                else:
+                    self.clear_dataset(is_pretraining)
             
-            print(f"Imported {len(df)} records from {file_path} and saved to {target_path}")
-            return df
+            target_path = self._storage_location(is_pretraining)
+            print(f"Imported {stats['imported']} of {stats['read']} records from {file_path} into {target_path} "
+                  f"({stats['duplicates']} duplicates, {stats['invalid']} invalid rows skipped)")
+            return stats
             
         except Exception as e:
+            if temp_path is not None and os.path.isfile(temp_path):
+                os.remove(temp_path)
             print(f"Error importing data: {e}")
-            return pd.DataFrame()
+            return None
     
-    def export_to_csv(self, file_path: str, include_pretraining: bool = True) -> bool:
+    def iter_dataset_chunks(self, is_pretraining: bool = False, chunksize: int = 100000) -> Iterator[pd.DataFrame]:
         """
-        Export the current training data to a CSV file.
+        Stream the stored workouts of one dataset in chunks.
         
         Args:
-            file_path: Path to save the CSV file
+            is_pretraining: Whether to read the pretraining dataset
+            chunksize: Maximum rows per chunk
+            
+        Yields:
+            DataFrames of at most `chunksize` rows
+        """
+        if self.store is not None:
+            dataset = PRETRAINING_DATASET if is_pretraining else TRAINING_DATASET
+            yield from self.store.iter_chunks(datasets=[dataset], chunksize=chunksize)
+            return
+        
+        file_path = self.pretraining_data_path if is_pretraining else self.training_data_path
+        if os.path.isfile(file_path) and os.path.getsize(file_path) > 0:
+            yield from pd.read_csv(file_path, chunksize=chunksize)
+    
+    def append_workouts(self, df: pd.DataFrame, is_pretraining: bool = False) -> int:
+        """
+        Append a DataFrame of workouts to a dataset.
+        
+        For CSV files the existing header is kept, so appended rows line up
+        with the columns already in the file.
+        
+        Args:
+            df: Workouts to append
+            is_pretraining: Whether to append to the pretraining dataset
+            
+        Returns:
+            Number of rows appended
+        """
+        if df.empty:
+            return 0
+        
+        if self.store is not None:
+            dataset = PRETRAINING_DATASET if is_pretraining else TRAINING_DATASET
+            return self.store.append(df, dataset=dataset)
+        
+        file_path = self.pretraining_data_path if is_pretraining else self.training_data_path
+        return self._append_csv(df, file_path)
+    
+    def _append_csv(self, df: pd.DataFrame, file_path: str) -> int:
+        """Append workouts to a CSV file, keeping its existing header."""
+        file_exists = os.path.isfile(file_path) and os.path.getsize(file_path) > 0
+        
+        if file_exists:
+            with open(file_path, newline='') as file:
+                columns = next(csv.reader(file))
+        else:
+            columns = WORKOUT_COLUMNS
+        
+        rows = coerce_workouts(df)
+        rows["date"] = rows["date"].str.replace("T00:00:00", "", regex=False)
+        rows.reindex(columns=columns).to_csv(file_path, mode='a', header=not file_exists, index=False)
+        return len(rows)
+    
+    def clear_dataset(self, is_pretraining: bool = False) -> None:
+        """
+        Remove all stored workouts of one dataset.
+        
+        Args:
+            is_pretraining: Whether to clear the pretraining dataset
+        """
+        if self.store is not None:
+            dataset = PRETRAINING_DATASET if is_pretraining else TRAINING_DATASET
+            self.store.replace([], dataset=dataset)
+            return
+        
+        file_path = self.pretraining_data_path if is_pretraining else self.training_data_path
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+    
+    def iter_workouts(self, 
+                      include_pretraining: bool = True,
+                      exercise: Optional[str] = None,
+                      since: Any = None,
+                      until: Any = None,
+                      user: Optional[str] = None,
+                      chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Stream matching workouts in chunks.
+        
+        Stores and the dataset cache apply the filters before rows are read
+        and yield each dataset in date order; plain CSV files are read in
+        chunks and filtered as they go.
+        
+        Args:
+            include_pretraining: Whether to include pretraining data
+            exercise: Keep workouts of this exercise only
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            chunksize: Maximum rows per chunk
+            
+        Yields:
+            DataFrames of at most `chunksize` rows
+        """
+        filters = dict(exercise=exercise, since=since, until=until, user=user)
+        
+        if self.store is not None:
+            datasets = [TRAINING_DATASET, PRETRAINING_DATASET] if include_pretraining else [TRAINING_DATASET]
+            yield from self.store.iter_chunks(datasets=datasets, chunksize=chunksize, **filters)
+            return
+        
+        file_paths = [self.training_data_path]
+        if include_pretraining:
+            file_paths.append(self.pretraining_data_path)
+        
+        for file_path in file_paths:
+            if not os.path.isfile(file_path) or os.path.getsize(file_path) == 0:
+                continue
+            if self.dataset_cache is not None:
+                try:
+                    yield from self.dataset_cache.iter_chunks(file_path, chunksize=chunksize, **filters)
+                    continue
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Warning: Dataset cache unavailable for {file_path} ({e}); reading CSV directly")
+            for chunk in pd.read_csv(file_path, chunksize=chunksize):
+                chunk = filter_workouts(chunk, **filters)
+                if not chunk.empty:
+                    yield chunk
+    
+    def export_data(self, 
+                    file_path: str, 
+                    include_pretraining: bool = True,
+                    fmt: Optional[str] = None,
+                    compression: Optional[str] = None,
+                    exercise: Optional[str] = None,
+                    since: Any = None,
+                    until: Any = None,
+                    chunksize: int = 100000) -> bool:
+        """
+        Export training data, streaming it to the file in chunks.
+        
+        Args:
+            file_path: Path to save the exported data
             include_pretraining: Whether to include pretraining data
+            fmt: 'csv', 'ndjson' or 'parquet' (default: from the file extension, else CSV)
+            compression: 'none', 'gzip' or 'zstd' (default: from the file extension)
+            exercise: Export workouts of this exercise only
+            since: Export workouts on or after this date
+            until: Export workouts on or before this date
+            chunksize: Number of rows read and written at a time
             
         Returns:
             True if export was successful, False otherwise
         """
         try:
-            # Load the data
-            df = self.load_training_data(include_pretraining=include_pretraining)
-            
-            if df.empty:
+            fmt, compression = infer_export_options(file_path, fmt, compression)
+            chunks = self.iter_workouts(include_pretraining=include_pretraining, exercise=exercise,
+                                        since=since, until=until, chunksize=chunksize)
+            
+            if fmt != "parquet":
+                # Text formats get plain dates, with a time only where one was recorded
+                chunks = (chunk.assign(date=format_dates(parse_dates(chunk["date"]))
+                                       .str.replace("T00:00:00", "", regex=False))
+                          if "date" in chunk.columns else chunk
+                          for chunk in chunks)
+            
+            rows = export_chunks(chunks, file_path, fmt=fmt, compression=compression,
+                                 columns=self._export_columns(include_pretraining))
+            
+            if rows == 0:
+                if os.path.isfile(file_path):
+                    os.remove(file_path)
                 print("No data to export.")
                 return False
             
-            # Save to CSV
-            df.to_csv(file_path, index=False)
-            
-            print(f"Exported {len(df)} records to {file_path}")
+            print(f"Exported {rows} records to {file_path}")
             return True
             
         except Exception as e:
             print(f"Error exporting data: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _export_columns(self, include_pretraining: bool) -> List[str]:
+        """Columns of an export: the store schema, or the union of the CSV headers in file order."""
+        if self.store is not None:
+            return list(WORKOUT_COLUMNS)
+        
+        file_paths = [self.training_data_path]
+        if include_pretraining:
+            file_paths.append(self.pretraining_data_path)
+        
+        columns: List[str] = []
+        for file_path in file_paths:
+            if os.path.isfile(file_path) and os.path.getsize(file_path) > 0:
+                header = pd.read_csv(file_path, nrows=0).columns
+                columns.extend(col for col in header if col not in columns)
+        return columns
+    
+    def export_to_csv(self, file_path: str, include_pretraining: bool = True) -> bool:
+        """
+        Export the current training data to a CSV file.
+        
+        Args:
+            file_path: Path to save the CSV file
+            include_pretraining: Whether to include pretraining data
+            
+        Returns:
+            True if export was successful, False otherwise
+        """
+        return self.export_data(file_path, include_pretraining=include_pretraining, fmt="csv")
+    
+    def compact_storage(self) -> Optional[Dict[str, int]]:
+        """
+        Compact the partitioned store, merging writer segments into sorted data files.
+        
+        Returns:
+            Dictionary with the number of compacted partitions and merged
+            segments, or None if the backend does not need compaction
+        """
+        if not hasattr(self.store, "compact"):
+            print(f"The {self.backend} storage backend does not need compaction.")
+            return None
+        
+        stats = self.store.compact()
+        print(f"Compacted {stats['partitions']} partitions, merging {stats['segments']} segments "
+              f"in {self._storage_location()}")
+        return stats
+    
+    def migrate_storage(self, target: str, source: str = "csv", chunksize: int = 100000) -> Dict[str, int]:
+        """
+        Copy the training and pretraining datasets from one backend to another.
+        
+        Data is streamed in chunks and the source is left in place. Both
+        datasets in the target are replaced (cleared when the source has no
+        data for them), so the migration can be re-run safely.
+        
+        Args:
+            target: Backend to copy the data to ('csv', 'sqlite', 'parquet' or 'partitioned')
+            source: Backend to copy the data from (default: 'csv')
+            chunksize: Number of rows to read and write at a time
+            
+        Returns:
+            Dictionary with the number of migrated rows per dataset
+        """
+        if source == target:
+            raise ValueError("Source and target storage backends must differ")
+        for backend in (source, target):
+            if backend not in STORAGE_BACKENDS:
+                raise ValueError(f"Unknown storage backend: {backend}")
+        
+        source_store = self.store if source == self.backend else self._open_store(source)
+        target_store = self.store if target == self.backend else self._open_store(target)
+        migrated = {}
+        
+        for dataset, csv_path in ((TRAINING_DATASET, self.training_data_path),
+                                  (PRETRAINING_DATASET, self.pretraining_data_path)):
+            # Read the dataset from the source backend in chunks
+            if source_store is None:
+                has_data = os.path.isfile(csv_path) and os.path.getsize(csv_path) > 0
+                chunks = pd.read_csv(csv_path, chunksize=chunksize) if has_data else iter(())
+            else:
+                chunks = source_store.iter_chunks(datasets=[dataset], chunksize=chunksize)
+            
+            # Write the chunks to the target backend, replacing what it held
+            migrated[dataset] = 0
+            if target_store is None:
+                if os.path.isfile(csv_path):
+                    os.remove(csv_path)
+                for i, chunk in enumerate(chunks):
+                    chunk.to_csv(csv_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+                    migrated[dataset] += len(chunk)
+                target_path = csv_path
+            else:
+                target_store.replace([], dataset=dataset)
+                for chunk in chunks:
+                    migrated[dataset] += target_store.append(chunk, dataset=dataset)
+                target_path = {"sqlite": self.sqlite_path, "parquet": self.parquet_dir,
+                               "partitioned": self.partitioned_dir}[target]
+                if hasattr(target_store, "seal"):
+                    # Make the migrated segments available to compaction right away
+                    target_store.seal()
+            
+            print(f"Migrated {migrated[dataset]} {dataset} records from {source} to {target_path}")
+        
+        if not any(migrated.values()):
+            print(f"No {source} data found to migrate.")
+        
+        return migrated
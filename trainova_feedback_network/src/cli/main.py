@@ -7,6 +7,10 @@ import argparse
 from typing import List, Optional
 
 from .commands import CommandHandler
+from .daemon import CLIDaemon, daemon_status, default_socket_path, start_daemon, stop_daemon
+from .data_collection import STORAGE_BACKENDS
+from ..prediction.sweep import OBJECTIVES, SWEEP_PARAMETERS
+from ..storage.exporter import COMPRESSIONS, EXPORT_FORMATS
 
 def create_parser() -> argparse.ArgumentParser:
     """
@@ -22,6 +26,13 @@ def create_parser() -> argparse.ArgumentParser:
         epilog="Use 'trainova COMMAND --help' for more information about a specific command."
     )
     
+    parser.add_argument(
+        "--storage",
+        type=str,
+        choices=STORAGE_BACKENDS,
+        help="Storage backend for workout data (default: $TRAINOVA_STORAGE or csv)"
+    )
+    
     # Create subparsers for different commands
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
     
@@ -46,10 +57,21 @@ def create_parser() -> argparse.ArgumentParser:
         type=str,
         help="Comma-separated list of exercises to generate data for"
     )
+    pretrain_parser.add_argument(
+        "--users", 
+        type=int, 
+        default=1,
+        help="Number of simulated users for mock data (default: 1)"
+    )
+    pretrain_parser.add_argument(
+        "--seed", 
+        type=int,
+        help="Random seed for reproducible mock data"
+    )
     pretrain_parser.add_argument(
         "--import-file", 
         type=str,
-        help="Import data from a CSV file for pretraining"
+        help="Import a CSV file (or generate manifest) into the pretraining data, skipping duplicate rows"
     )
     
     # Collect command
@@ -78,6 +100,11 @@ def create_parser() -> argparse.ArgumentParser:
         type=str,
         help="Specify the exercise type for the session"
     )
+    interactive_parser.add_argument(
+        "--user", 
+        type=str,
+        help="Only use workouts of this user"
+    )
     
     # Predict command
     predict_parser = subparsers.add_parser(
@@ -94,6 +121,173 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Show detailed debugging information about the prediction process"
     )
+    predict_parser.add_argument(
+        "--user", 
+        type=str,
+        help="Only use workouts of this user"
+    )
+    
+    # Batch predict command
+    predict_all_parser = subparsers.add_parser(
+        "predict-all", 
+        help="Predict the next workout for every exercise and user"
+    )
+    predict_all_parser.add_argument(
+        "--output", 
+        type=str,
+        help="File path for the predictions (default: predictions_<timestamp>.csv)"
+    )
+    predict_all_parser.add_argument(
+        "--format", 
+        type=str,
+        choices=["csv", "ndjson"],
+        help="Output format (default: from the file extension, else csv)"
+    )
+    predict_all_parser.add_argument(
+        "--compression", 
+        type=str,
+        choices=COMPRESSIONS,
+        help="Output compression (default: from the file extension, else none)"
+    )
+    predict_all_parser.add_argument(
+        "--workers", 
+        type=int,
+        help="Number of worker processes (default: CPU count)"
+    )
+    predict_all_parser.add_argument(
+        "--batch-size", 
+        type=int,
+        default=256,
+        help="Number of exercise series predicted per task (default: 256)"
+    )
+    predict_all_parser.add_argument(
+        "--user", 
+        type=str,
+        help="Only predict for this user"
+    )
+    
+    # Backtest command
+    backtest_parser = subparsers.add_parser(
+        "backtest", 
+        help="Replay workout histories and measure prediction accuracy"
+    )
+    backtest_parser.add_argument(
+        "--exercise", 
+        type=str,
+        help="Only backtest this exercise"
+    )
+    backtest_parser.add_argument(
+        "--user", 
+        type=str,
+        help="Only backtest this user's workouts"
+    )
+    backtest_parser.add_argument(
+        "--min-history", 
+        type=int,
+        default=1,
+        help="Only score predictions made from at least this many workouts (default: 1)"
+    )
+    backtest_parser.add_argument(
+        "--exclude-pretraining", 
+        action="store_true",
+        help="Exclude pretraining data from the backtest"
+    )
+    backtest_parser.add_argument(
+        "--output", 
+        type=str,
+        help="Also write the results to this CSV file"
+    )
+    
+    # Features command
+    features_parser = subparsers.add_parser(
+        "features", 
+        help="Build the cached per-workout feature store (rolling averages, trends, 1RM)"
+    )
+    features_parser.add_argument(
+        "--rebuild", 
+        action="store_true",
+        help="Recompute the features even if the cache is current"
+    )
+    features_parser.add_argument(
+        "--exclude-pretraining", 
+        action="store_true",
+        help="Exclude pretraining data"
+    )
+    features_parser.add_argument(
+        "--output", 
+        type=str,
+        help="Also export the feature matrix to this file (csv, ndjson or parquet)"
+    )
+    features_parser.add_argument(
+        "--format", 
+        type=str,
+        choices=["csv", "ndjson", "parquet"],
+        help="Output format (default: inferred from --output)"
+    )
+    
+    # Sweep command
+    sweep_parser = subparsers.add_parser(
+        "sweep", 
+        help="Backtest a grid or random search of model parameters and rank them"
+    )
+    sweep_parser.add_argument(
+        "--param", 
+        type=str,
+        action="append",
+        default=[],
+        help="Parameter values as NAME=V1,V2,... or a range NAME=LOW:HIGH for --trials (repeatable). "
+             f"Parameters: {', '.join(SWEEP_PARAMETERS)}"
+    )
+    sweep_parser.add_argument(
+        "--trials", 
+        type=int,
+        help="Run a random search with this many trials instead of the full grid"
+    )
+    sweep_parser.add_argument(
+        "--seed", 
+        type=int,
+        help="Random seed for --trials"
+    )
+    sweep_parser.add_argument(
+        "--objective", 
+        type=str,
+        choices=OBJECTIVES,
+        default="mae",
+        help="Ranking metric (default: mae)"
+    )
+    sweep_parser.add_argument(
+        "--feedback", 
+        action="store_true",
+        help="Simulate feedback after every prediction (needed to tune feedback_influence; slower)"
+    )
+    sweep_parser.add_argument(
+        "--workers", 
+        type=int,
+        help="Number of worker processes (default: CPU count)"
+    )
+    sweep_parser.add_argument(
+        "--min-history", 
+        type=int,
+        default=1,
+        help="Only score predictions made from at least this many workouts (default: 1)"
+    )
+    sweep_parser.add_argument(
+        "--exercise", 
+        type=str,
+        help="Only use this exercise"
+    )
+    sweep_parser.add_argument(
+        "--output", 
+        type=str,
+        default="sweep_results.csv",
+        help="File path for the ranked results (default: sweep_results.csv)"
+    )
+    sweep_parser.add_argument(
+        "--top", 
+        type=int,
+        default=10,
+        help="Number of best trials to print (default: 10)"
+    )
     
     # Reset command
     reset_parser = subparsers.add_parser(
@@ -103,7 +297,7 @@ def create_parser() -> argparse.ArgumentParser:
     reset_parser.add_argument(
         "--type", 
         type=str, 
-        choices=["all", "feedback", "weights", "scalers"],
+        choices=["all", "feedback", "weights", "calibration", "scalers"],
         default="all",
         help="Type of reset to perform (default: all)"
     )
@@ -116,7 +310,7 @@ def create_parser() -> argparse.ArgumentParser:
     # Export command
     export_parser = subparsers.add_parser(
         "export", 
-        help="Export training data to a CSV file"
+        help="Export training data to a CSV, NDJSON or Parquet file"
     )
     export_parser.add_argument(
         "--file", 
@@ -128,6 +322,39 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Exclude pretraining data from the export"
     )
+    export_parser.add_argument(
+        "--format", 
+        type=str,
+        choices=EXPORT_FORMATS,
+        help="Output format (default: from the file extension, else csv)"
+    )
+    export_parser.add_argument(
+        "--compression", 
+        type=str,
+        choices=COMPRESSIONS,
+        help="Output compression (default: from the file extension, else none)"
+    )
+    export_parser.add_argument(
+        "--exercise", 
+        type=str,
+        help="Export workouts of this exercise only"
+    )
+    export_parser.add_argument(
+        "--since", 
+        type=str,
+        help="Export workouts on or after this date (YYYY-MM-DD)"
+    )
+    export_parser.add_argument(
+        "--until", 
+        type=str,
+        help="Export workouts on or before this date (YYYY-MM-DD)"
+    )
+    export_parser.add_argument(
+        "--chunksize", 
+        type=int,
+        default=100000,
+        help="Number of rows written per chunk (default: 100000)"
+    )
     
     # Import command
     import_parser = subparsers.add_parser(
@@ -137,13 +364,121 @@ def create_parser() -> argparse.ArgumentParser:
     import_parser.add_argument(
         "file", 
         type=str,
-        help="File path of the CSV file to import"
+        help="File path of the CSV file (or shard manifest.json) to import"
     )
     import_parser.add_argument(
         "--pretraining", 
         action="store_true",
         help="Save imported data as pretraining data"
     )
+    import_parser.add_argument(
+        "--replace", 
+        action="store_true",
+        help="Replace the existing dataset instead of appending to it"
+    )
+    import_parser.add_argument(
+        "--no-dedup", 
+        action="store_true",
+        help="Keep rows that duplicate existing workouts"
+    )
+    import_parser.add_argument(
+        "--chunksize", 
+        type=int,
+        default=100000,
+        help="Number of rows to read per chunk (default: 100000)"
+    )
+    
+    # Migrate command
+    migrate_parser = subparsers.add_parser(
+        "migrate", 
+        help="Copy the datasets between storage backends (e.g. CSV to SQLite or Parquet)"
+    )
+    migrate_parser.add_argument(
+        "--to", 
+        type=str,
+        choices=STORAGE_BACKENDS,
+        default="sqlite",
+        help="Target storage backend (default: sqlite)"
+    )
+    migrate_parser.add_argument(
+        "--from", 
+        dest="source",
+        type=str,
+        choices=STORAGE_BACKENDS,
+        default="csv",
+        help="Source storage backend (default: csv)"
+    )
+    
+    # Compact command
+    compact_parser = subparsers.add_parser(
+        "compact", 
+        help="Merge writer segments of the partitioned store into sorted, indexed files"
+    )
+    compact_parser.add_argument(
+        "--watch", 
+        type=float,
+        help="Keep compacting every N seconds until interrupted"
+    )
+    
+    # Generate command
+    generate_parser = subparsers.add_parser(
+        "generate", 
+        help="Generate a large synthetic dataset as CSV shards in parallel"
+    )
+    generate_parser.add_argument(
+        "--samples", 
+        type=int, 
+        default=100000,
+        help="Number of mock samples to generate (default: 100000)"
+    )
+    generate_parser.add_argument(
+        "--users", 
+        type=int, 
+        default=100,
+        help="Number of simulated users (default: 100)"
+    )
+    generate_parser.add_argument(
+        "--exercises", 
+        type=str,
+        help="Comma-separated list of exercises to generate data for"
+    )
+    generate_parser.add_argument(
+        "--seed", 
+        type=int,
+        help="Random seed for reproducible data"
+    )
+    generate_parser.add_argument(
+        "--shards", 
+        type=int,
+        help="Number of shard files (default: number of workers)"
+    )
+    generate_parser.add_argument(
+        "--workers", 
+        type=int,
+        help="Number of worker processes (default: CPU count)"
+    )
+    generate_parser.add_argument(
+        "--output-dir", 
+        type=str,
+        help="Directory for the shards and manifest (default: data/datasets/synthetic)"
+    )
+    
+    # Daemon command
+    daemon_parser = subparsers.add_parser(
+        "daemon", 
+        help="Manage a background daemon that keeps data and model loaded for fast CLI calls"
+    )
+    daemon_parser.add_argument(
+        "action", 
+        type=str,
+        choices=["start", "stop", "status", "run"],
+        help="start/stop the background daemon, show its status, or run it in the foreground"
+    )
+    daemon_parser.add_argument(
+        "--socket", 
+        type=str,
+        help="Unix socket path (default: $TRAINOVA_DAEMON_SOCKET or data/trainova.sock)"
+    )
     
     return parser
 
@@ -166,9 +501,27 @@ def main(args: Optional[List[str]] = None) -> int:
         parser.print_help()
         return 1
     
+    # Daemon management runs without a command handler
+    if parsed_args.command == "daemon":
+        return handle_daemon(parsed_args)
+    
     # Create command handler
-    handler = CommandHandler()
+    handler = CommandHandler(storage=parsed_args.storage)
     
+    return run_command(handler, parsed_args, parser)
+
+def run_command(handler: CommandHandler, parsed_args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    """
+    Route parsed arguments to the matching command handler method.
+    
+    Args:
+        handler: Command handler to run the command with
+        parsed_args: Parsed command-line arguments
+        parser: Parser used, for printing help
+        
+    Returns:
+        Exit code (0 for success, non-zero for errors)
+    """
     try:
         # Route command to the appropriate handler
         if parsed_args.command == "pretrain":
@@ -179,12 +532,26 @@ def main(args: Optional[List[str]] = None) -> int:
             handler.handle_interactive_training(parsed_args)
         elif parsed_args.command == "predict":
             handler.handle_predict(parsed_args)
+        elif parsed_args.command == "predict-all":
+            handler.handle_predict_all(parsed_args)
+        elif parsed_args.command == "backtest":
+            handler.handle_backtest(parsed_args)
+        elif parsed_args.command == "features":
+            handler.handle_features(parsed_args)
+        elif parsed_args.command == "sweep":
+            handler.handle_sweep(parsed_args)
         elif parsed_args.command == "reset":
             handler.handle_reset(parsed_args)
         elif parsed_args.command == "export":
             handler.handle_export(parsed_args)
         elif parsed_args.command == "import":
             handler.handle_import(parsed_args)
+        elif parsed_args.command == "migrate":
+            handler.handle_migrate(parsed_args)
+        elif parsed_args.command == "compact":
+            handler.handle_compact(parsed_args)
+        elif parsed_args.command == "generate":
+            handler.handle_generate(parsed_args)
         else:
             print(f"Unknown command: {parsed_args.command}")
             parser.print_help()
@@ -198,5 +565,41 @@ def main(args: Optional[List[str]] = None) -> int:
         print(f"Error: {e}")
         return 1
 
+def handle_daemon(args: argparse.Namespace) -> int:
+    """
+    Start, stop or query the warm CLI daemon.
+    
+    Args:
+        args: Command line arguments
+        
+    Returns:
+        Exit code (0 for success, non-zero for errors)
+    """
+    if args.action == "run":
+        CLIDaemon(args.socket).serve_forever()
+        return 0
+    
+    if args.action == "start":
+        pid = start_daemon(args.socket)
+        if pid is None:
+            print("Failed to start the daemon.")
+            return 1
+        print(f"Daemon running (pid {pid}) on {args.socket or default_socket_path()}")
+        return 0
+    
+    if args.action == "stop":
+        if stop_daemon(args.socket):
+            print("Daemon stopped.")
+        else:
+            print("No daemon is running.")
+        return 0
+    
+    status = daemon_status(args.socket)
+    if status is None:
+        print("No daemon is running.")
+        return 1
+    print(f"Daemon running (pid {status['pid']}), up {status['uptime']:.0f}s, {status['requests']} requests served")
+    return 0
+
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
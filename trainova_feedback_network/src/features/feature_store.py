@@ -0,0 +1,280 @@
+import json
+import os
+import shutil
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..storage.schema import parse_dates
+from ..utils.weight_calculation import calculate_one_rep_max
+from .trend_analysis import rolling_trends
+
+FEATURE_STORE_VERSION = 1
+
+# Rolling windows, in sessions of the same (user, exercise) history
+FEATURE_WINDOWS = (3, 5, 10)
+
+# Per-row columns; the windowed ones are added for every window
+BASE_FEATURES = ["session", "weight", "reps", "volume", "one_rep_max", "best_one_rep_max"]
+WINDOW_FEATURES = ["avg_weight", "avg_reps", "avg_volume", "weight_slope"]
+
+
+def feature_columns(windows: Sequence[int] = FEATURE_WINDOWS) -> List[str]:
+    """
+    Return the feature matrix columns for a set of windows.
+
+    Args:
+        windows: Rolling window lengths in sessions
+
+    Returns:
+        Column names, e.g. 'avg_weight_5' for the 5-session average weight
+    """
+    return BASE_FEATURES + [f"{name}_{window}" for window in windows for name in WINDOW_FEATURES]
+
+
+def compute_features(workouts: pd.DataFrame, windows: Sequence[int] = FEATURE_WINDOWS) -> pd.DataFrame:
+    """
+    Compute per-workout features for every (user, exercise) history at once.
+
+    The rows are sorted once into date-ordered histories; rolling sums come
+    from prefix sums that are differenced at each row's window start
+    (clipped to its history), and the slopes from `rolling_trends`, so the
+    whole dataset costs O(n) per window instead of one pass per history and row. Each row's
+    features describe the history up to and including that workout.
+
+    Args:
+        workouts: Workout history with at least 'exercise', 'weight' and 'reps'
+        windows: Rolling window lengths in sessions
+
+    Returns:
+        DataFrame with 'user' (when present), 'exercise', 'date' and the
+        `feature_columns(windows)`, sorted by user, exercise and date
+    """
+    keys = ["user", "exercise"] if "user" in workouts.columns else ["exercise"]
+    columns = keys + ["date"] + feature_columns(windows)
+    required = ["exercise", "weight", "reps"]
+    if workouts.empty or any(col not in workouts.columns for col in required):
+        return pd.DataFrame(columns=columns)
+
+    workouts = workouts.dropna(subset=required)
+    dates = (parse_dates(workouts["date"]) if "date" in workouts.columns
+             else pd.Series(pd.NaT, index=workouts.index, dtype="datetime64[ns]"))
+    workouts = workouts.assign(date=dates).sort_values(keys + ["date"], kind="stable")
+
+    weights = workouts["weight"].to_numpy(dtype=float)
+    reps = workouts["reps"].to_numpy(dtype=float)
+    series = workouts.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+    start = np.concatenate([[True], series[1:] != series[:-1]]) if len(series) else np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(start)
+    lengths = np.diff(np.append(starts, len(weights)))
+    first = np.repeat(starts, lengths)
+    position = np.arange(len(weights)) - first
+
+    volume = weights * reps
+    one_rep_max = calculate_one_rep_max(weights, reps)
+
+    data: Dict[str, Any] = {key: workouts[key].to_numpy() for key in keys}
+    data["date"] = workouts["date"].to_numpy(dtype="datetime64[ns]")
+    data["session"] = position + 1
+    data["weight"] = weights
+    data["reps"] = reps
+    data["volume"] = volume
+    data["one_rep_max"] = one_rep_max
+    data["best_one_rep_max"] = pd.Series(one_rep_max).groupby(series).cummax().to_numpy()
+
+    prefix = {"weight": _prefix_sum(weights), "reps": _prefix_sum(reps), "volume": _prefix_sum(volume)}
+    trends = rolling_trends(weights, series, windows)
+    end = np.arange(1, len(weights) + 1)
+    for window in windows:
+        count = np.minimum(position + 1, window)
+        begin = end - count
+        data[f"avg_weight_{window}"] = (prefix["weight"][end] - prefix["weight"][begin]) / count
+        data[f"avg_reps_{window}"] = (prefix["reps"][end] - prefix["reps"][begin]) / count
+        data[f"avg_volume_{window}"] = (prefix["volume"][end] - prefix["volume"][begin]) / count
+        data[f"weight_slope_{window}"] = trends[f"slope_{window}"]
+
+    return pd.DataFrame(data, columns=columns).reset_index(drop=True)
+
+
+class FeatureStore:
+    """
+    Feature matrix of a workout dataset with point lookups by (user, exercise, date).
+
+    The matrix holds one row per workout, grouped into date-ordered
+    (user, exercise) histories. Saved stores are memory-mapped on load and
+    tagged with a signature of their source data, so a stale store is
+    rebuilt instead of served.
+    """
+
+    def __init__(self,
+                 columns: List[str],
+                 matrix: np.ndarray,
+                 dates: np.ndarray,
+                 offsets: np.ndarray,
+                 series_keys: List[Tuple[Optional[str], str]]):
+        """
+        Args:
+            columns: Feature column names
+            matrix: Feature values, shape (rows, columns)
+            dates: Workout date per row
+            offsets: Start row of each history, plus the total row count
+            series_keys: (user, exercise) of each history
+        """
+        self.columns = columns
+        self.matrix = matrix
+        self.dates = dates
+        self.offsets = offsets
+        self.series_keys = series_keys
+        self._column_index = {name: i for i, name in enumerate(columns)}
+        self._series_by_key = {key: index for index, key in enumerate(series_keys)}
+        self._series_index: Dict[str, List[int]] = {}
+        for index, (_, exercise) in enumerate(series_keys):
+            self._series_index.setdefault(exercise, []).append(index)
+
+    @classmethod
+    def build(cls, workouts: pd.DataFrame, windows: Sequence[int] = FEATURE_WINDOWS) -> "FeatureStore":
+        """
+        Compute the feature store of a workout dataset.
+
+        Args:
+            workouts: Workout history
+            windows: Rolling window lengths in sessions
+
+        Returns:
+            The feature store
+        """
+        features = compute_features(workouts, windows)
+        columns = feature_columns(windows)
+        # Every history starts with session 1
+        starts = np.flatnonzero(features["session"].to_numpy() == 1)
+        users = (features["user"].to_numpy()[starts] if "user" in features.columns
+                 else np.full(len(starts), None, dtype=object))
+        series_keys = [(None if pd.isna(user) else str(user), str(exercise))
+                       for user, exercise in zip(users, features["exercise"].to_numpy()[starts])]
+        return cls(
+            columns=columns,
+            matrix=features[columns].to_numpy(dtype=np.float64),
+            dates=features["date"].to_numpy(dtype="datetime64[ns]"),
+            offsets=np.append(starts, len(features)).astype(np.int64),
+            series_keys=series_keys,
+        )
+
+    def save(self, directory: str, signature: Optional[str] = None) -> None:
+        """
+        Write the store to a directory, replacing any previous version atomically.
+
+        Args:
+            directory: Store directory
+            signature: Identifies the source data the store was built from
+        """
+        version = uuid.uuid4().hex
+        version_dir = os.path.join(directory, version)
+        os.makedirs(version_dir, exist_ok=True)
+        np.save(os.path.join(version_dir, "matrix.npy"), np.ascontiguousarray(self.matrix))
+        np.save(os.path.join(version_dir, "date.npy"), self.dates)
+        np.save(os.path.join(version_dir, "offsets.npy"), self.offsets)
+
+        meta = {
+            "feature_store_version": FEATURE_STORE_VERSION,
+            "version": version,
+            "signature": signature,
+            "columns": self.columns,
+            "series": [list(key) for key in self.series_keys],
+        }
+        tmp_meta = os.path.join(directory, f"meta.json.{version}")
+        with open(tmp_meta, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp_meta, os.path.join(directory, "meta.json"))
+
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if os.path.isdir(path) and name != version:
+                shutil.rmtree(path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: str, signature: Optional[str] = None) -> Optional["FeatureStore"]:
+        """
+        Open a saved store with memory-mapped arrays.
+
+        Args:
+            directory: Store directory
+            signature: Expected source signature (None accepts any)
+
+        Returns:
+            The store, or None if there is none or it was built from other data
+        """
+        try:
+            with open(os.path.join(directory, "meta.json")) as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if meta.get("feature_store_version") != FEATURE_STORE_VERSION:
+            return None
+        if signature is not None and meta.get("signature") != signature:
+            return None
+
+        version_dir = os.path.join(directory, meta["version"])
+        try:
+            arrays = {name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r")
+                      for name in ("matrix", "date", "offsets")}
+        except (OSError, ValueError):
+            return None
+        return cls(meta["columns"], arrays["matrix"], arrays["date"], arrays["offsets"],
+                   [(user, exercise) for user, exercise in meta["series"]])
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def lookup(self, exercise: str, user: Optional[str] = None, date: Any = None) -> Optional[Dict[str, float]]:
+        """
+        Return the features of the latest workout on or before a date.
+
+        Args:
+            exercise: Name of the exercise
+            user: User of the history (None: the latest workout of any user)
+            date: Point in time (default: the latest workout)
+
+        Returns:
+            Dictionary of feature values, or None if there is no such workout
+        """
+        limit = None if date is None else np.datetime64(pd.Timestamp(date), "ns")
+        if user is not None:
+            index = self._series_by_key.get((user, exercise))
+            candidates = [] if index is None else [index]
+        else:
+            candidates = self._series_index.get(exercise, [])
+
+        best_row, best_date = None, None
+        for index in candidates:
+            begin, end = int(self.offsets[index]), int(self.offsets[index + 1])
+            if limit is not None:
+                # Histories are date-sorted, so the cutoff is a binary search
+                end = begin + int(np.searchsorted(self.dates[begin:end], limit, side="right"))
+            if end <= begin:
+                continue
+            row_date = self.dates[end - 1]
+            if best_row is None or row_date > best_date:
+                best_row, best_date = end - 1, row_date
+        if best_row is None:
+            return None
+        return dict(zip(self.columns, self.matrix[best_row].tolist()))
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Return the whole store as a DataFrame.
+
+        Returns:
+            DataFrame with 'user', 'exercise', 'date' and the feature columns
+        """
+        lengths = np.diff(self.offsets)
+        frame = pd.DataFrame(np.asarray(self.matrix), columns=self.columns)
+        frame.insert(0, "date", pd.to_datetime(np.asarray(self.dates)))
+        frame.insert(0, "exercise", np.repeat([key[1] for key in self.series_keys], lengths))
+        frame.insert(0, "user", np.repeat(np.array([key[0] for key in self.series_keys], dtype=object), lengths))
+        return frame
+
+
+def _prefix_sum(values: np.ndarray) -> np.ndarray:
+    return np.concatenate([[0.0], np.cumsum(values, dtype=float)])
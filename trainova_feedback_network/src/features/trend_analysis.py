@@ -1,24 +1,161 @@
-from typing import List, Dict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-def analyze_trend(previous_workouts: List[Dict[str, float]]) -> Dict[str, float]:
+import numpy as np
+
+# Trailing windows in sessions and in calendar weeks
+TREND_WINDOWS = (3, 5, 10, 30)
+TREND_WEEKS = (4, 12)
+
+DIRECTIONS = {1: "increasing", -1: "decreasing", 0: "stable"}
+
+
+def rolling_trends(values: np.ndarray,
+                   groups: Optional[np.ndarray] = None,
+                   windows: Sequence[int] = TREND_WINDOWS,
+                   tolerance: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Fit a least-squares line over the trailing sessions of every element.
+
+    `values` may hold many histories back to back; `groups` labels each
+    element's history (histories must be contiguous and in session order).
+    Windows are clipped at the start of their history. All windows come
+    from one set of prefix sums, so the cost is O(n) per window.
+
+    Args:
+        values: Values in session order, e.g. weights
+        groups: History label per element (default: a single history)
+        windows: Window lengths in sessions
+        tolerance: Slopes within +/- tolerance count as stable
+
+    Returns:
+        Per-element arrays 'slope_{w}' (change per session), 'fit_{w}' (the
+        fitted line at the element) and 'direction_{w}' (1, 0 or -1)
+    """
+    values = np.asarray(values, dtype=float)
+    first, position = _history_positions(groups, len(values))
+    x = position.astype(float)
+    prefix = _prefix_sums(x, values, first)
+
+    end = np.arange(1, len(values) + 1)
+    trends = {}
+    for window in windows:
+        begin = end - np.minimum(position + 1, window)
+        slope, fit = _least_squares(prefix, begin, end, x)
+        trends[f"slope_{window}"] = slope
+        trends[f"fit_{window}"] = fit + (values[first] if len(values) else 0.0)
+        trends[f"direction_{window}"] = direction(slope, tolerance)
+    return trends
+
+
+def weekly_trends(values: np.ndarray,
+                  dates: np.ndarray,
+                  groups: Optional[np.ndarray] = None,
+                  weeks: Sequence[int] = TREND_WEEKS,
+                  tolerance: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Fit a least-squares line over the trailing calendar weeks of every element.
+
+    A window of `k` weeks holds the workouts of the same history dated
+    within the `7 * k` days up to and including the element's date, found by
+    binary search. Slopes are per week of calendar time, so gaps between
+    sessions count.
+
+    Args:
+        values: Values in date order within each history
+        dates: Date per element (elements without a date get NaN)
+        groups: History label per element (default: a single history)
+        weeks: Window lengths in weeks
+        tolerance: Slopes within +/- tolerance count as stable
+
+    Returns:
+        Per-element arrays 'slope_{k}w' (change per week), 'fit_{k}w' and
+        'direction_{k}w'
+    """
+    values = np.asarray(values, dtype=float)
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    first, _ = _history_positions(groups, len(values))
+    dated = ~np.isnat(dates)
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    # Undated elements (sorted last) are placed after every dated one
+    days = np.where(dated, days, days[dated].max() if dated.any() else 0)
+    x = (days - days[first]) / 7.0 if len(values) else days.astype(float)
+    prefix = _prefix_sums(x, values, first)
+
+    # One sorted key over (history, day): each history's key range lies above
+    # the previous one by more than the longest window
+    history = np.cumsum(np.concatenate([[0], first[1:] != first[:-1]])) if len(values) else first
+    span = int(days.max() - days.min() if len(values) else 0) + 7 * max(weeks, default=0) + 1
+    key = history * span + (days - (days.min() if len(values) else 0))
+
+    end = np.arange(1, len(values) + 1)
+    trends = {}
+    for window in weeks:
+        begin = np.searchsorted(key, key - 7 * window, side="right")
+        slope, fit = _least_squares(prefix, begin, end, x)
+        slope, fit = np.where(dated, slope, np.nan), np.where(dated, fit, np.nan)
+        trends[f"slope_{window}w"] = slope
+        trends[f"fit_{window}w"] = fit + (values[first] if len(values) else 0.0)
+        trends[f"direction_{window}w"] = direction(np.nan_to_num(slope), tolerance)
+    return trends
+
+
+def latest_trends(values: np.ndarray,
+                  groups: Optional[np.ndarray] = None,
+                  windows: Sequence[int] = TREND_WINDOWS,
+                  tolerance: float = 0.0) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Return the trends at the last element of every history.
+
+    Args:
+        values: Values in session order
+        groups: History label per element (default: a single history)
+        windows: Window lengths in sessions
+        tolerance: Slopes within +/- tolerance count as stable
+
+    Returns:
+        Tuple of (index of each history's last element, per-history trend arrays)
+    """
+    first, _ = _history_positions(groups, len(values))
+    last = np.flatnonzero(np.append(first[1:] != first[:-1], True)) if len(first) else first
+    trends = rolling_trends(values, groups, windows, tolerance)
+    return last, {name: array[last] for name, array in trends.items()}
+
+
+def direction(slope: np.ndarray, tolerance: float = 0.0) -> np.ndarray:
+    """
+    Classify slopes as increasing (1), decreasing (-1) or stable (0).
+
+    Args:
+        slope: Slopes
+        tolerance: Slopes within +/- tolerance count as stable
+
+    Returns:
+        Integer direction per slope
+    """
+    slope = np.asarray(slope, dtype=float)
+    return np.where(slope > tolerance, 1, np.where(slope < -tolerance, -1, 0)).astype(np.int8)
+
+
+def analyze_trend(previous_workouts: List[Dict[str, float]]) -> Dict[str, Any]:
     if not previous_workouts:
         return {"trend": "no_data", "average_weight": 0.0}
 
-    weights = [workout['weight'] for workout in previous_workouts if 'weight' in workout]
+    weights = np.array([workout['weight'] for workout in previous_workouts if 'weight' in workout], dtype=float)
     if len(weights) < 2:
-        return {"trend": "insufficient_data", "average_weight": sum(weights) / len(weights)}
-
-    weight_changes = [weights[i] - weights[i - 1] for i in range(1, len(weights))]
-    average_change = sum(weight_changes) / len(weight_changes)
+        return {"trend": "insufficient_data", "average_weight": float(weights.sum() / len(weights))}
 
-    trend = "increasing" if average_change > 0 else "decreasing" if average_change < 0 else "stable"
-    average_weight = sum(weights) / len(weights)
+    # The mean of the consecutive changes telescopes to (last - first) / (n - 1)
+    average_change = (weights[-1] - weights[0]) / (len(weights) - 1)
+    _, trends = latest_trends(weights)
 
     return {
-        "trend": trend,
-        "average_weight": average_weight
+        "trend": DIRECTIONS[int(direction(average_change))],
+        "average_weight": float(weights.mean()),
+        "slopes": {window: float(trends[f"slope_{window}"][0]) for window in TREND_WINDOWS},
+        "directions": {window: DIRECTIONS[int(trends[f"direction_{window}"][0])] for window in TREND_WINDOWS},
     }
 
+
 def calculate_weight_trend(previous_workouts: List[Dict[str, float]]) -> float:
     if not previous_workouts:
         return 0.0
@@ -27,5 +164,44 @@ def calculate_weight_trend(previous_workouts: List[Dict[str, float]]) -> float:
     if len(weights) < 2:
         return 0.0
 
-    weight_changes = [weights[i] - weights[i - 1] for i in range(1, len(weights))]
-    return sum(weight_changes) / len(weight_changes)
\ No newline at end of file
+    # Average change between consecutive workouts, i.e. (last - first) / (n - 1)
+    return (weights[-1] - weights[0]) / (len(weights) - 1)
+
+
+def _history_positions(groups: Optional[np.ndarray], n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return each element's history start index and its position within the history."""
+    if groups is None:
+        return np.zeros(n, dtype=np.int64), np.arange(n)
+    groups = np.asarray(groups)
+    start = np.concatenate([[True], groups[1:] != groups[:-1]]) if n else np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(start)
+    first = np.repeat(starts, np.diff(np.append(starts, n)))
+    return first, np.arange(n) - first
+
+
+def _prefix_sums(x: np.ndarray, y: np.ndarray, first: np.ndarray) -> Dict[str, np.ndarray]:
+    """Prefix sums of x, x^2, y and xy, with y shifted by its history's first value."""
+    shifted = y - y[first] if len(y) else y
+    return {
+        name: np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+        for name, values in (("x", x), ("xx", x * x), ("y", shifted), ("xy", x * shifted))
+    }
+
+
+def _least_squares(prefix: Dict[str, np.ndarray],
+                   begin: np.ndarray,
+                   end: np.ndarray,
+                   x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Slope and fitted value at x of the least-squares line over elements begin..end-1."""
+    n = (end - begin).astype(float)
+    sum_x = prefix["x"][end] - prefix["x"][begin]
+    sum_xx = prefix["xx"][end] - prefix["xx"][begin]
+    sum_y = prefix["y"][end] - prefix["y"][begin]
+    sum_xy = prefix["xy"][end] - prefix["xy"][begin]
+    denominator = n * sum_xx - sum_x * sum_x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # A single point (or identical x values) has no slope
+        flat = denominator <= 1e-9 * np.maximum(n * sum_xx, 1.0)
+        slope = np.where(flat, 0.0, (n * sum_xy - sum_x * sum_y) / np.where(flat, 1.0, denominator))
+        fit = (sum_y - slope * sum_x) / n + slope * x
+    return slope, fit
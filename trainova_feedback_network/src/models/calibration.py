@@ -0,0 +1,179 @@
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from ..storage.schema import parse_dates
+from ..utils.weight_calculation import calculate_one_rep_max, round_to_increment
+
+CALIBRATION_WEIGHTS = ["last_weight", "avg_progress", "consistency", "volume"]
+
+# Exercises with fewer scored transitions keep the global weights
+MIN_CALIBRATION_ROWS = 20
+
+# Constants of FeedbackBasedPredictionModel.predict
+TARGET_REPS = 6
+TARGET_INTENSITY = 0.85
+INCREMENT = 2.5
+
+
+def adjusted_last_weight(weights: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    """
+    Move each weight towards the target rep range, as `predict()` does for the last workout.
+
+    The weight is blended 75/25 with 85% of the Brzycki 1RM and kept unless that
+    changes it by 20% or more.
+
+    Args:
+        weights: Workout weights
+        reps: Workout reps
+
+    Returns:
+        Adjusted weights
+    """
+    weights = np.asarray(weights, dtype=float)
+    int_reps = np.trunc(np.asarray(reps, dtype=float))
+    one_rep_max = calculate_one_rep_max(weights, int_reps)
+    adjusted = round_to_increment(weights * 0.75 + one_rep_max * TARGET_INTENSITY * 0.25, INCREMENT)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        use_adjusted = ((int_reps > 0) & (int_reps != TARGET_REPS) & (adjusted > 0)
+                        & (np.abs(adjusted - weights) / weights < 0.2))
+    return np.where(use_adjusted, adjusted, weights)
+
+
+def calibrate(workouts: pd.DataFrame,
+              prediction_weights: Dict[str, float],
+              progression_factors: Dict[str, float],
+              min_rows: int = MIN_CALIBRATION_ROWS) -> Dict[str, Dict[str, Any]]:
+    """
+    Fit per-exercise calibration values from a workout history.
+
+    The data is sorted once into date-ordered (user, exercise) histories and
+    every statistic is a grouped sum over all rows, so the cost is one sort
+    plus a few passes regardless of the number of exercises. Per exercise:
+
+    - progression_rate: mean weight change between consecutive workouts
+    - rep_mean / rep_std: distribution of the (positive) reps
+    - volume_scale: mean weight x reps, the volume at which the volume factor saturates
+    - consistency: mean over histories of 1 / (1 + std of the weights)
+    - prediction_weights: blend weights fitted by ridge regression of the
+      next workout's weight on the four blend terms, pulled towards
+      `prediction_weights` and clipped at zero
+
+    Args:
+        workouts: Workout history with at least 'exercise', 'weight' and 'reps'
+        prediction_weights: Current blend weights (regression prior)
+        progression_factors: The model's 'progressive_overload', 'single_set' and 'push'
+        min_rows: Minimum number of (workout, next workout) pairs per exercise
+
+    Returns:
+        Dictionary mapping each calibrated exercise to its values
+    """
+    required = ["exercise", "weight", "reps"]
+    if workouts.empty or any(col not in workouts.columns for col in required):
+        return {}
+    workouts = workouts.dropna(subset=required)
+    keys = ["user", "exercise"] if "user" in workouts.columns else ["exercise"]
+    if "date" in workouts.columns:
+        workouts = workouts.assign(date=parse_dates(workouts["date"]))
+        workouts = workouts.sort_values(keys + ["date"], kind="stable")
+    else:
+        workouts = workouts.sort_values(keys, kind="stable")
+    if workouts.empty:
+        return {}
+
+    series = workouts.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+    codes, exercises = pd.factorize(workouts["exercise"])
+    weights = workouts["weight"].to_numpy(dtype=float)
+    reps = workouts["reps"].to_numpy(dtype=float)
+    int_reps = np.trunc(reps)
+    n_exercises = len(exercises)
+
+    start = np.concatenate([[True], series[1:] != series[:-1]])
+    has_next = np.concatenate([~start[1:], [False]])
+    step = np.diff(weights, prepend=np.nan)
+    step[start] = np.nan
+
+    # Progression: mean change between consecutive workouts of a history
+    changed = ~start
+    transitions = np.bincount(codes[changed], minlength=n_exercises)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        progression_rate = np.bincount(codes[changed], weights=step[changed], minlength=n_exercises) / transitions
+
+    # Rep distribution over workouts with reps
+    positive = reps > 0
+    rep_count = np.bincount(codes[positive], minlength=n_exercises)
+    rep_sum = np.bincount(codes[positive], weights=reps[positive], minlength=n_exercises)
+    rep_squares = np.bincount(codes[positive], weights=reps[positive] ** 2, minlength=n_exercises)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rep_mean = np.where(rep_count > 0, rep_sum / rep_count, 0.0)
+        rep_std = np.sqrt(np.maximum(np.where(rep_count > 0, rep_squares / rep_count, 0.0) - rep_mean ** 2, 0.0))
+
+    volume = weights * int_reps
+    rows = np.bincount(codes, minlength=n_exercises)
+    volume_scale = np.bincount(codes, weights=volume, minlength=n_exercises) / rows
+
+    # Consistency per history (population std), averaged per exercise
+    starts = np.flatnonzero(start)
+    series_code = codes[starts]
+    series_rows = np.diff(np.append(starts, len(weights)))
+    shifted = weights - np.repeat(weights[starts], series_rows)
+    series_mean = np.add.reduceat(shifted, starts) / series_rows
+    series_var = np.maximum(np.add.reduceat(shifted ** 2, starts) / series_rows - series_mean ** 2, 0.0)
+    series_consistency = np.where(series_rows > 1, 1.0 / (1.0 + np.sqrt(series_var)), 0.5)
+    consistency = (np.bincount(series_code, weights=series_consistency, minlength=n_exercises)
+                   / np.bincount(series_code, minlength=n_exercises))
+
+    # Whether the last (up to) three changes of each prefix were non-negative
+    drops = np.cumsum(np.nan_to_num(step) < 0)
+    position = np.arange(len(weights)) - np.repeat(starts, series_rows)
+    earlier = np.where(position >= 3, drops[np.maximum(np.arange(len(weights)) - 3, 0)],
+                       np.repeat(drops[starts], series_rows))
+    is_progressing = drops == earlier
+
+    # Blend terms of every workout that has a next one, with the calibrated constants
+    last_weight = adjusted_last_weight(weights, reps)
+    avg_progress = np.where(progression_rate >= 0, progression_rate * 1.25, 0.5)[codes]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_factor = np.minimum(np.where(volume_scale[codes] > 0, volume / volume_scale[codes], 0.0), 1.0)
+    terms = np.stack([
+        last_weight,
+        last_weight + avg_progress,
+        consistency[codes] * last_weight,
+        volume_factor * last_weight,
+    ], axis=1)
+    rep_adjustment = np.clip((rep_mean - TARGET_REPS) * 0.04, -0.25, 0.25)[codes]
+    multiplier = ((1 + rep_adjustment)
+                  * (1 + progression_factors["progressive_overload"]) * (1 + progression_factors["single_set"])
+                  * np.where(is_progressing, 1 + progression_factors["push"], 1.0))
+    target = np.roll(weights, -1) / multiplier
+
+    prior = np.array([float(prediction_weights[name]) for name in CALIBRATION_WEIGHTS])
+    fitted_codes = codes[has_next]
+    order = np.argsort(fitted_codes, kind="stable")
+    fitted_terms, fitted_target = terms[has_next][order], target[has_next][order]
+    bounds = np.searchsorted(fitted_codes[order], np.arange(n_exercises + 1))
+
+    calibration: Dict[str, Dict[str, Any]] = {}
+    for code, exercise in enumerate(exercises):
+        X = fitted_terms[bounds[code]:bounds[code + 1]]
+        y = fitted_target[bounds[code]:bounds[code + 1]]
+        if len(y) < min_rows:
+            continue
+        # The terms are nearly collinear (all scale with the weight), so the
+        # ridge penalty keeps the solution close to the prior
+        gram = X.T @ X
+        penalty = 1e-3 * np.trace(gram) / len(prior)
+        blend = np.linalg.solve(gram + penalty * np.eye(len(prior)), X.T @ y + penalty * prior)
+        blend = np.maximum(blend, 0.0)
+
+        calibration[str(exercise)] = {
+            "rows": int(rows[code]),
+            "progression_rate": float(np.nan_to_num(progression_rate[code])),
+            "rep_mean": float(rep_mean[code]),
+            "rep_std": float(rep_std[code]),
+            "volume_scale": float(volume_scale[code]),
+            "consistency": float(consistency[code]),
+            "prediction_weights": {name: float(value) for name, value in zip(CALIBRATION_WEIGHTS, blend)},
+        }
+    return calibration
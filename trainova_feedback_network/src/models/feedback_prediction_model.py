@@ -3,6 +3,11 @@ import numpy as np
 import pandas as pd
 from ..utils.weight_calculation import calculate_weight_for_reps, calculate_one_rep_max
 from ..utils.feedback_utils import generate_feedback_message
+from ..utils.rep_utils import generate_single_set_reps
+from .calibration import CALIBRATION_WEIGHTS, calibrate
+from .online_learning import FeedbackBuffer, gradient_step, grouped_gradient_step
+
+PREDICTION_MESSAGE = "Time to push your limits with {weight}kg for {reps} reps!"
 
 class FeedbackBasedPredictionModel:
     def __init__(self):
@@ -14,6 +19,33 @@ class FeedbackBasedPredictionModel:
             "volume": 0.05       # Reduced to balance the weights
         }
         self.feedback_influence = 0.15  # Increased from 0.1 to make feedback more impactful
+        # Relative increases applied on top of the weighted prediction
+        self.progression_factors = {
+            "progressive_overload": 0.05,  # Always add at least 5% for progressive overload
+            "single_set": 0.025,  # 2.5% higher weight for single set vs multiple sets
+            "push": 0.025  # Extra 2.5% push when already progressing
+        }
+        # Per-exercise values fitted by fit(); exercises without one use the history and global weights
+        self.calibration: Dict[str, Dict[str, Any]] = {}
+        # Feedback samples waiting for the next mini-batch weight update
+        self.feedback_buffer = FeedbackBuffer()
+
+    def fit(self, workouts: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """
+        Fit per-exercise calibration from a workout history.
+
+        Exercises in `workouts` get new calibration values (see
+        `calibration.calibrate`); those not in it keep their current ones.
+
+        Args:
+            workouts: DataFrame with workout history
+
+        Returns:
+            The calibration fitted from `workouts`
+        """
+        fitted = calibrate(workouts, self.prediction_weights, self.progression_factors)
+        self.calibration.update(fitted)
+        return fitted
 
     def provide_feedback(self, 
                          exercise: str, 
@@ -21,7 +53,8 @@ class FeedbackBasedPredictionModel:
                          actual_weight: float, 
                          success: bool,
                          reps: int = None,
-                         rir: int = None) -> Dict[str, Any]:
+                         rir: int = None,
+                         user: str = None) -> Dict[str, Any]:
         weight_diff = actual_weight - predicted_weight
         relative_diff = weight_diff / predicted_weight if predicted_weight > 0 else 0
         score = max(min(relative_diff, 1.0), -1.0)
@@ -42,14 +75,21 @@ class FeedbackBasedPredictionModel:
             'rir': rir
         }
         self.feedback_history.append(feedback_entry)
-        self.update_prediction_weights(score)
+        # Only buffered here; the weights change once per full batch. Feedback on
+        # a prediction this model did not remember (other process, other user)
+        # has no blend terms and is recorded without training the weights
+        sample_buffered = self.feedback_buffer.append(exercise, predicted_weight, actual_weight, user=user)
+        weights_updated = sample_buffered and self.feedback_buffer.ready and self.update_prediction_weights()
         return {
             'feedback_recorded': True,
+            'sample_buffered': sample_buffered,
+            'weights_updated': weights_updated,
             'score': round(score, 3),
             'message': generate_feedback_message(score)
         }
 
-    def predict(self, exercise: str, previous_workouts: List[Dict[str, Any]], debug: bool = False) -> Dict[str, Any]:
+    def predict(self, exercise: str, previous_workouts: List[Dict[str, Any]], debug: bool = False,
+                suggest_reps: bool = True, user: str = None) -> Dict[str, Any]:
         if not previous_workouts:
             return {"weight": 0, "confidence": 0, "message": "No previous workout data provided"}
 
@@ -95,6 +135,7 @@ class FeedbackBasedPredictionModel:
 
         # Use ALL available exercise workouts for comprehensive analysis
         recent_workouts = exercise_workouts
+        calibration = self.calibration.get(exercise)
 
         last_workout = recent_workouts[-1]
         last_weight = float(last_workout.get('weight', 0))  # Ensure we get a float
@@ -135,17 +176,29 @@ class FeedbackBasedPredictionModel:
 
         # Calculate weights from recent workouts
         weights = [float(w.get('weight', 0)) for w in recent_workouts]
-        consistency = 1.0 / (1.0 + np.std(weights)) if len(weights) > 1 else 0.5
+        if calibration:
+            consistency = calibration["consistency"]
+        else:
+            consistency = 1.0 / (1.0 + np.std(weights)) if len(weights) > 1 else 0.5
 
         # Calculate volumes (weight × reps)
-        volumes = [float(w.get('weight', 0)) * int(w.get('reps', 0)) for w in recent_workouts]
-        avg_volume = np.mean(volumes) if volumes else 0
-        volume_factor = min(avg_volume / 100, 1.0)
+        if calibration:
+            # Volume of the last workout relative to the exercise's typical volume
+            last_volume = float(last_workout.get('weight', 0)) * last_reps
+            volume_scale = calibration["volume_scale"]
+            volume_factor = min(last_volume / volume_scale, 1.0) if volume_scale > 0 else 0.0
+        else:
+            volumes = [float(w.get('weight', 0)) * int(w.get('reps', 0)) for w in recent_workouts]
+            avg_volume = np.mean(volumes) if volumes else 0
+            volume_factor = min(avg_volume / 100, 1.0)
 
         # Analyze progression trend
         if len(weights) > 1:
-            weight_changes = np.diff(weights)
-            avg_progress = np.mean(weight_changes) if len(weight_changes) > 0 else 0
+            weight_changes = np.diff(weights[-4:] if calibration else weights)
+            if calibration:
+                avg_progress = calibration["progression_rate"]
+            else:
+                avg_progress = np.mean(weight_changes) if len(weight_changes) > 0 else 0
             
             # Check if the user has been progressing steadily
             is_progressing = all(change >= 0 for change in weight_changes[-min(3, len(weight_changes)):])
@@ -162,31 +215,35 @@ class FeedbackBasedPredictionModel:
             is_progressing = True
             
         # Calculate rep adjustment
-        rep_adjustment = self._calculate_rep_adjustment(recent_workouts, target_reps)
+        if calibration:
+            rep_adjustment = max(min((calibration["rep_mean"] - target_reps) * 0.04, 0.25), -0.25)
+        else:
+            rep_adjustment = self._calculate_rep_adjustment(recent_workouts, target_reps)
 
         # Calculate weighted prediction
+        blend = calibration["prediction_weights"] if calibration else self.prediction_weights
+        terms = [last_weight, last_weight + avg_progress, consistency * last_weight, volume_factor * last_weight]
         weighted_prediction = (
-            self.prediction_weights["last_weight"] * last_weight +
-            self.prediction_weights["avg_progress"] * (last_weight + avg_progress) +
-            self.prediction_weights["consistency"] * consistency * last_weight +
-            self.prediction_weights["volume"] * volume_factor * last_weight
+            blend["last_weight"] * terms[0] +
+            blend["avg_progress"] * terms[1] +
+            blend["consistency"] * terms[2] +
+            blend["volume"] * terms[3]
         )
 
         adjusted_prediction = weighted_prediction * (1 + rep_adjustment)
         
         # Add a progressive overload factor
-        progressive_overload_factor = 0.05  # Always add at least 5% for progressive overload
-        adjusted_prediction *= (1 + progressive_overload_factor)
+        adjusted_prediction *= (1 + self.progression_factors["progressive_overload"])
         
         # For single-set training, we can typically handle slightly higher loads
         # Add a small intensity factor for single set work
-        single_set_factor = 0.025  # 2.5% higher weight for single set vs multiple sets
-        adjusted_prediction *= (1 + single_set_factor)
+        adjusted_prediction *= (1 + self.progression_factors["single_set"])
         
         # If the user has been progressing steadily, push them further
         if is_progressing:
-            push_factor = 0.025  # Extra 2.5% push when already progressing
-            adjusted_prediction *= (1 + push_factor)
+            adjusted_prediction *= (1 + self.progression_factors["push"])
+        
+        multiplier = adjusted_prediction / weighted_prediction if weighted_prediction else 1.0
         
         # Round to the nearest increment (typically 2.5kg/lb)
         rounded_weight = self._round_to_increment(adjusted_prediction)
@@ -218,13 +275,22 @@ class FeedbackBasedPredictionModel:
                 if debug:
                     print(f"User has only done {max_reps_at_weight} reps at {rounded_weight}kg, suggesting {target_reps} reps")
 
-        confidence = 0.5 + (0.3 * min(len(previous_workouts) / 10, 1.0)) + (0.1 * consistency) + (0.1 * self._calculate_rep_consistency(recent_workouts))
+        if calibration:
+            rep_consistency = 1.0 / (1.0 + calibration["rep_std"] / calibration["rep_mean"]) if calibration["rep_mean"] > 0 else 0
+        else:
+            rep_consistency = self._calculate_rep_consistency(recent_workouts)
+        confidence = 0.5 + (0.3 * min(len(previous_workouts) / 10, 1.0)) + (0.1 * consistency) + (0.1 * rep_consistency)
 
-        # Calculate suggested reps based on the weight and previous performance
-        suggested_reps = self._generate_intensity_based_reps(last_weight, last_reps, rounded_weight)
-        
-        # Generate a more motivational message
-        message = f"Time to push your limits with {rounded_weight}kg for {suggested_reps[0]} reps!"
+        if not suggest_reps:
+            # The caller plans the reps, e.g. for a whole batch with generate_single_set_reps
+            suggested_reps = None
+            message = None
+        else:
+            # Calculate suggested reps based on the weight and previous performance
+            suggested_reps = self._generate_intensity_based_reps(last_weight, last_reps, rounded_weight)
+
+            # Generate a more motivational message
+            message = PREDICTION_MESSAGE.format(weight=rounded_weight, reps=suggested_reps[0])
         
         # Include analysis information
         analysis = {
@@ -234,16 +300,23 @@ class FeedbackBasedPredictionModel:
             "recommendation": "Increase weight" if rounded_weight > last_weight else "Increase reps"
         }
 
-        if debug:
+        if debug and suggested_reps:
             print(f"Final prediction: {rounded_weight}kg for {suggested_reps[0]} reps")
 
-        return {
+        # Feedback on this prediction trains the weights from these terms
+        self.feedback_buffer.remember(exercise, rounded_weight, terms, multiplier, user=user)
+
+        result = {
             "weight": rounded_weight,
             "confidence": round(min(confidence, 1.0), 2),
             "message": message,
             "suggested_reps": suggested_reps,
             "analysis": analysis
         }
+        if not suggest_reps:
+            result["rep_inputs"] = {"previous_weight": last_weight, "previous_reps": last_reps,
+                                    "predicted_weight": rounded_weight}
+        return result
 
     def _calculate_rep_adjustment(self, previous_workouts: List[Dict[str, Any]], target_reps: int) -> float:
         all_reps = [w.get('reps', 0) for w in previous_workouts if w.get('reps', 0) > 0]
@@ -276,81 +349,47 @@ class FeedbackBasedPredictionModel:
         Returns:
             List containing a single rep count for one set
         """
-        # Calculate estimated 1RM from previous workout
-        estimated_1rm = calculate_one_rep_max(previous_weight, previous_reps)
-        
-        # Calculate intensity as percentage of 1RM
-        intensity = (predicted_weight / estimated_1rm) if estimated_1rm > 0 else 0.75
-        
-        # Cap intensity at reasonable values to prevent unrealistic rep predictions
-        # No exercise should really be performed above 95% of 1RM for reps
-        intensity = min(max(intensity, 0.75), 0.95)
-        
-        # Modified intensity mapping to focus on 4-8 rep range
-        # Each intensity now maps to multiple possible rep counts
-        intensity_mapping = {
-            0.92: [4],            # Very high intensity: only 4 reps
-            0.90: [4, 5],         # High intensity: 4-5 reps
-            0.87: [4, 5, 6],      # Moderately high intensity: 4-6 reps
-            0.85: [5, 6],         # Medium-high intensity: 5-6 reps
-            0.83: [5, 6, 7],      # Medium intensity: 5-7 reps
-            0.80: [6, 7],         # Medium-low intensity: 6-7 reps
-            0.77: [6, 7, 8],      # Low intensity: 6-8 reps
-            0.75: [7, 8]          # Very low intensity: 7-8 reps
-        }
-        
-        # Find the closest intensity level in our mapping
-        closest_intensity = min(intensity_mapping.keys(), key=lambda x: abs(x - intensity))
-        
-        # Get possible rep options for this intensity
-        rep_options = intensity_mapping[closest_intensity]
-        
-        # Add variation based on previous reps
-        # If user did higher reps before, suggest lower reps in the range (and vice versa)
-        if previous_reps >= 8:
-            # User did high reps last time, suggest lower reps in the range
-            suggested_reps = rep_options[0] if rep_options else 4
-        elif previous_reps <= 4:
-            # User did low reps last time, suggest higher reps in the range
-            suggested_reps = rep_options[-1] if rep_options else 8
-        else:
-            # Use the middle option, or a random choice if multiple options
-            middle_index = len(rep_options) // 2
-            suggested_reps = rep_options[middle_index] if rep_options else 6
-            
-        # Add training variety based on workout history
-        # Every third workout, shift the rep recommendation by 1 to provide variety
+        # Add training variety based on workout history: the counter starts
+        # at 0 and every third workout shifts the rep recommendation
         if hasattr(self, '_workout_counter'):
             self._workout_counter += 1
         else:
             self._workout_counter = 0
-            
-        if self._workout_counter % 3 == 0 and len(rep_options) > 1:
-            # Add variety by choosing a different rep count from the available options
-            current_index = rep_options.index(suggested_reps) if suggested_reps in rep_options else 0
-            new_index = (current_index + 1) % len(rep_options)
-            suggested_reps = rep_options[new_index]
-        
-        # Ensure reps stay within the 4-8 range
-        suggested_reps = max(4, min(suggested_reps, 8))
-        
+
         # Return as a single-item list for consistency with the rest of the code
-        return [suggested_reps]
+        return [generate_single_set_reps(previous_weight, previous_reps, predicted_weight, self._workout_counter)]
 
     def _round_to_increment(self, weight: float, increment: float = 2.5) -> float:
         return round(weight / increment) * increment
 
-    def update_prediction_weights(self, score: float):
-        adjustment_factor = abs(score) * self.feedback_influence
-        if score < 0:
-            self.prediction_weights["consistency"] += adjustment_factor
-            self.prediction_weights["avg_progress"] -= adjustment_factor
-        else:
-            self.prediction_weights["avg_progress"] += adjustment_factor
-            self.prediction_weights["consistency"] -= adjustment_factor
-        
-        # Normalize weights
-        total = sum(self.prediction_weights.values())
-        if total > 0:
-            for key in self.prediction_weights:
-                self.prediction_weights[key] /= total
\ No newline at end of file
+    def update_prediction_weights(self) -> bool:
+        """
+        Apply the buffered feedback as one mini-batch gradient step.
+
+        All four global weights move against the gradient of the squared
+        relative error between the (unrounded) prediction and the actual
+        weight, with `feedback_influence` as the step size. Calibrated
+        exercises also update their own blend from their samples only.
+
+        Returns:
+            True if there was buffered feedback to apply
+        """
+        batch = self.feedback_buffer.pop_batch()
+        if batch is None:
+            return False
+        terms, multiplier, actual = batch["terms"], batch["multiplier"], batch["actual"]
+
+        weights = np.array([self.prediction_weights[name] for name in CALIBRATION_WEIGHTS])
+        weights = gradient_step(weights, terms, multiplier, actual, self.feedback_influence)
+        self.prediction_weights = dict(zip(CALIBRATION_WEIGHTS, weights.tolist()))
+
+        calibrated = np.array([exercise in self.calibration for exercise in batch["exercise"]], dtype=bool)
+        if calibrated.any():
+            codes, exercises = pd.factorize(batch["exercise"][calibrated])
+            blends = np.array([[self.calibration[exercise]["prediction_weights"][name] for name in CALIBRATION_WEIGHTS]
+                               for exercise in exercises])
+            blends = grouped_gradient_step(blends, codes, terms[calibrated], multiplier[calibrated],
+                                           actual[calibrated], self.feedback_influence)
+            for exercise, blend in zip(exercises, blends.tolist()):
+                self.calibration[exercise]["prediction_weights"] = dict(zip(CALIBRATION_WEIGHTS, blend))
+        return True
@@ -0,0 +1,231 @@
+import math
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Optional
+
+from .calibration import CALIBRATION_WEIGHTS
+
+STATE_FILENAME = "model_state.bin"
+
+# File layout (little-endian):
+#   header   magic, format version, feedback_influence, number of weights,
+#            exercises and feedback entries
+#   weights  per weight: name (u16 length + UTF-8) and value (f64)
+#   names    per exercise: name (u16 length + UTF-8)
+#   feedback fixed-size records; the exercise is an index into the names,
+#            missing reps/rir are stored as NaN
+#   calibration (version 2) number of exercises, then per exercise: name,
+#            row count, progression rate, rep mean/std, volume scale,
+#            consistency and the blend weights in CALIBRATION_WEIGHTS order
+#   feedback buffer (version 3) number of remembered predictions, then per
+#            prediction: user, exercise, predicted weight, blend terms and
+#            multiplier; number of samples, then per sample: exercise, blend
+#            terms, multiplier and actual weight
+#   crc32    of everything before it
+MAGIC = b"TRNV"
+FORMAT_VERSION = 3
+_HEADER = struct.Struct("<4sHdIII")
+_LENGTH = struct.Struct("<H")
+_VALUE = struct.Struct("<d")
+_FEEDBACK = struct.Struct("<IdddBdd")
+_COUNT = struct.Struct("<I")
+_CALIBRATION = struct.Struct("<Q5d%dd" % len(CALIBRATION_WEIGHTS))
+_PREDICTION = struct.Struct("<d%ddd" % len(CALIBRATION_WEIGHTS))
+_SAMPLE = struct.Struct("<%dddd" % len(CALIBRATION_WEIGHTS))
+_CRC = struct.Struct("<I")
+
+
+def save_state(model: Any, path: str) -> None:
+    """
+    Write the learned state of a prediction model to a binary file.
+
+    The file is written next to `path` and moved into place with an atomic
+    rename, so readers see either the previous or the new state.
+
+    Args:
+        model: Model with `prediction_weights`, `feedback_influence`, `feedback_history`,
+            `calibration` and `feedback_buffer`
+        path: Path of the state file
+    """
+    names: Dict[str, int] = {}
+    records = []
+    for entry in model.feedback_history:
+        index = names.setdefault(str(entry.get("exercise")), len(names))
+        records.append(_FEEDBACK.pack(
+            index,
+            float(entry.get("predicted_weight") or 0),
+            float(entry.get("actual_weight") or 0),
+            float(entry.get("score") or 0),
+            1 if entry.get("success") else 0,
+            _optional(entry.get("reps")),
+            _optional(entry.get("rir")),
+        ))
+
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, float(model.feedback_influence),
+                          len(model.prediction_weights), len(names), len(records))]
+    for key, value in model.prediction_weights.items():
+        parts.append(_pack_string(key))
+        parts.append(_VALUE.pack(float(value)))
+    parts.extend(_pack_string(name) for name in names)
+    parts.extend(records)
+    calibration = getattr(model, "calibration", {})
+    parts.append(_COUNT.pack(len(calibration)))
+    for exercise, values in calibration.items():
+        parts.append(_pack_string(exercise))
+        parts.append(_CALIBRATION.pack(
+            int(values["rows"]), float(values["progression_rate"]), float(values["rep_mean"]),
+            float(values["rep_std"]), float(values["volume_scale"]), float(values["consistency"]),
+            *(float(values["prediction_weights"][name]) for name in CALIBRATION_WEIGHTS)
+        ))
+    buffer = getattr(model, "feedback_buffer", None)
+    predictions, samples = buffer.state() if buffer is not None else ([], [])
+    parts.append(_COUNT.pack(len(predictions)))
+    for user, exercise, weight, terms, multiplier in predictions:
+        parts.append(_pack_string(user))
+        parts.append(_pack_string(exercise))
+        parts.append(_PREDICTION.pack(float(weight), *map(float, terms), float(multiplier)))
+    parts.append(_COUNT.pack(len(samples)))
+    for exercise, terms, multiplier, actual in samples:
+        parts.append(_pack_string(exercise))
+        parts.append(_SAMPLE.pack(*map(float, terms), float(multiplier), float(actual)))
+    data = b"".join(parts)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+        file.write(_CRC.pack(zlib.crc32(data)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_state(model: Any, path: str) -> bool:
+    """
+    Restore the learned state of a prediction model from a binary file.
+
+    Args:
+        model: Model to update in place
+        path: Path of the state file
+
+    Returns:
+        True if the state was loaded, False if the file does not exist
+
+    Raises:
+        ValueError: If the file is not a valid model state file
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return False
+
+    if len(data) < _HEADER.size + _CRC.size:
+        raise ValueError(f"Model state file is truncated: {path}")
+    body, (crc,) = memoryview(data)[:-_CRC.size], _CRC.unpack_from(data, len(data) - _CRC.size)
+    if zlib.crc32(body) != crc:
+        raise ValueError(f"Model state file is corrupt: {path}")
+
+    magic, version, influence, num_weights, num_names, num_feedback = _HEADER.unpack_from(body)
+    if magic != MAGIC or version not in (1, 2, FORMAT_VERSION):
+        raise ValueError(f"Unsupported model state file: {path}")
+    offset = _HEADER.size
+
+    weights = {}
+    for _ in range(num_weights):
+        key, offset = _unpack_string(body, offset)
+        weights[key] = _VALUE.unpack_from(body, offset)[0]
+        offset += _VALUE.size
+
+    names: List[str] = []
+    for _ in range(num_names):
+        name, offset = _unpack_string(body, offset)
+        names.append(name)
+
+    end = offset + num_feedback * _FEEDBACK.size
+    if end > len(body) or (version == 1 and end != len(body)):
+        raise ValueError(f"Model state file is corrupt: {path}")
+    history = [
+        {
+            "exercise": names[index],
+            "predicted_weight": predicted,
+            "actual_weight": actual,
+            "success": bool(success),
+            "score": score,
+            "reps": _restore(reps),
+            "rir": _restore(rir),
+        }
+        for index, predicted, actual, score, success, reps, rir in _FEEDBACK.iter_unpack(body[offset:end])
+    ]
+
+    # Version 1 files have no calibration, versions 1 and 2 no feedback buffer
+    calibration = {}
+    predictions, samples = [], []
+    if version >= 2:
+        try:
+            (num_calibrated,) = _COUNT.unpack_from(body, end)
+            offset = end + _COUNT.size
+            for _ in range(num_calibrated):
+                exercise, offset = _unpack_string(body, offset)
+                rows, progression_rate, rep_mean, rep_std, volume_scale, consistency, *blend = \
+                    _CALIBRATION.unpack_from(body, offset)
+                offset += _CALIBRATION.size
+                calibration[exercise] = {
+                    "rows": rows,
+                    "progression_rate": progression_rate,
+                    "rep_mean": rep_mean,
+                    "rep_std": rep_std,
+                    "volume_scale": volume_scale,
+                    "consistency": consistency,
+                    "prediction_weights": dict(zip(CALIBRATION_WEIGHTS, blend)),
+                }
+            if version >= 3:
+                (num_predictions,) = _COUNT.unpack_from(body, offset)
+                offset += _COUNT.size
+                for _ in range(num_predictions):
+                    user, offset = _unpack_string(body, offset)
+                    exercise, offset = _unpack_string(body, offset)
+                    weight, *terms, multiplier = _PREDICTION.unpack_from(body, offset)
+                    offset += _PREDICTION.size
+                    predictions.append((user, exercise, weight, terms, multiplier))
+                (num_samples,) = _COUNT.unpack_from(body, offset)
+                offset += _COUNT.size
+                for _ in range(num_samples):
+                    exercise, offset = _unpack_string(body, offset)
+                    *terms, multiplier, actual = _SAMPLE.unpack_from(body, offset)
+                    offset += _SAMPLE.size
+                    samples.append((exercise, terms, multiplier, actual))
+        except (struct.error, UnicodeDecodeError):
+            raise ValueError(f"Model state file is corrupt: {path}")
+        if offset != len(body):
+            raise ValueError(f"Model state file is corrupt: {path}")
+
+    model.feedback_influence = influence
+    model.prediction_weights = weights
+    model.feedback_history = history
+    model.calibration = calibration
+    if getattr(model, "feedback_buffer", None) is not None:
+        model.feedback_buffer.restore(predictions, samples)
+    return True
+
+
+def _pack_string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return _LENGTH.pack(len(encoded)) + encoded
+
+
+def _unpack_string(data: memoryview, offset: int):
+    (length,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+
+def _optional(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _restore(value: float) -> Optional[float]:
+    if math.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
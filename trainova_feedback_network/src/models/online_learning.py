@@ -0,0 +1,206 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 16
+
+
+class FeedbackBuffer:
+    """
+    Collects feedback samples for mini-batch updates of the blend weights.
+
+    `predict()` remembers the blend terms behind each prediction, keyed by
+    user, exercise and predicted weight (to 0.01); feedback on that
+    prediction becomes a sample (exercise, terms, multiplier, actual weight).
+    Both operations only append under a lock, so the feedback path stays
+    O(1) and the gradient step is paid once per batch. `state()` and
+    `restore()` carry the remembered predictions and buffered samples over
+    to another process through the model state file.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, max_predictions: int = 4096):
+        """
+        Args:
+            batch_size: Number of samples per gradient step
+            max_predictions: Number of recent predictions kept for matching feedback
+        """
+        self.batch_size = batch_size
+        self.max_predictions = max_predictions
+        self._lock = threading.Lock()
+        self._predictions: "OrderedDict[Tuple[str, str, float], Tuple[List[float], float]]" = OrderedDict()
+        self._samples: List[Tuple[str, List[float], float, float]] = []
+
+    def remember(self, exercise: str, predicted_weight: float, terms: List[float], multiplier: float,
+                 user: Optional[str] = None) -> None:
+        """
+        Keep the blend terms of a prediction until its feedback arrives.
+
+        Args:
+            exercise: Name of the exercise
+            predicted_weight: The weight returned to the user
+            terms: Blend terms in CALIBRATION_WEIGHTS order
+            multiplier: Factor applied to the blended weight (rep adjustment and progression)
+            user: User the prediction was made for
+        """
+        key = _prediction_key(user, exercise, predicted_weight)
+        with self._lock:
+            self._predictions[key] = (terms, multiplier)
+            self._predictions.move_to_end(key)
+            while len(self._predictions) > self.max_predictions:
+                self._predictions.popitem(last=False)
+
+    def append(self, exercise: str, predicted_weight: float, actual_weight: float,
+               user: Optional[str] = None) -> bool:
+        """
+        Add feedback on a remembered prediction as a training sample.
+
+        Args:
+            exercise: Name of the exercise
+            predicted_weight: The weight that was predicted
+            actual_weight: The weight that was actually used
+            user: User the prediction was made for
+
+        Returns:
+            True if the prediction was known and the sample was buffered
+        """
+        if actual_weight is None or float(actual_weight) <= 0:
+            return False
+        with self._lock:
+            prediction = self._predictions.get(_prediction_key(user, exercise, predicted_weight))
+            if prediction is None:
+                return False
+            self._samples.append((exercise, prediction[0], prediction[1], float(actual_weight)))
+            return True
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full batch is buffered."""
+        return len(self._samples) >= self.batch_size
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def pop_batch(self) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Take all buffered samples.
+
+        Returns:
+            Dictionary of 'exercise', 'terms' (n, 4), 'multiplier' and 'actual'
+            arrays, or None if the buffer is empty
+        """
+        with self._lock:
+            samples, self._samples = self._samples, []
+        if not samples:
+            return None
+        exercises, terms, multipliers, actual = zip(*samples)
+        return {
+            "exercise": np.array(exercises, dtype=object),
+            "terms": np.array(terms, dtype=float),
+            "multiplier": np.array(multipliers, dtype=float),
+            "actual": np.array(actual, dtype=float),
+        }
+
+    def state(self) -> Tuple[list, list]:
+        """
+        Return the remembered predictions and buffered samples, oldest first.
+
+        Returns:
+            Tuple of ([(user, exercise, predicted_weight, terms, multiplier)],
+            [(exercise, terms, multiplier, actual_weight)])
+        """
+        with self._lock:
+            predictions = [(user, exercise, weight, list(terms), multiplier)
+                           for (user, exercise, weight), (terms, multiplier) in self._predictions.items()]
+            return predictions, [(exercise, list(terms), multiplier, actual)
+                                 for exercise, terms, multiplier, actual in self._samples]
+
+    def restore(self, predictions: list, samples: list) -> None:
+        """
+        Replace the buffer contents with the output of `state()`.
+
+        Args:
+            predictions: Remembered predictions, oldest first
+            samples: Buffered samples
+        """
+        with self._lock:
+            self._predictions = OrderedDict(
+                (_prediction_key(user, exercise, weight), (list(terms), float(multiplier)))
+                for user, exercise, weight, terms, multiplier in predictions[-self.max_predictions:]
+            )
+            self._samples = [(exercise, list(terms), float(multiplier), float(actual))
+                             for exercise, terms, multiplier, actual in samples]
+
+    def clear(self) -> None:
+        """Drop the buffered samples and remembered predictions."""
+        with self._lock:
+            self._samples = []
+            self._predictions.clear()
+
+
+def _prediction_key(user: Optional[str], exercise: str, predicted_weight: float) -> Tuple[str, str, float]:
+    # Rounded so that feedback echoing the weight through JSON or a form still matches
+    return ("" if user is None else str(user), str(exercise), round(float(predicted_weight), 2))
+
+
+def gradient_step(weights: np.ndarray,
+                  terms: np.ndarray,
+                  multiplier: np.ndarray,
+                  actual: np.ndarray,
+                  learning_rate) -> np.ndarray:
+    """
+    Take one gradient step on the mean squared relative prediction error.
+
+    The prediction of sample i is `(weights @ terms[i]) * multiplier[i]`.
+    The step is normalized by the mean squared norm of the per-sample
+    gradients' inputs (normalized LMS), so it is stable for learning rates
+    in (0, 2) whatever the weight scale. Leading dimensions of `weights`, `multiplier` and `learning_rate`
+    broadcast, so several weight vectors (e.g. sweep trials) update at once.
+
+    Args:
+        weights: Blend weights, shape (..., 4)
+        terms: Blend terms per sample, shape (n, 4)
+        multiplier: Multiplier per sample, shape (n,) or (..., n)
+        actual: Actual weight per sample, shape (n,)
+        learning_rate: Step size, scalar or shape (..., 1)
+
+    Returns:
+        Updated weights, clipped at zero
+    """
+    predicted = (weights @ terms.T) * multiplier
+    # d/dw of 0.5 * ((predicted - actual) / actual)^2
+    scaled = (predicted - actual) / actual * multiplier / actual
+    gradient = scaled @ terms / len(actual)
+    norm = np.mean((multiplier / actual) ** 2 * (terms ** 2).sum(axis=1), axis=-1)
+    return np.maximum(weights - learning_rate * gradient / norm[..., None], 0.0)
+
+
+def grouped_gradient_step(weights: np.ndarray,
+                          groups: np.ndarray,
+                          terms: np.ndarray,
+                          multiplier: np.ndarray,
+                          actual: np.ndarray,
+                          learning_rate: float) -> np.ndarray:
+    """
+    Take one (normalized) gradient step per group, each on the samples of that group only.
+
+    Args:
+        weights: Blend weights per group, shape (groups, 4)
+        groups: Group index per sample, shape (n,)
+        terms: Blend terms per sample, shape (n, 4)
+        multiplier: Multiplier per sample, shape (n,)
+        actual: Actual weight per sample, shape (n,)
+        learning_rate: Step size
+
+    Returns:
+        Updated weights per group (groups without samples are unchanged)
+    """
+    predicted = np.einsum("ij,ij->i", weights[groups], terms) * multiplier
+    scaled = (predicted - actual) / actual * multiplier / actual
+    gradient = np.zeros_like(weights)
+    np.add.at(gradient, groups, scaled[:, None] * terms)
+    counts = np.bincount(groups, minlength=len(weights))
+    norm = np.bincount(groups, weights=(multiplier / actual) ** 2 * (terms ** 2).sum(axis=1), minlength=len(weights))
+    gradient /= np.where(norm > 0, norm, 1.0)[:, None]
+    return np.where(counts[:, None] > 0, np.maximum(weights - learning_rate * gradient, 0.0), weights)
@@ -0,0 +1,255 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..models.calibration import INCREMENT, TARGET_REPS, adjusted_last_weight
+from ..models.feedback_prediction_model import FeedbackBasedPredictionModel
+from ..storage.schema import _parse_bool, parse_dates
+from ..utils.weight_calculation import round_to_increment
+
+BACKTEST_COLUMNS = ["exercise", "series", "predictions", "mae", "bias", "success_rate"]
+
+
+def series_features(weights: np.ndarray,
+                    reps: np.ndarray,
+                    calibration: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute the inputs of `predict()` for every prefix of one exercise history.
+
+    Element `i` of each array describes the history `weights[:i + 1]`, i.e.
+    what `predict()` sees before workout `i + 1`. Running sums replace the
+    per-call passes over the history, so all n - 1 prefixes cost O(n).
+
+    Args:
+        weights: Workout weights in date order
+        reps: Workout reps in date order
+        calibration: The exercise's calibration values, if the model has any;
+            `predict()` then uses them instead of the history statistics
+
+    Returns:
+        Dictionary of per-prefix arrays, plus the lookup tables used to
+        check whether a predicted weight was already lifted
+    """
+    weights = np.asarray(weights, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+    int_reps = np.trunc(reps)
+    count = np.arange(1, len(weights) + 1)
+
+    # Last workout, moved towards the target rep range unless that changes it by 20% or more
+    last_weight = adjusted_last_weight(weights, reps)
+
+    # Weight consistency from the running (population) standard deviation,
+    # shifted by the first weight to limit cancellation
+    shifted = weights - weights[0] if len(weights) else weights
+    mean = np.cumsum(shifted) / count
+    variance = np.maximum(np.cumsum(shifted * shifted) / count - mean * mean, 0.0)
+    consistency = np.where(count > 1, 1.0 / (1.0 + np.sqrt(variance)), 0.5)
+
+    volume_factor = np.minimum(np.cumsum(weights * int_reps) / count / 100, 1.0)
+
+    # Average progression and whether the last (up to) three changes were non-negative
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_progress = np.where(count > 1, (weights - weights[0] if len(weights) else weights) / (count - 1), 0.5)
+    avg_progress = np.where(count > 1, np.where(avg_progress >= 0, avg_progress * 1.25, 0.5), 0.5)
+    drops = np.concatenate([[0], np.cumsum(np.diff(weights) < 0)])
+    recent_drops = drops - np.concatenate([np.zeros(min(3, len(drops))), drops[:-3]])
+    is_progressing = recent_drops == 0
+
+    positive = reps > 0
+    positive_count = np.cumsum(positive)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_reps = np.where(positive_count > 0, np.cumsum(np.where(positive, reps, 0.0)) / positive_count, 0.0)
+    rep_adjustment = np.clip((avg_reps - TARGET_REPS) * 0.04, -0.25, 0.25)
+
+    if calibration:
+        consistency = np.full(len(weights), float(calibration["consistency"]))
+        volume_scale = calibration["volume_scale"]
+        volume_factor = (np.minimum(weights * int_reps / volume_scale, 1.0) if volume_scale > 0
+                         else np.zeros(len(weights)))
+        progression_rate = calibration["progression_rate"]
+        avg_progress = np.where(count > 1, progression_rate * 1.25 if progression_rate >= 0 else 0.5, 0.5)
+        rep_adjustment = np.full(len(weights), np.clip((calibration["rep_mean"] - TARGET_REPS) * 0.04, -0.25, 0.25))
+
+    # First occurrence of each weight, and of each weight lifted for 6+ reps
+    used, first_used = np.unique(weights, return_index=True)
+    heavy_rows = np.flatnonzero(int_reps >= 6)
+    heavy, first_heavy = np.unique(weights[heavy_rows], return_index=True)
+
+    return {
+        "last_weight": last_weight[:-1],
+        "consistency": consistency[:-1],
+        "volume_factor": volume_factor[:-1],
+        "avg_progress": avg_progress[:-1],
+        "is_progressing": is_progressing[:-1],
+        "rep_adjustment": rep_adjustment[:-1],
+        "count": count[:-1],
+        "used": used,
+        "first_used": first_used,
+        "heavy": heavy,
+        "first_heavy": heavy_rows[first_heavy],
+    }
+
+
+def predict_series(features: Dict[str, np.ndarray],
+                   prediction_weights: Dict[str, float],
+                   progressive_overload: float = 0.05,
+                   single_set: float = 0.025,
+                   push: float = 0.025) -> np.ndarray:
+    """
+    Predict the next weight after every prefix of a history from its features.
+
+    Gives the weights `FeedbackBasedPredictionModel.predict` returns for the
+    same prefixes. Parameters may be arrays of shape (trials, 1) to evaluate
+    several parameter sets at once.
+
+    Args:
+        features: Output of `series_features`
+        prediction_weights: Blend weights ('last_weight', 'avg_progress', 'consistency', 'volume')
+        progressive_overload: Relative increase always applied
+        single_set: Relative increase for single-set work
+        push: Extra relative increase while the user is progressing
+
+    Returns:
+        Predicted weights, shape (prefixes,) or (trials, prefixes)
+    """
+    last_weight = features["last_weight"]
+    prediction = (
+        prediction_weights["last_weight"] * last_weight +
+        prediction_weights["avg_progress"] * (last_weight + features["avg_progress"]) +
+        prediction_weights["consistency"] * features["consistency"] * last_weight +
+        prediction_weights["volume"] * features["volume_factor"] * last_weight
+    )
+    prediction = prediction * (1 + features["rep_adjustment"])
+    prediction = prediction * (1 + progressive_overload) * (1 + single_set)
+    prediction = prediction * np.where(features["is_progressing"], 1 + push, 1.0)
+
+    rounded = round_to_increment(prediction)
+    rounded = np.where(rounded <= last_weight, round_to_increment(last_weight + INCREMENT), rounded)
+
+    # A weight already lifted for 6+ reps (within 0.1) is increased once more
+    count = np.broadcast_to(features["count"], rounded.shape)
+    already_used = _first_index(features["used"], features["first_used"], rounded) < count
+    lifted_heavy = _first_index_near(features["heavy"], features["first_heavy"], rounded, 0.1) < count
+    return np.where(already_used & lifted_heavy, round_to_increment(rounded + INCREMENT), rounded)
+
+
+def backtest(workouts: pd.DataFrame,
+             prediction_weights: Optional[Dict[str, float]] = None,
+             min_history: int = 1,
+             progression_factors: Optional[Dict[str, float]] = None,
+             calibration: Optional[Dict[str, Dict[str, Any]]] = None) -> pd.DataFrame:
+    """
+    Replay every exercise history and score each prediction against the next workout.
+
+    Histories are per (user, exercise) when the data has users. A prediction
+    counts as a success when the next workout reached the predicted weight
+    and was not marked as failed.
+
+    Args:
+        workouts: Workout history with at least 'exercise', 'weight' and 'reps'
+        prediction_weights: Blend weights (default: the model's initial weights)
+        min_history: Only score predictions made from at least this many workouts
+        progression_factors: 'progressive_overload', 'single_set' and 'push'
+            increases (default: the model's initial factors)
+        calibration: Per-exercise calibration (`model.calibration`); calibrated
+            exercises are predicted with their own values and blend weights
+
+    Returns:
+        DataFrame with BACKTEST_COLUMNS, one row per exercise
+    """
+    model = FeedbackBasedPredictionModel()
+    prediction_weights = prediction_weights or model.prediction_weights
+    progression_factors = progression_factors or model.progression_factors
+    calibration = calibration or {}
+
+    totals: Dict[str, np.ndarray] = {}
+    for exercise, series in iter_series(workouts):
+        exercise_calibration = calibration.get(exercise)
+        features = series_features(series["weight"], series["reps"], exercise_calibration)
+        keep = features["count"] >= min_history
+        if not keep.any():
+            continue
+        blend = exercise_calibration["prediction_weights"] if exercise_calibration else prediction_weights
+        predicted = predict_series(features, blend, **progression_factors)[keep]
+        actual = series["weight"][1:][keep]
+        succeeded = (actual >= predicted) & series["success"][1:][keep]
+
+        error = predicted - actual
+        total = totals.setdefault(exercise, np.zeros(5))
+        total += [1, len(error), np.abs(error).sum(), error.sum(), succeeded.sum()]
+
+    rows = [
+        {
+            "exercise": exercise,
+            "series": int(series_count),
+            "predictions": int(count),
+            "mae": abs_error / count,
+            "bias": error / count,
+            "success_rate": successes / count,
+        }
+        for exercise, (series_count, count, abs_error, error, successes) in totals.items()
+    ]
+    return pd.DataFrame(rows, columns=BACKTEST_COLUMNS).sort_values("exercise", ignore_index=True)
+
+
+def iter_series(workouts: pd.DataFrame) -> Iterator[Tuple[str, Dict[str, np.ndarray]]]:
+    """
+    Split workouts into date-ordered exercise histories (per user when present).
+
+    Rows without weight or reps are skipped, since `predict()` cannot use them.
+
+    Args:
+        workouts: Workout history
+
+    Yields:
+        Tuples of (exercise, arrays of 'weight', 'reps', 'rir', 'success' and 'date')
+    """
+    required = ["exercise", "weight", "reps"]
+    if workouts.empty or any(col not in workouts.columns for col in required):
+        return
+    workouts = workouts.dropna(subset=required)
+    if "date" in workouts.columns:
+        workouts = workouts.assign(date=parse_dates(workouts["date"])).sort_values("date", kind="stable")
+    if "success" in workouts.columns:
+        # Only an explicit failure counts; missing flags are treated as completed
+        codes, uniques = pd.factorize(workouts["success"], use_na_sentinel=False)
+        table = np.array([_parse_bool(value) is not False for value in uniques], dtype=bool)
+        workouts = workouts.assign(success=table[codes])
+
+    keys = ["user", "exercise"] if "user" in workouts.columns else ["exercise"]
+    for key, series in workouts.groupby(keys, sort=True, dropna=False):
+        if len(series) < 2:
+            continue
+        yield key[-1], {
+            "weight": series["weight"].to_numpy(dtype=float),
+            "reps": series["reps"].to_numpy(dtype=float),
+            "rir": (pd.to_numeric(series["rir"], errors="coerce").to_numpy(dtype=float) if "rir" in series.columns
+                    else np.full(len(series), np.nan)),
+            "success": (series["success"].to_numpy(dtype=bool) if "success" in series.columns
+                        else np.ones(len(series), dtype=bool)),
+            "date": (series["date"].to_numpy(dtype="datetime64[ns]") if "date" in series.columns
+                     else np.full(len(series), np.datetime64("NaT"), dtype="datetime64[ns]")),
+        }
+
+
+def _first_index(keys: np.ndarray, first: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """First row index at which each value occurs in the sorted keys (inf if never)."""
+    position = np.minimum(np.searchsorted(keys, values), max(len(keys) - 1, 0))
+    if not len(keys):
+        return np.full(values.shape, np.inf)
+    return np.where(keys[position] == values, first[position], np.inf)
+
+
+def _first_index_near(keys: np.ndarray, first: np.ndarray, values: np.ndarray, tolerance: float) -> np.ndarray:
+    """First row index of any key strictly within `tolerance` of each value (inf if none)."""
+    low = np.searchsorted(keys, values - tolerance, side="right")
+    high = np.searchsorted(keys, values + tolerance, side="left")
+    result = np.full(values.shape, np.inf)
+    width = int((high - low).max()) if values.size else 0
+    for offset in range(width):
+        position = low + offset
+        inside = position < high
+        candidate = first[np.minimum(position, len(first) - 1)]
+        result = np.where(inside, np.minimum(result, candidate), result)
+    return result
@@ -0,0 +1,127 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..models.feedback_prediction_model import PREDICTION_MESSAGE
+from ..utils.rep_utils import generate_single_set_reps
+from .predictor import WorkoutPredictor
+
+PREDICTION_COLUMNS = ["user", "exercise", "weight", "reps", "suggested_reps", "confidence",
+                      "history", "last_date", "message"]
+
+
+def predict_all(workouts: pd.DataFrame,
+                workers: Optional[int] = None,
+                batch_size: int = 256,
+                prediction_weights: Optional[Dict[str, float]] = None,
+                calibration: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Predict the next workout of every exercise, per user when the data has users.
+
+    The workouts are split into batches of whole (user, exercise) series and
+    predicted by worker processes. Result frames are yielded in series order
+    as batches finish, so they can be written out while later batches run.
+
+    Args:
+        workouts: Workout history, e.g. from `DataCollector.load_training_data`
+        workers: Number of worker processes (default: CPU count)
+        batch_size: Number of series predicted per task
+        prediction_weights: Learned prediction weights, e.g. from the persisted
+            model state (default: the model's initial weights)
+        calibration: Per-exercise calibration from `WorkoutPredictor.fit_model`
+
+    Yields:
+        DataFrames with PREDICTION_COLUMNS (without 'user' if the data has no users)
+    """
+    batches = list(_series_batches(workouts, batch_size))
+    if not batches:
+        return
+
+    predict = partial(_predict_batch, prediction_weights=prediction_weights, calibration=calibration)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(batches) == 1:
+        for batch in batches:
+            yield predict(batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+        yield from executor.map(predict, batches)
+
+
+def _series_batches(workouts: pd.DataFrame, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Sort the workouts by series and date and cut them into batches of whole series."""
+    if workouts.empty or "exercise" not in workouts.columns:
+        return
+    workouts = workouts[workouts["exercise"].notna()]
+    keys = ["user", "exercise"] if "user" in workouts.columns else ["exercise"]
+    order = keys + ["date"] if "date" in workouts.columns else keys
+    workouts = workouts.sort_values(order, kind="stable", na_position="first").reset_index(drop=True)
+
+    # Row offsets where a new series starts
+    codes = [pd.factorize(workouts[key], use_na_sentinel=False)[0] for key in keys]
+    changed = np.zeros(len(workouts), dtype=bool)
+    changed[0] = True
+    for code in codes:
+        changed[1:] |= code[1:] != code[:-1]
+    starts = np.flatnonzero(changed)
+
+    bounds = np.append(starts[::batch_size], len(workouts))
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        yield workouts.iloc[begin:end]
+
+
+def _predict_batch(batch: pd.DataFrame,
+                   prediction_weights: Optional[Dict[str, float]] = None,
+                   calibration: Optional[Dict[str, Dict[str, Any]]] = None) -> pd.DataFrame:
+    """Predict every series of a batch."""
+    with_user = "user" in batch.columns
+    keys = ["user", "exercise"] if with_user else ["exercise"]
+    # One predictor for the batch: the reps, the only part of a prediction
+    # that depends on earlier predictions, are planned below for all series
+    # at once as for a first `predict` call
+    predictor = WorkoutPredictor()
+    if prediction_weights is not None:
+        predictor.model.prediction_weights = dict(prediction_weights)
+    if calibration:
+        predictor.model.calibration = dict(calibration)
+
+    rows: List[dict] = []
+    planned: List[int] = []
+    rep_inputs: List[Dict[str, float]] = []
+    for key, series in batch.groupby(keys, sort=False, dropna=False):
+        user, exercise = key if with_user else (None, key[0])
+        history = series.to_dict("records")
+        try:
+            result = predictor.predict_workout(exercise, history, suggest_reps=False)
+        except (TypeError, ValueError) as e:
+            # Keep going for the other series; malformed history gets no weight
+            result = {"weight": None, "confidence": 0, "message": f"Prediction failed: {e}"}
+        if "rep_inputs" in result:
+            planned.append(len(rows))
+            rep_inputs.append(result["rep_inputs"])
+        last_date = series["date"].iloc[-1] if "date" in series.columns else None
+        rows.append({
+            "user": None if pd.isna(user) else user,
+            "exercise": exercise,
+            "weight": result.get("weight"),
+            "reps": None,
+            "suggested_reps": "",
+            "confidence": result.get("confidence"),
+            "history": len(series),
+            "last_date": None if pd.isna(last_date) else pd.Timestamp(last_date).isoformat(),
+            "message": result.get("message"),
+        })
+
+    if planned:
+        inputs = {name: np.array([row[name] for row in rep_inputs]) for name in rep_inputs[0]}
+        suggested_reps = generate_single_set_reps(**inputs, workout_counter=0)
+        for index, row, reps in zip(planned, rep_inputs, suggested_reps.tolist()):
+            rows[index].update(reps=reps, suggested_reps=str(reps),
+                               message=PREDICTION_MESSAGE.format(weight=row["predicted_weight"], reps=reps))
+
+    columns = PREDICTION_COLUMNS if with_user else PREDICTION_COLUMNS[1:]
+    return pd.DataFrame(rows, columns=columns)
@@ -1,6 +1,8 @@
+import os
 from typing import List, Dict, Any
 import numpy as np
 from ..models.feedback_prediction_model import FeedbackBasedPredictionModel
+from ..models.model_state import STATE_FILENAME, load_state, save_state
 
 class WorkoutPredictor:
     """
@@ -9,9 +11,33 @@ class WorkoutPredictor:
     """
     
     def __init__(self, model_dir: str = None):
+        """
+        Args:
+            model_dir: Directory of the persisted model state. When set, the
+                state is loaded from it and saved after every feedback or reset.
+        """
         self.model = FeedbackBasedPredictionModel()
+        self.model_dir = model_dir
+        self.state_path = os.path.join(model_dir, STATE_FILENAME) if model_dir else None
+        
+        if self.state_path:
+            try:
+                load_state(self.model, self.state_path)
+            except ValueError as e:
+                print(f"Warning: {e}; starting with a fresh model")
     
-    def predict_workout(self, exercise: str, previous_workouts: List[Dict[str, Any]], debug: bool = False) -> Dict[str, Any]:
+    def save_state(self) -> None:
+        """
+        Persist the model state to `model_dir` (no-op without a model directory).
+        
+        Buffered feedback samples and remembered predictions are saved with
+        it, so mini-batches fill up across CLI runs.
+        """
+        if self.state_path:
+            save_state(self.model, self.state_path)
+    
+    def predict_workout(self, exercise: str, previous_workouts: List[Dict[str, Any]], debug: bool = False,
+                        suggest_reps: bool = True, user: str = None) -> Dict[str, Any]:
         """
         Predict weight for the next workout
         
@@ -20,11 +46,15 @@ class WorkoutPredictor:
             previous_workouts: List of previous workout data
                 Each dict should have 'weight', 'reps', etc.
             debug: Whether to show detailed debugging information
+            suggest_reps: Whether to plan the reps. Otherwise 'suggested_reps'
+                and 'message' are None and 'rep_inputs' holds the arguments
+                of `generate_single_set_reps`
+            user: User the prediction is for (feedback is matched per user)
                 
         Returns:
             Dictionary with predicted weight, confidence, and suggestions
         """
-        return self.model.predict(exercise, previous_workouts, debug=debug)
+        return self.model.predict(exercise, previous_workouts, debug=debug, suggest_reps=suggest_reps, user=user)
     
     def record_feedback(self, 
                       exercise: str, 
@@ -32,7 +62,8 @@ class WorkoutPredictor:
                       actual_weight: float, 
                       success: bool,
                       reps: int = None,
-                      rir: int = None) -> Dict[str, Any]:
+                      rir: int = None,
+                      user: str = None) -> Dict[str, Any]:
         """
         Record feedback about a prediction to improve future predictions
         
@@ -43,33 +74,55 @@ class WorkoutPredictor:
             success: Whether the workout was completed successfully
             reps: Number of reps completed (optional)
             rir: Reps In Reserve - how many more reps could have been done (optional)
+            user: User the prediction was made for (optional)
             
         Returns:
             Dictionary with feedback results
         """
-        return self.model.provide_feedback(
+        result = self.model.provide_feedback(
             exercise, 
             predicted_weight, 
             actual_weight, 
             success, 
             reps, 
-            rir
+            rir,
+            user=user
         )
+        self.save_state()
+        return result
     
-    def fit_model(self, workout_data):
+    def fit_model(self, workout_data, save: bool = True):
         """
         Train the model with historical workout data
         
+        Fits per-exercise calibration (progression rate, rep distribution,
+        volume scale and blend weights) in one grouped pass; `predict_workout`
+        then uses these values for the calibrated exercises.
+        
         Args:
             workout_data: DataFrame with workout history
+            save: Whether to persist the fitted state to `model_dir`
             
         Returns:
             Self for method chaining
         """
-        # For now, we just store the data but don't do any complex training
-        # Future implementations could add more sophisticated model fitting
+        self.model.fit(workout_data)
+        if save:
+            self.save_state()
         return self
     
+    def is_fitted(self, exercise: str) -> bool:
+        """
+        Check whether the model has calibration for an exercise.
+        
+        Args:
+            exercise: Name of the exercise
+            
+        Returns:
+            True if `fit_model` calibrated the exercise
+        """
+        return exercise in self.model.calibration
+    
     def reset_model(self, reset_type: str = 'all'):
         """
         Reset the model data
@@ -79,6 +132,7 @@ class WorkoutPredictor:
                 - 'all': Reset everything (default)
                 - 'feedback': Clear only feedback history
                 - 'weights': Reset only prediction weights
+                - 'calibration': Reset only the fitted per-exercise calibration
                 - 'scalers': Reset only scalers
                 
         Returns:
@@ -86,6 +140,10 @@ class WorkoutPredictor:
         """
         if reset_type == 'all' or reset_type == 'feedback':
             self.model.feedback_history = []
+            self.model.feedback_buffer.clear()
+            
+        if reset_type == 'all' or reset_type == 'calibration':
+            self.model.calibration = {}
             
         if reset_type == 'all' or reset_type == 'weights':
             self.model.prediction_weights = {
@@ -94,7 +152,9 @@ class WorkoutPredictor:
                 "consistency": 0.2,
                 "volume": 0.1
             }
-            
+        
+        self.save_state()
+        
         return {
             "success": True,
             "message": f"Successfully reset {reset_type} data"
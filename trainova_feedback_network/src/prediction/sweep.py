@@ -0,0 +1,316 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..models.feedback_prediction_model import FeedbackBasedPredictionModel
+from ..models.online_learning import DEFAULT_BATCH_SIZE, gradient_step
+from .backtest import iter_series, predict_series, series_features
+
+WEIGHT_PARAMETERS = ["last_weight", "avg_progress", "consistency", "volume"]
+FACTOR_PARAMETERS = ["progressive_overload", "single_set", "push"]
+SWEEP_PARAMETERS = WEIGHT_PARAMETERS + ["feedback_influence"] + FACTOR_PARAMETERS
+METRIC_COLUMNS = ["predictions", "mae", "bias", "success_rate"]
+OBJECTIVES = ["mae", "bias", "success_rate"]
+
+# Features with one value per history prefix (the others are lookup tables)
+_PREFIX_FEATURES = {"last_weight", "consistency", "volume_factor", "avg_progress",
+                    "is_progressing", "rep_adjustment", "count"}
+
+# A parameter is either a list of values or a (low, high) range for random search
+ParameterSpace = Dict[str, Union[List[float], Tuple[float, float]]]
+
+# Prepared histories of the current worker process
+_SERIES: List[Dict[str, Any]] = []
+_FEEDBACK_ORDER: Optional[np.ndarray] = None
+
+
+def parse_parameter_space(specs: Sequence[str]) -> ParameterSpace:
+    """
+    Parse 'name=v1,v2,...' (values) and 'name=low:high' (range) parameter specs.
+
+    Args:
+        specs: Parameter specs, e.g. ['push=0,0.025,0.05', 'last_weight=0.6:0.9']
+
+    Returns:
+        Parameter space dictionary
+
+    Raises:
+        ValueError: For unknown parameters or malformed values
+    """
+    space: ParameterSpace = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        name = name.strip()
+        if name not in SWEEP_PARAMETERS:
+            raise ValueError(f"Unknown parameter: {name}. Valid parameters are: {', '.join(SWEEP_PARAMETERS)}")
+        if ":" in values:
+            low, high = (float(value) for value in values.split(":"))
+            space[name] = (low, high)
+        else:
+            space[name] = [float(value) for value in values.split(",") if value.strip()]
+        if not space[name]:
+            raise ValueError(f"No values given for {name}")
+    return space
+
+
+def default_parameters(model: Optional[FeedbackBasedPredictionModel] = None) -> Dict[str, float]:
+    """
+    Return the sweep parameters of a model (default: a freshly initialized one).
+
+    Args:
+        model: Model to read the parameters from
+
+    Returns:
+        Dictionary with a value for every SWEEP_PARAMETERS entry
+    """
+    model = model or FeedbackBasedPredictionModel()
+    parameters = {name: float(model.prediction_weights[name]) for name in WEIGHT_PARAMETERS}
+    parameters["feedback_influence"] = float(model.feedback_influence)
+    parameters.update({name: float(model.progression_factors[name]) for name in FACTOR_PARAMETERS})
+    return parameters
+
+
+def parameter_grid(space: ParameterSpace, base: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Build every combination of the listed parameter values.
+
+    Args:
+        space: Values per parameter (ranges are not allowed in a grid)
+        base: Values of the parameters not in `space` (default: `default_parameters()`)
+
+    Returns:
+        DataFrame with one row per trial and SWEEP_PARAMETERS columns
+    """
+    base = base or default_parameters()
+    names = list(space)
+    for name in names:
+        if isinstance(space[name], tuple):
+            raise ValueError(f"A grid needs a list of values for {name}, not a range")
+    combinations = list(itertools.product(*(space[name] for name in names)))
+    trials = pd.DataFrame([base] * len(combinations), columns=SWEEP_PARAMETERS)
+    for index, name in enumerate(names):
+        trials[name] = [combination[index] for combination in combinations]
+    return trials
+
+
+def random_parameters(space: ParameterSpace,
+                      trials: int,
+                      seed: Optional[int] = None,
+                      base: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Sample trials at random: ranges uniformly, value lists by choice.
+
+    Args:
+        space: Range or values per parameter
+        trials: Number of trials
+        seed: Random seed
+        base: Values of the parameters not in `space` (default: `default_parameters()`)
+
+    Returns:
+        DataFrame with one row per trial and SWEEP_PARAMETERS columns
+    """
+    rng = np.random.default_rng(seed)
+    base = base or default_parameters()
+    result = pd.DataFrame([base] * trials, columns=SWEEP_PARAMETERS)
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            result[name] = rng.uniform(values[0], values[1], trials)
+        else:
+            result[name] = rng.choice(np.asarray(values, dtype=float), trials)
+    return result
+
+
+def run_sweep(workouts: pd.DataFrame,
+              trials: pd.DataFrame,
+              workers: Optional[int] = None,
+              min_history: int = 1,
+              feedback: bool = False,
+              objective: str = "mae",
+              calibration: Optional[Dict[str, Dict[str, Any]]] = None) -> pd.DataFrame:
+    """
+    Backtest every parameter set on all exercise histories and rank them.
+
+    Each worker process prepares the histories once and then evaluates its
+    chunk of trials together: the parameters become (trials, 1) arrays that
+    broadcast against each history's per-prefix features.
+
+    Without `feedback` the parameters stay fixed during the replay, so
+    `feedback_influence` has no effect. With `feedback` every prediction is
+    followed by `provide_feedback` for the actual next workout, in date
+    order across all histories, so the weights evolve as they would in use
+    (one mini-batch gradient step per DEFAULT_BATCH_SIZE feedback entries).
+    That replay is sequential over workouts (vectorized only across trials)
+    and much slower.
+
+    With `calibration` (`model.calibration`), calibrated exercises are
+    predicted from their own values and blend weights, as `predict()` does,
+    so the trials' blend weights only apply to the other exercises; with
+    `feedback` the calibrated blends are updated from their own samples.
+
+    Args:
+        workouts: Workout history
+        trials: Parameter sets with SWEEP_PARAMETERS columns
+        workers: Number of worker processes (default: CPU count)
+        min_history: Only score predictions made from at least this many workouts
+        feedback: Whether to simulate feedback after every prediction
+        objective: Ranking metric: 'mae' (lowest), 'bias' (closest to 0) or 'success_rate' (highest)
+        calibration: Per-exercise calibration to apply (default: none)
+
+    Returns:
+        The trials with METRIC_COLUMNS added, best first, with a 'rank' column
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}. Valid objectives are: {', '.join(OBJECTIVES)}")
+
+    series = _prepare_series(workouts, min_history, calibration or {})
+    values = trials[SWEEP_PARAMETERS].to_numpy(dtype=float)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(values)))
+    # The feedback replay is sequential per chunk, so it gets one chunk per worker
+    chunk_count = min(len(values), workers if feedback else workers * 4)
+    chunks = np.array_split(values, chunk_count) if chunk_count else []
+
+    if workers == 1:
+        _init_worker(series, feedback)
+        totals = [_evaluate(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(series, feedback)) as executor:
+            totals = list(executor.map(_evaluate, chunks))
+
+    count, abs_error, error, successes = np.concatenate(totals).T if totals else np.zeros((4, 0))
+    results = trials[SWEEP_PARAMETERS].reset_index(drop=True).copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        results["predictions"] = count.astype(int)
+        results["mae"] = abs_error / count
+        results["bias"] = error / count
+        results["success_rate"] = successes / count
+
+    if objective == "bias":
+        order = results["bias"].abs().argsort(kind="stable")
+    elif objective == "success_rate":
+        order = (-results["success_rate"]).argsort(kind="stable")
+    else:
+        order = results["mae"].argsort(kind="stable")
+    results = results.iloc[order].reset_index(drop=True)
+    results.insert(0, "rank", np.arange(1, len(results) + 1))
+    return results
+
+
+def _prepare_series(workouts: pd.DataFrame,
+                    min_history: int,
+                    calibration: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    prepared = []
+    for exercise, series in iter_series(workouts):
+        exercise_calibration = calibration.get(exercise)
+        features = series_features(series["weight"], series["reps"], exercise_calibration)
+        prepared.append({
+            "exercise": exercise,
+            # Calibrated exercises keep their own blend instead of the trial's
+            "blend": (np.array([exercise_calibration["prediction_weights"][name] for name in WEIGHT_PARAMETERS])
+                      if exercise_calibration else None),
+            "features": features,
+            "keep": features["count"] >= min_history,
+            "actual": series["weight"][1:],
+            "success": series["success"][1:],
+            "rir": series["rir"][1:],
+            "date": series["date"][1:],
+        })
+    return prepared
+
+
+def _init_worker(series: List[Dict[str, Any]], feedback: bool) -> None:
+    global _SERIES, _FEEDBACK_ORDER
+    _SERIES = series
+    _FEEDBACK_ORDER = None
+    if feedback and series:
+        # Feedback arrives in the order the next workouts happened
+        index = np.concatenate([np.full(len(s["actual"]), i) for i, s in enumerate(series)])
+        step = np.concatenate([np.arange(len(s["actual"])) for s in series])
+        dates = np.concatenate([s["date"] for s in series])
+        order = np.argsort(dates, kind="stable")
+        _FEEDBACK_ORDER = np.stack([index[order], step[order]], axis=1)
+
+
+def _split(values: np.ndarray) -> Tuple[Dict[str, np.ndarray], np.ndarray, Dict[str, np.ndarray]]:
+    """Split a (trials, parameters) matrix into weights, influence and factors of shape (trials, 1)."""
+    columns = {name: values[:, i:i + 1] for i, name in enumerate(SWEEP_PARAMETERS)}
+    weights = {name: columns[name] for name in WEIGHT_PARAMETERS}
+    factors = {name: columns[name] for name in FACTOR_PARAMETERS}
+    return weights, columns["feedback_influence"][:, 0], factors
+
+
+def _evaluate(values: np.ndarray) -> np.ndarray:
+    """Return (trials, 4) totals: predictions, absolute error, error and successes."""
+    if _FEEDBACK_ORDER is not None:
+        return _evaluate_with_feedback(values)
+
+    weights, _, factors = _split(values)
+    totals = np.zeros((len(values), 4))
+    for series in _SERIES:
+        keep = series["keep"]
+        if not keep.any():
+            continue
+        blend = weights if series["blend"] is None else dict(zip(WEIGHT_PARAMETERS, series["blend"]))
+        predicted = np.broadcast_to(predict_series(series["features"], blend, **factors),
+                                    (len(values), len(keep)))[:, keep]
+        actual = series["actual"][keep]
+        error = predicted - actual
+        totals[:, 0] += keep.sum()
+        totals[:, 1] += np.abs(error).sum(axis=1)
+        totals[:, 2] += error.sum(axis=1)
+        totals[:, 3] += ((actual >= predicted) & series["success"][keep]).sum(axis=1)
+    return totals
+
+
+def _evaluate_with_feedback(values: np.ndarray) -> np.ndarray:
+    weights, influence, factors = _split(values)
+    matrix = np.hstack([weights[name] for name in WEIGHT_PARAMETERS])
+    # Per-trial blends of the calibrated exercises
+    blends = {series["exercise"]: np.tile(series["blend"], (len(values), 1))
+              for series in _SERIES if series["blend"] is not None}
+    totals = np.zeros((len(values), 4))
+    terms, multipliers, actuals, exercises = [], [], [], []
+
+    for index, step in _FEEDBACK_ORDER:
+        series = _SERIES[index]
+        features = {key: (value[step:step + 1] if key in _PREFIX_FEATURES else value)
+                    for key, value in series["features"].items()}
+        blend = blends.get(series["exercise"], matrix)
+        current = {name: blend[:, i:i + 1] for i, name in enumerate(WEIGHT_PARAMETERS)}
+        predicted = predict_series(features, current, **factors)[:, 0]
+        actual, success = series["actual"][step], series["success"][step]
+
+        if series["keep"][step]:
+            error = predicted - actual
+            totals[:, 0] += 1
+            totals[:, 1] += np.abs(error)
+            totals[:, 2] += error
+            totals[:, 3] += (actual >= predicted) & success
+
+        # FeedbackBasedPredictionModel.provide_feedback / update_prediction_weights:
+        # buffer the blend terms and take a gradient step per full batch
+        if actual <= 0:
+            continue
+        last_weight = features["last_weight"][0]
+        terms.append([last_weight, last_weight + features["avg_progress"][0],
+                      features["consistency"][0] * last_weight, features["volume_factor"][0] * last_weight])
+        multipliers.append((1 + features["rep_adjustment"][0])
+                           * (1 + factors["progressive_overload"][:, 0]) * (1 + factors["single_set"][:, 0])
+                           * (1 + factors["push"][:, 0] if features["is_progressing"][0] else 1.0))
+        actuals.append(actual)
+        exercises.append(series["exercise"])
+        if len(actuals) >= DEFAULT_BATCH_SIZE:
+            terms, multipliers, actuals = np.array(terms), np.stack(multipliers, axis=1), np.array(actuals)
+            matrix = gradient_step(matrix, terms, multipliers, actuals, influence[:, None])
+            # A per-exercise step on its own samples equals the model's grouped step
+            exercises = np.array(exercises)
+            for exercise in set(exercises) & set(blends):
+                rows = exercises == exercise
+                blends[exercise] = gradient_step(blends[exercise], terms[rows], multipliers[:, rows],
+                                                 actuals[rows], influence[:, None])
+            terms, multipliers, actuals, exercises = [], [], [], []
+    return totals
@@ -0,0 +1 @@
+# This file initializes the storage package.
\ No newline at end of file
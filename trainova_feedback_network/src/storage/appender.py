@@ -0,0 +1,167 @@
+import csv
+import os
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .schema import WORKOUT_COLUMNS
+
+
+class BufferedAppender:
+    """
+    Buffers workouts and writes them in batches.
+
+    Rows are flushed when `max_rows` are buffered or `max_delay` seconds after
+    the first unflushed row, whichever comes first, and on `close()`. The
+    appender is thread-safe, so several request threads can share one.
+    Subclasses implement `_write_rows`.
+    """
+
+    def __init__(self, max_rows: int = 1000, max_delay: float = 1.0):
+        """
+        Initialize the appender.
+
+        Args:
+            max_rows: Number of buffered rows that triggers a flush
+            max_delay: Seconds after which buffered rows are flushed (0 disables)
+        """
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.rows_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+
+    def append(self, workout: Dict[str, Any]) -> None:
+        """
+        Buffer a single workout.
+
+        Args:
+            workout: Workout dictionary (keys outside the schema are ignored)
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("Cannot append to a closed appender")
+            self._buffer.append(workout)
+
+            if len(self._buffer) >= self.max_rows:
+                self.flush()
+            elif len(self._buffer) == 1 and self.max_delay > 0:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write all buffered workouts."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            self._write_rows(rows)
+            self.rows_written += len(rows)
+
+    def close(self) -> None:
+        """Flush buffered workouts and release resources."""
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            self._close()
+
+    def __enter__(self) -> "BufferedAppender":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError("_write_rows must be implemented in derived classes.")
+
+    def _close(self) -> None:
+        pass
+
+
+class CSVWorkoutAppender(BufferedAppender):
+    """
+    Buffered appender for a workout CSV file.
+
+    The file handle is opened once and reused. The column layout is fixed:
+    an existing file keeps its header, a new file gets WORKOUT_COLUMNS, so
+    rows never drift from the header regardless of the keys of each dict.
+    """
+
+    def __init__(self, file_path: str, max_rows: int = 1000, max_delay: float = 1.0):
+        """
+        Open the CSV file for appending.
+
+        Args:
+            file_path: CSV file to append to (created with a header if missing)
+            max_rows: Number of buffered rows that triggers a flush
+            max_delay: Seconds after which buffered rows are flushed
+        """
+        super().__init__(max_rows, max_delay)
+        self.file_path = file_path
+
+        file_exists = os.path.isfile(file_path) and os.path.getsize(file_path) > 0
+        if file_exists:
+            with open(file_path, newline='') as file:
+                self.columns = next(csv.reader(file))
+        else:
+            self.columns = list(WORKOUT_COLUMNS)
+
+        self._file = open(file_path, mode='a', newline='', buffering=1024 * 1024)
+        self._writer = csv.writer(self._file)
+        if not file_exists:
+            self._writer.writerow(self.columns)
+            self._file.flush()
+
+    def _write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        columns = self.columns
+        self._writer.writerows([[_csv_value(row.get(col)) for col in columns] for row in rows])
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class StoreWorkoutAppender(BufferedAppender):
+    """Buffered appender for a workout store (SQLite or Parquet)."""
+
+    def __init__(self, store: Any, dataset: str, max_rows: int = 1000, max_delay: float = 1.0):
+        """
+        Initialize the appender.
+
+        Args:
+            store: Store with an `append(workouts, dataset)` method
+            dataset: Dataset to append to
+            max_rows: Number of buffered rows that triggers a flush
+            max_delay: Seconds after which buffered rows are flushed
+        """
+        super().__init__(max_rows, max_delay)
+        self.store = store
+        self.dataset = dataset
+
+    def _write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        self.store.append(rows, dataset=self.dataset)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None or value is pd.NA:
+        return ""
+    if isinstance(value, float) and value != value:
+        return ""
+    if isinstance(value, (pd.Timestamp, datetime)):
+        if value.hour == 0 and value.minute == 0 and value.second == 0 and value.microsecond == 0:
+            return value.strftime("%Y-%m-%d")
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
@@ -0,0 +1,380 @@
+import io
+import json
+import os
+import shutil
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .schema import REQUIRED_COLUMNS, WORKOUT_COLUMNS, _parse_bool, date_bounds, parse_dates
+
+CACHE_VERSION = 1
+
+# Numeric columns stored as float64 arrays (NaN for missing values)
+_NUMERIC_COLUMNS = ["weight", "reps", "sets", "rir", "rpe"]
+
+# Number of bytes before the parsed offset used to detect rewritten files
+_TAIL_BYTES = 256
+
+
+class DatasetCache:
+    """
+    Binary cache of parsed workout CSV files.
+
+    Each CSV gets a cache directory with one `.npy` array per column, sorted
+    by (exercise, date), plus an exercise offset index and a date-order
+    permutation. Arrays are memory-mapped on load, so reading one exercise
+    only touches that exercise's slice.
+
+    The cache is keyed on the source file's size and mtime. When the file
+    only grew (rows were appended), just the new bytes are parsed and merged
+    into the cache; any other change triggers a full rebuild.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding one cache entry per source file
+        """
+        self.cache_dir = cache_dir
+        # Opened arrays per source file, reused while its cache version is current
+        self._opened: Dict[str, Any] = {}
+
+    def load(self,
+             source_path: str,
+             exercise: Optional[Union[str, Sequence[str]]] = None,
+             since: Any = None,
+             until: Any = None,
+             user: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load a workout CSV through the cache, sorted by date.
+
+        Args:
+            source_path: Path to the source CSV file
+            exercise: Exercise name or list of names to keep
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all cached columns)
+
+        Returns:
+            DataFrame containing the matching workouts
+        """
+        entry = self._refresh(source_path)
+        columns = self._columns(entry["meta"], columns)
+        rows = self._select(entry, exercise, since, until, user)
+        return self._frame(entry["meta"], entry["arrays"], rows, columns)
+
+    def iter_chunks(self,
+                    source_path: str,
+                    exercise: Optional[Union[str, Sequence[str]]] = None,
+                    since: Any = None,
+                    until: Any = None,
+                    user: Optional[str] = None,
+                    columns: Optional[List[str]] = None,
+                    chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Stream matching workouts of a CSV file in date order.
+
+        Only the selected row numbers are held in memory; each chunk is
+        built from the memory-mapped columns when it is requested.
+
+        Args:
+            source_path: Path to the source CSV file
+            exercise: Exercise name or list of names to keep
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all cached columns)
+            chunksize: Maximum rows per chunk
+
+        Yields:
+            DataFrames of at most `chunksize` rows
+        """
+        entry = self._refresh(source_path)
+        columns = self._columns(entry["meta"], columns)
+        rows = self._select(entry, exercise, since, until, user)
+        for start in range(0, len(rows), chunksize):
+            yield self._frame(entry["meta"], entry["arrays"], rows[start:start + chunksize], columns)
+
+    def exercises(self, source_path: str) -> List[str]:
+        """
+        List the exercises of a cached CSV file without loading any rows.
+
+        Args:
+            source_path: Path to the source CSV file
+
+        Returns:
+            Exercise names in order of first appearance in the file
+        """
+        entry = self._refresh(source_path)
+        offsets = entry["arrays"]["offsets"]
+        return [name for code, name in enumerate(entry["meta"]["exercises"])
+                if offsets[code + 1] > offsets[code]]
+
+    def invalidate(self, source_path: str) -> None:
+        """
+        Remove the cache entry of a source file.
+
+        Args:
+            source_path: Path to the source CSV file
+        """
+        entry_dir = self._entry_dir(source_path)
+        if os.path.isdir(entry_dir):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def _columns(self, meta: Dict[str, Any], columns: Optional[List[str]]) -> List[str]:
+        available = meta["columns"]
+        return [col for col in (columns or available) if col in available]
+
+    def _select(self, entry: Dict[str, Any], exercise: Optional[Union[str, Sequence[str]]],
+                since: Any, until: Any, user: Optional[str]) -> np.ndarray:
+        """Return the cache row numbers of matching workouts, in date order."""
+        meta = entry["meta"]
+        arrays = entry["arrays"]
+
+        # Exercise slices come from the offset index and are already
+        # date-sorted; everything else goes through the date order
+        if exercise is not None:
+            names = [exercise] if isinstance(exercise, str) else list(exercise)
+            codes = [meta["exercises"].index(name) for name in names if name in meta["exercises"]]
+            offsets = arrays["offsets"]
+            rows = np.concatenate([np.arange(offsets[code], offsets[code + 1]) for code in codes]) \
+                if codes else np.array([], dtype=np.int64)
+            if len(codes) > 1:
+                rows = rows[np.lexsort((arrays["row"][rows], arrays["date"][rows]))]
+        else:
+            rows = np.asarray(arrays["date_order"])
+
+        since, until = date_bounds(since, until)
+        if since is not None or until is not None:
+            # Rows are in date order, so the range is a contiguous slice
+            dates = arrays["date"][rows]
+            start = np.searchsorted(dates, np.datetime64(since)) if since is not None else 0
+            end = np.searchsorted(dates, np.datetime64(until), side="right") if until is not None else len(rows)
+            rows = rows[start:end]
+
+        if user is not None:
+            users = meta["users"]
+            code = users.index(user) if user in users else -2
+            rows = rows[arrays["user"][rows] == code]
+
+        return rows
+
+    def _entry_dir(self, source_path: str) -> str:
+        return os.path.join(self.cache_dir, os.path.basename(source_path))
+
+    def _refresh(self, source_path: str) -> Dict[str, Any]:
+        """Return a valid cache entry, parsing only what changed in the source."""
+        stat = os.stat(source_path)
+        meta = self._read_meta(source_path)
+
+        if meta is not None and meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+            return {"meta": meta, "arrays": self._open_arrays(source_path, meta)}
+
+        # A last line parsed without its newline may have been extended, so that needs a rebuild
+        if (meta is not None and stat.st_size > meta["size"] and meta["tail"].endswith("0a")
+                and self._is_append(source_path, meta)):
+            old_arrays = self._open_arrays(source_path, meta)
+            new_rows = self._parse(source_path, meta["columns"], start=meta["parsed_bytes"])
+            return self._write(source_path, stat, meta, old_arrays, new_rows)
+
+        header = pd.read_csv(source_path, nrows=0).columns.tolist()
+        unknown = [col for col in header if col not in WORKOUT_COLUMNS]
+        missing = [col for col in REQUIRED_COLUMNS if col not in header]
+        if unknown or missing:
+            raise ValueError(f"Cannot cache {source_path}: columns do not match the workout schema")
+        rows = self._parse(source_path, header, start=None)
+        return self._write(source_path, stat, None, None, rows)
+
+    def _read_meta(self, source_path: str) -> Optional[Dict[str, Any]]:
+        meta_path = os.path.join(self._entry_dir(source_path), "meta.json")
+        try:
+            with open(meta_path) as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if meta.get("cache_version") != CACHE_VERSION:
+            return None
+        return meta
+
+    def _is_append(self, source_path: str, meta: Dict[str, Any]) -> bool:
+        """Check that the bytes before the parsed offset are unchanged."""
+        start = max(meta["parsed_bytes"] - _TAIL_BYTES, 0)
+        with open(source_path, "rb") as file:
+            file.seek(start)
+            tail = file.read(meta["parsed_bytes"] - start)
+        return tail.hex() == meta["tail"]
+
+    def _parse(self, source_path: str, header: List[str], start: Optional[int]) -> Dict[str, Any]:
+        """
+        Parse CSV lines from `start`, or the whole file when `start` is None.
+
+        An incremental parse only takes complete lines, leaving a partially
+        written last line for the next refresh. A full parse takes the last
+        line even without a trailing newline, as hand-edited files often end.
+        """
+        with open(source_path, "rb") as file:
+            if start is None:
+                data = file.read()
+                offset = 0
+            else:
+                file.seek(start)
+                data = file.read()
+                offset = start
+
+        # Appends only parse complete lines; a partially written last line is left for later
+        end = len(data) if start is None else data.rfind(b"\n") + 1
+        data = data[:end]
+
+        if start is None:
+            df = pd.read_csv(io.BytesIO(data)) if data else pd.DataFrame(columns=header)
+        else:
+            df = pd.read_csv(io.BytesIO(data), header=None, names=header) if data.strip() else \
+                pd.DataFrame(columns=header)
+
+        parsed_bytes = offset + end
+        with open(source_path, "rb") as file:
+            tail_start = max(parsed_bytes - _TAIL_BYTES, 0)
+            file.seek(tail_start)
+            tail = file.read(parsed_bytes - tail_start)
+
+        return {"df": df, "parsed_bytes": parsed_bytes, "tail": tail.hex()}
+
+    def _write(self, source_path: str, stat: os.stat_result, old_meta: Optional[Dict[str, Any]],
+               old_arrays: Optional[Dict[str, np.ndarray]], parsed: Dict[str, Any]) -> Dict[str, Any]:
+        df = parsed["df"]
+        columns = list(df.columns) if old_meta is None else old_meta["columns"]
+        exercises = list(old_meta["exercises"]) if old_meta else []
+        users = list(old_meta["users"]) if old_meta else []
+
+        arrays = self._encode(df, exercises, users)
+        first_row = old_meta["rows"] if old_meta else 0
+        arrays["row"] = np.arange(first_row, first_row + len(df), dtype=np.int64)
+        if old_arrays is not None:
+            # Only the appended rows were parsed; merge them with the cached
+            # columns and re-sort the combined arrays below
+            arrays = {name: np.concatenate([old_arrays[name], values]) for name, values in arrays.items()}
+
+        # Rows with the same date keep their order in the source file
+        order = np.lexsort((arrays["row"], arrays["date"], arrays["exercise"]))
+        arrays = {name: values[order] for name, values in arrays.items()}
+        arrays["offsets"] = np.searchsorted(arrays["exercise"], np.arange(len(exercises) + 1)).astype(np.int64)
+        arrays["date_order"] = np.lexsort((arrays["row"], arrays["date"])).astype(np.int64)
+
+        meta = {
+            "cache_version": CACHE_VERSION,
+            "source": os.path.abspath(source_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "parsed_bytes": parsed["parsed_bytes"],
+            "tail": parsed["tail"],
+            "columns": columns,
+            "exercises": exercises,
+            "users": users,
+            "rows": int(len(arrays["date"])),
+            "version": uuid.uuid4().hex
+        }
+
+        entry_dir = self._entry_dir(source_path)
+        version_dir = os.path.join(entry_dir, meta["version"])
+        os.makedirs(version_dir, exist_ok=True)
+        for name, values in arrays.items():
+            np.save(os.path.join(version_dir, f"{name}.npy"), values)
+
+        # Publish the new version by atomically replacing meta.json
+        tmp_meta = os.path.join(entry_dir, f"meta.json.{meta['version']}")
+        with open(tmp_meta, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp_meta, os.path.join(entry_dir, "meta.json"))
+
+        for name in os.listdir(entry_dir):
+            path = os.path.join(entry_dir, name)
+            if os.path.isdir(path) and name != meta["version"]:
+                shutil.rmtree(path, ignore_errors=True)
+
+        return {"meta": meta, "arrays": self._open_arrays(source_path, meta)}
+
+    def _encode(self, df: pd.DataFrame, exercises: List[str], users: List[str]) -> Dict[str, np.ndarray]:
+        """Convert a parsed CSV frame into cache column arrays."""
+        n = len(df)
+        missing = pd.Series([None] * n, index=df.index, dtype=object)
+
+        encoded = {}
+        encoded["date"] = (parse_dates(df["date"]).to_numpy(dtype="datetime64[ns]") if "date" in df.columns
+                           else np.full(n, np.datetime64("NaT"), dtype="datetime64[ns]"))
+        encoded["exercise"] = _encode_labels(df["exercise"].astype("string").str.strip(), exercises)
+        encoded["user"] = _encode_labels(df["user"] if "user" in df.columns else missing, users)
+
+        encoded["success"] = np.full(n, -1, dtype=np.int8)
+        if "success" in df.columns:
+            codes, uniques = pd.factorize(df["success"])
+            parsed = [_parse_bool(value) for value in uniques]
+            table = np.array([-1 if value is None else int(value) for value in parsed] + [-1], dtype=np.int8)
+            encoded["success"] = table[codes]
+
+        for col in _NUMERIC_COLUMNS:
+            encoded[col] = (pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64) if col in df.columns
+                            else np.full(n, np.nan))
+        return encoded
+
+    def _open_arrays(self, source_path: str, meta: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        opened = self._opened.get(source_path)
+        if opened is not None and opened[0] == meta["version"]:
+            return opened[1]
+
+        version_dir = os.path.join(self._entry_dir(source_path), meta["version"])
+        arrays = {}
+        for file_name in os.listdir(version_dir):
+            if file_name.endswith(".npy"):
+                arrays[file_name[:-4]] = np.load(os.path.join(version_dir, file_name), mmap_mode="r")
+        self._opened[source_path] = (meta["version"], arrays)
+        return arrays
+
+    def _frame(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray],
+               rows: np.ndarray, columns: List[str]) -> pd.DataFrame:
+        data = {}
+        for col in columns:
+            if col == "exercise":
+                data[col] = _decode_labels(arrays["exercise"][rows], meta["exercises"])
+            elif col == "user":
+                data[col] = _decode_labels(arrays["user"][rows], meta["users"])
+            elif col == "date":
+                data[col] = pd.to_datetime(np.asarray(arrays["date"][rows]))
+            elif col == "success":
+                values = np.asarray(arrays["success"][rows])
+                data[col] = values == 1
+                if (values < 0).any():
+                    data[col] = pd.Series(data[col], dtype=object).where(values >= 0, np.nan).to_numpy()
+            else:
+                values = np.asarray(arrays[col][rows])
+                if col in ("reps", "sets") and len(values) and not np.isnan(values).any():
+                    values = values.astype(np.int64)
+                data[col] = values
+        return pd.DataFrame(data, columns=columns)
+
+
+def _encode_labels(values: pd.Series, labels: List[str]) -> np.ndarray:
+    """Map values to integer codes, extending `labels` with unseen values (-1 for missing)."""
+    codes, uniques = pd.factorize(values)
+    lookup = {label: code for code, label in enumerate(labels)}
+    unique_codes = np.empty(len(uniques) + 1, dtype=np.int32)
+    unique_codes[-1] = -1
+    for i, label in enumerate(uniques):
+        label = str(label)
+        if label not in lookup:
+            lookup[label] = len(labels)
+            labels.append(label)
+        unique_codes[i] = lookup[label]
+    return unique_codes[codes]
+
+
+def _decode_labels(codes: np.ndarray, labels: List[str]) -> np.ndarray:
+    table = np.array(list(labels) + [None], dtype=object)
+    codes = np.asarray(codes)
+    return table[np.where(codes >= 0, codes, len(labels))]
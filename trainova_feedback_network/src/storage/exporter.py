@@ -0,0 +1,149 @@
+import gzip
+import io
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+EXPORT_FORMATS = ["csv", "ndjson", "parquet"]
+COMPRESSIONS = ["none", "gzip", "zstd"]
+
+# File extensions used to infer the format and compression of an export
+_FORMAT_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+_COMPRESSION_EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+def infer_export_options(file_path: str,
+                         fmt: Optional[str] = None,
+                         compression: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Resolve the export format and compression, falling back to the file extension.
+
+    Args:
+        file_path: Output file path (e.g. 'export.ndjson.gz')
+        fmt: Explicit format, or None to infer it
+        compression: Explicit compression, or None to infer it
+
+    Returns:
+        Tuple of (format, compression)
+    """
+    name = file_path.lower()
+    if compression is None:
+        compression = "none"
+        for extension, value in _COMPRESSION_EXTENSIONS.items():
+            if name.endswith(extension):
+                compression = value
+                name = name[:-len(extension)]
+                break
+    if fmt is None:
+        fmt = next((value for extension, value in _FORMAT_EXTENSIONS.items() if name.endswith(extension)), "csv")
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}. Valid formats are: {', '.join(EXPORT_FORMATS)}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}. Valid options are: {', '.join(COMPRESSIONS)}")
+    return fmt, compression
+
+
+def export_chunks(chunks: Iterable[pd.DataFrame],
+                  file_path: str,
+                  fmt: str = "csv",
+                  compression: str = "none",
+                  columns: Optional[List[str]] = None) -> int:
+    """
+    Write workout chunks to a file as they arrive.
+
+    CSV and NDJSON are written through a (optionally compressed) text stream,
+    so memory is bounded by the chunk size. Parquet writes one row group per
+    chunk and applies the compression as its column codec. Every chunk is
+    reindexed to the same columns, so chunks from datasets with different
+    headers line up (missing values are left empty).
+
+    Args:
+        chunks: Workout DataFrames
+        file_path: Output file path
+        fmt: 'csv', 'ndjson' or 'parquet'
+        compression: 'none', 'gzip' or 'zstd'
+        columns: Output columns (default: those of the first chunk)
+
+    Returns:
+        Number of rows written
+    """
+    chunks = _aligned(chunks, columns)
+    if fmt == "parquet":
+        return _export_parquet(chunks, file_path, compression)
+
+    rows = 0
+    with _open_text(file_path, compression) as stream:
+        for chunk in chunks:
+            if fmt == "csv":
+                chunk.to_csv(stream, header=rows == 0, index=False)
+            else:
+                text = chunk.to_json(orient="records", lines=True, date_format="iso")
+                stream.write(text if text.endswith("\n") or not text else text + "\n")
+            rows += len(chunk)
+    return rows
+
+
+def _aligned(chunks: Iterable[pd.DataFrame], columns: Optional[List[str]]) -> Iterable[pd.DataFrame]:
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+        yield chunk if list(chunk.columns) == columns else chunk.reindex(columns=columns)
+
+
+def _open_text(file_path: str, compression: str) -> io.TextIOBase:
+    if compression == "gzip":
+        return gzip.open(file_path, "wt", newline="", compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires zstandard. Install it with: pip install zstandard")
+        raw = open(file_path, "wb")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw, closefd=True), newline="")
+    return open(file_path, "w", newline="", buffering=1024 * 1024)
+
+
+def _export_parquet(chunks: Iterable[pd.DataFrame], file_path: str, compression: str) -> int:
+    if pa is None:
+        raise ImportError("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                # Fix the schema on the first chunk; workout columns get their
+                # storage types so later chunks with nulls still match
+                schema = pa.schema([(col, _parquet_type(col, chunk[col])) for col in chunk.columns])
+                writer = pq.ParquetWriter(file_path, schema,
+                                          compression="NONE" if compression == "none" else compression)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _parquet_type(column: str, values: pd.Series) -> "pa.DataType":
+    types = {
+        "user": pa.string(),
+        "exercise": pa.string(),
+        "weight": pa.float64(),
+        "reps": pa.int64(),
+        "sets": pa.int64(),
+        "date": pa.timestamp("us"),
+        "rir": pa.float64(),
+        "rpe": pa.float64(),
+        "success": pa.bool_(),
+    }
+    return types[column] if column in types else pa.Array.from_pandas(values).type
@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .schema import REQUIRED_COLUMNS, coerce_workouts
+
+# Columns that identify a workout for de-duplication
+DEDUP_COLUMNS = ["exercise", "date", "weight", "reps", "sets"]
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash the de-duplication key of coerced workout rows.
+
+    Args:
+        df: DataFrame in the storage schema (see `coerce_workouts`)
+
+    Returns:
+        Array of uint64 hashes, one per row
+    """
+    return pd.util.hash_pandas_object(df[DEDUP_COLUMNS], index=False).to_numpy(dtype=np.uint64)
+
+
+class HashIndex:
+    """
+    Compact set of 64-bit row hashes.
+
+    Hashes are kept in sorted NumPy runs that are merged as they grow (like a
+    binary counter), so membership checks are binary searches and the index
+    costs 8 bytes per row instead of a Python set entry per row.
+    """
+
+    def __init__(self):
+        self._runs: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Check which hashes are already in the index.
+
+        Args:
+            hashes: Array of uint64 hashes
+
+        Returns:
+            Boolean array, True where the hash is present
+        """
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray) -> None:
+        """
+        Add hashes to the index.
+
+        Args:
+            hashes: Array of uint64 hashes
+        """
+        if len(hashes) == 0:
+            return
+        self._runs.append(np.unique(hashes))
+        while len(self._runs) > 1 and len(self._runs[-1]) * 2 >= len(self._runs[-2]):
+            newest = self._runs.pop()
+            self._runs[-1] = np.union1d(self._runs[-1], newest)
+
+
+def stream_import(chunks: Iterable[pd.DataFrame],
+                  append: Callable[[pd.DataFrame], int],
+                  existing_chunks: Optional[Iterable[pd.DataFrame]] = None,
+                  dedup: bool = True,
+                  default_date: Optional[str] = None) -> Dict[str, int]:
+    """
+    Validate, coerce, de-duplicate and append workout chunks.
+
+    Each chunk is coerced to the storage schema; rows without a valid
+    exercise, weight or reps are dropped. With `dedup`, rows whose
+    (exercise, date, weight, reps, sets) already exist in the target or
+    earlier in the input are skipped.
+
+    Args:
+        chunks: Input DataFrame chunks (e.g. from `pd.read_csv(..., chunksize=...)`)
+        append: Callable appending a coerced chunk to the target, returning rows written
+        existing_chunks: Chunks of the data already in the target, used to seed the index
+        dedup: Whether to drop duplicate rows
+        default_date: Date used for rows without one (default: today)
+
+    Returns:
+        Dictionary with 'read', 'imported', 'duplicates' and 'invalid' row counts
+    """
+    stats = {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0}
+    default_date = default_date or datetime.now().date().isoformat()
+
+    index = HashIndex()
+    if dedup and existing_chunks is not None:
+        for existing in existing_chunks:
+            if not existing.empty:
+                index.add(row_hashes(coerce_workouts(existing)))
+
+    for position, chunk in enumerate(chunks):
+        if position == 0:
+            missing = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"Missing required columns: {', '.join(missing)}")
+            if "date" not in chunk.columns:
+                print("Warning: No date column found. Using current date for all entries.")
+
+        stats["read"] += len(chunk)
+        if "date" not in chunk.columns:
+            chunk = chunk.assign(date=default_date)
+        else:
+            chunk = chunk.assign(date=chunk["date"].fillna(default_date))
+
+        try:
+            workouts = coerce_workouts(chunk)
+        except (TypeError, ValueError):
+            # Unparseable dates: coerce them row by row and drop the bad ones
+            dates = pd.to_datetime(chunk["date"], errors="coerce")
+            chunk = chunk.assign(date=dates)[dates.notna()]
+            stats["invalid"] += int((~dates.notna()).sum())
+            workouts = coerce_workouts(chunk)
+
+        valid = workouts["exercise"].notna() & (workouts["exercise"] != "") & \
+            workouts["weight"].notna() & workouts["reps"].notna()
+        stats["invalid"] += int((~valid).sum())
+        workouts = workouts[valid]
+
+        if dedup and not workouts.empty:
+            hashes = row_hashes(workouts)
+            _, first = np.unique(hashes, return_index=True)
+            is_new = np.zeros(len(hashes), dtype=bool)
+            is_new[first] = True
+            is_new &= ~index.contains(hashes)
+            stats["duplicates"] += int((~is_new).sum())
+            workouts = workouts[is_new]
+            index.add(hashes[is_new])
+
+        if not workouts.empty:
+            stats["imported"] += append(workouts.reset_index(drop=True))
+
+    return stats
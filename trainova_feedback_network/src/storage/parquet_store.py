@@ -0,0 +1,295 @@
+import os
+import shutil
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+from .schema import (WORKOUT_COLUMNS, TRAINING_DATASET, PRETRAINING_DATASET,
+                     coerce_workouts, date_bounds, parse_dates)
+
+# Columns used for the directory layout: dataset=<name>/exercise=<name>/month=YYYY-MM
+PARTITION_COLUMNS = ["dataset", "exercise", "month"]
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("The parquet storage backend requires pyarrow. Install it with: pip install pyarrow")
+
+
+def _file_schema() -> "pa.Schema":
+    return pa.schema([
+        ("user", pa.string()),
+        ("weight", pa.float64()),
+        ("reps", pa.int64()),
+        ("sets", pa.int64()),
+        ("date", pa.timestamp("s")),
+        ("rir", pa.float64()),
+        ("rpe", pa.float64()),
+        ("success", pa.bool_()),
+    ])
+
+
+def _partitioning() -> "ds.Partitioning":
+    return ds.partitioning(
+        pa.schema([(col, pa.string()) for col in PARTITION_COLUMNS]),
+        flavor="hive"
+    )
+
+
+class ParquetWorkoutStore:
+    """
+    Columnar workout store using Parquet files partitioned by exercise and month.
+
+    The layout is `dataset=<name>/exercise=<name>/month=YYYY-MM/part-*.parquet`.
+    Exercise and date-range filters prune whole partitions before any file is
+    opened, remaining predicates are pushed down to the Parquet row groups and
+    only the requested columns are read.
+    """
+
+    def __init__(self, root_dir: str):
+        """
+        Open (and create if needed) the columnar store.
+
+        Args:
+            root_dir: Directory holding the partitioned dataset
+        """
+        _require_pyarrow()
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def append(self, workouts: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+               dataset: str = TRAINING_DATASET) -> int:
+        """
+        Append workouts as new Parquet files in their partitions.
+
+        Args:
+            workouts: DataFrame or iterable of workout dictionaries
+            dataset: Dataset to append to ('training' or 'pretraining')
+
+        Returns:
+            Number of rows appended
+        """
+        df = workouts if isinstance(workouts, pd.DataFrame) else pd.DataFrame(list(workouts))
+        if df.empty:
+            return 0
+
+        df = coerce_workouts(df)
+        table = pa.table({
+            "user": pa.array(df["user"].astype(object).where(df["user"].notna(), None), pa.string()),
+            "weight": pa.array(df["weight"], pa.float64(), from_pandas=True),
+            "reps": pa.array(df["reps"].astype(object).where(df["reps"].notna(), None), pa.int64()),
+            "sets": pa.array(df["sets"].astype(object).where(df["sets"].notna(), None), pa.int64()),
+            "date": pa.array(parse_dates(df["date"]), pa.timestamp("s"), from_pandas=True),
+            "rir": pa.array(df["rir"], pa.float64(), from_pandas=True),
+            "rpe": pa.array(df["rpe"], pa.float64(), from_pandas=True),
+            "success": pa.array(df["success"].astype(object).where(df["success"].notna(), None), pa.bool_()),
+            "dataset": pa.array([dataset] * len(df), pa.string()),
+            "exercise": pa.array(df["exercise"].astype(object), pa.string()),
+            "month": pa.array(df["date"].str.slice(0, 7).astype(object).where(df["date"].notna(), "unknown"),
+                              pa.string()),
+        })
+
+        ds.write_dataset(
+            table,
+            self.root_dir,
+            format="parquet",
+            partitioning=_partitioning(),
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+        return len(df)
+
+    def replace(self, workouts: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                dataset: str = TRAINING_DATASET) -> int:
+        """
+        Replace all workouts of a dataset.
+
+        Args:
+            workouts: DataFrame or iterable of workout dictionaries
+            dataset: Dataset to replace
+
+        Returns:
+            Number of rows written
+        """
+        dataset_dir = os.path.join(self.root_dir, f"dataset={dataset}")
+        if os.path.isdir(dataset_dir):
+            shutil.rmtree(dataset_dir)
+        return self.append(workouts, dataset=dataset)
+
+    def load(self,
+             datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+             exercise: Optional[Union[str, Sequence[str]]] = None,
+             since: Any = None,
+             until: Any = None,
+             user: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load workouts sorted by date, reading only matching partitions and columns.
+
+        Args:
+            datasets: Datasets to read from
+            exercise: Exercise name or list of names to keep
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all schema columns)
+
+        Returns:
+            DataFrame containing the matching workouts
+        """
+        columns = self._check_columns(columns)
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=columns)
+
+        read_columns = columns if "date" in columns else columns + ["date"]
+        table = dataset.to_table(columns=read_columns,
+                                 filter=self._filter(datasets, exercise, since, until, user))
+        return self._frame(table, columns)
+
+    def iter_chunks(self,
+                    datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+                    exercise: Optional[Union[str, Sequence[str]]] = None,
+                    since: Any = None,
+                    until: Any = None,
+                    user: Optional[str] = None,
+                    columns: Optional[List[str]] = None,
+                    chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Stream matching workouts in date order, one month partition at a time.
+
+        Memory is bounded by the size of the largest month rather than the
+        whole dataset.
+
+        Args:
+            datasets: Datasets to read from
+            exercise: Exercise name or list of names to keep
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all schema columns)
+            chunksize: Maximum rows per chunk
+
+        Yields:
+            DataFrames of at most `chunksize` rows
+        """
+        columns = self._check_columns(columns)
+        dataset = self._dataset()
+        if dataset is None:
+            return
+
+        base_filter = self._filter(datasets, exercise, since, until, user)
+        read_columns = columns if "date" in columns else columns + ["date"]
+
+        for month in self._months(dataset, base_filter):
+            month_filter = ds.field("month") == month
+            table = dataset.to_table(columns=read_columns,
+                                     filter=month_filter if base_filter is None else base_filter & month_filter)
+            df = self._frame(table, columns)
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize].reset_index(drop=True)
+
+    def exercises(self, datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+                  user: Optional[str] = None) -> List[str]:
+        """
+        List the distinct exercises in the store from the partition layout.
+
+        Args:
+            datasets: Datasets to read from
+            user: Restrict to this user's workouts
+
+        Returns:
+            Exercise names ordered by the month they first appear in
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return []
+
+        if user is not None:
+            df = self.load(datasets=datasets, user=user, columns=["exercise", "date"])
+            return list(df["exercise"].unique())
+
+        first_month = {}
+        for fragment in dataset.get_fragments(filter=self._filter(datasets, None, None, None, None)):
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            name, month = keys.get("exercise"), keys.get("month", "")
+            if name is not None and (name not in first_month or month < first_month[name]):
+                first_month[name] = month
+        return sorted(first_month, key=lambda name: (first_month[name], name))
+
+    def count(self, datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET)) -> int:
+        """
+        Count the workouts in the given datasets using Parquet metadata.
+
+        Args:
+            datasets: Datasets to count
+
+        Returns:
+            Number of stored workouts
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return 0
+        return dataset.count_rows(filter=self._filter(datasets, None, None, None, None))
+
+    def _dataset(self) -> Optional["ds.Dataset"]:
+        if not any(entry.startswith("dataset=") for entry in os.listdir(self.root_dir)):
+            return None
+        return ds.dataset(self.root_dir, format="parquet", partitioning=_partitioning(),
+                          schema=pa.unify_schemas([_file_schema(),
+                                                   pa.schema([(c, pa.string()) for c in PARTITION_COLUMNS])]))
+
+    def _filter(self, datasets, exercise, since, until, user) -> Optional["ds.Expression"]:
+        expressions = []
+        if datasets is not None:
+            expressions.append(ds.field("dataset").isin(list(datasets)))
+        if exercise is not None:
+            exercises = [exercise] if isinstance(exercise, str) else list(exercise)
+            expressions.append(ds.field("exercise").isin(exercises))
+        if user is not None:
+            expressions.append(ds.field("user") == user)
+
+        since, until = date_bounds(since, until)
+        if since is not None:
+            # The month predicate prunes partitions, the date predicate row groups
+            expressions.append(ds.field("month") >= since[:7])
+            expressions.append(ds.field("date") >= pa.scalar(pd.Timestamp(since).to_pydatetime(), pa.timestamp("s")))
+        if until is not None:
+            expressions.append(ds.field("month") <= until[:7])
+            expressions.append(ds.field("date") <= pa.scalar(pd.Timestamp(until).to_pydatetime(), pa.timestamp("s")))
+
+        if not expressions:
+            return None
+        combined = expressions[0]
+        for expression in expressions[1:]:
+            combined = combined & expression
+        return combined
+
+    def _months(self, dataset: "ds.Dataset", base_filter: Optional["ds.Expression"]) -> List[str]:
+        months = set()
+        for fragment in dataset.get_fragments(filter=base_filter):
+            month = ds.get_partition_keys(fragment.partition_expression).get("month")
+            if month is not None:
+                months.add(month)
+        return sorted(months)
+
+    def _check_columns(self, columns: Optional[List[str]]) -> List[str]:
+        columns = list(columns or WORKOUT_COLUMNS)
+        unknown = [col for col in columns if col not in WORKOUT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        return columns
+
+    def _frame(self, table: "pa.Table", columns: List[str]) -> pd.DataFrame:
+        if table.num_rows:
+            table = table.take(pc.sort_indices(table, sort_keys=[("date", "ascending")]))
+        df = table.to_pandas()
+        return df[columns]
@@ -0,0 +1,519 @@
+import atexit
+import bisect
+import io
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import pandas as pd
+
+from .schema import (WORKOUT_COLUMNS, TRAINING_DATASET, PRETRAINING_DATASET,
+                     coerce_workouts, date_bounds, filter_workouts, parse_dates)
+
+# Partition directory used for workouts without a user
+ANONYMOUS_USER = "_anonymous"
+
+# Name of the file describing the compacted state of a partition
+CURRENT_FILE = "CURRENT"
+
+# One sparse index entry (date, byte offset) is kept per this many rows
+INDEX_INTERVAL = 4096
+
+# Read attempts before giving up when a compaction removes files mid-read
+_READ_RETRIES = 5
+
+
+class PartitionedWorkoutStore:
+    """
+    Workout store partitioned by dataset and user, built for concurrent writers.
+
+    The layout is `dataset=<name>/user=<name>/`. Every store instance is a
+    separate writer that appends to its own segment file in each partition
+    (`seg-<writer>-<n>.open`), so processes and threads never write to the
+    same file and need no locks. Full or closed segments are sealed by
+    renaming them to `.csv`.
+
+    Compaction merges the sealed segments of a partition into one data file
+    sorted by date, with a sparse date/byte-offset index and per-exercise
+    statistics, and publishes it atomically through the partition's
+    CURRENT file. Readers combine the compacted data with the segments that
+    have not been merged yet.
+    """
+
+    def __init__(self, root_dir: str,
+                 max_segment_bytes: int = 8 * 1024 * 1024,
+                 stale_after: float = 3600.0,
+                 compact_interval: float = 0.0):
+        """
+        Open (and create if needed) the partitioned store.
+
+        Args:
+            root_dir: Directory holding the partitions
+            max_segment_bytes: Segment size after which it is sealed
+            stale_after: Seconds after which an unsealed segment of another
+                writer is treated as abandoned and compacted
+            compact_interval: Seconds between background compactions (0 disables)
+        """
+        self.root_dir = root_dir
+        self.max_segment_bytes = max_segment_bytes
+        self.stale_after = stale_after
+        os.makedirs(root_dir, exist_ok=True)
+
+        self.writer_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._segments: Dict[str, Tuple[int, str]] = {}
+        self._segment_count = 0
+        self._lock = threading.Lock()
+
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if compact_interval > 0:
+            self.start_compaction(compact_interval)
+
+        # Seal on exit so short-lived writers (e.g. CLI runs) leave compactable segments
+        atexit.register(self.close)
+
+    def append(self, workouts: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+               dataset: str = TRAINING_DATASET) -> int:
+        """
+        Append workouts to this writer's segments of their user partitions.
+
+        Args:
+            workouts: DataFrame or iterable of workout dictionaries
+            dataset: Dataset to append to ('training' or 'pretraining')
+
+        Returns:
+            Number of rows appended
+        """
+        df = workouts if isinstance(workouts, pd.DataFrame) else pd.DataFrame(list(workouts))
+        if df.empty:
+            return 0
+
+        df = coerce_workouts(df)
+        users = df["user"].fillna(ANONYMOUS_USER)
+        for user, rows in df.groupby(users, sort=False):
+            data = rows.to_csv(header=False, index=False).encode("utf-8")
+            self._write_segment(self._partition_dir(dataset, user), data)
+        return len(df)
+
+    def replace(self, workouts: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                dataset: str = TRAINING_DATASET) -> int:
+        """
+        Replace all workouts of a dataset.
+
+        Args:
+            workouts: DataFrame or iterable of workout dictionaries
+            dataset: Dataset to replace
+
+        Returns:
+            Number of rows written
+        """
+        dataset_dir = os.path.join(self.root_dir, f"dataset={dataset}")
+        with self._lock:
+            for partition_dir in [path for path in self._segments if path.startswith(dataset_dir + os.sep)]:
+                fd, _ = self._segments.pop(partition_dir)
+                os.close(fd)
+        if os.path.isdir(dataset_dir):
+            shutil.rmtree(dataset_dir)
+        return self.append(workouts, dataset=dataset)
+
+    def load(self,
+             datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+             exercise: Optional[Union[str, Sequence[str]]] = None,
+             since: Any = None,
+             until: Any = None,
+             user: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load workouts sorted by date, reading only the matching partitions.
+
+        Args:
+            datasets: Datasets to read from
+            exercise: Exercise name or list of names to keep
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all schema columns)
+
+        Returns:
+            DataFrame containing the matching workouts
+        """
+        columns = self._check_columns(columns)
+        frames = [self._read_partition(path, exercise, since, until)
+                  for path in self._partitions(datasets, user)]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.concat(frames, ignore_index=True)
+        df = df.sort_values("date", kind="stable").reset_index(drop=True)
+        return df[columns]
+
+    def iter_chunks(self,
+                    datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+                    exercise: Optional[Union[str, Sequence[str]]] = None,
+                    since: Any = None,
+                    until: Any = None,
+                    user: Optional[str] = None,
+                    columns: Optional[List[str]] = None,
+                    chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Stream matching workouts one user partition at a time.
+
+        Rows are in date order within each partition, and memory is bounded
+        by the size of the largest partition.
+
+        Args:
+            datasets: Datasets to read from
+            exercise: Exercise name or list of names to keep
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all schema columns)
+            chunksize: Maximum rows per chunk
+
+        Yields:
+            DataFrames of at most `chunksize` rows
+        """
+        columns = self._check_columns(columns)
+        for path in self._partitions(datasets, user):
+            df = self._read_partition(path, exercise, since, until)
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize][columns].reset_index(drop=True)
+
+    def exercises(self, datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+                  user: Optional[str] = None) -> List[str]:
+        """
+        List the distinct exercises in the store.
+
+        Compacted data is answered from the partition statistics; only
+        segments that have not been compacted yet are read.
+
+        Args:
+            datasets: Datasets to read from
+            user: Restrict to this user's workouts
+
+        Returns:
+            Exercise names ordered by the date they first appear
+        """
+        first_dates: Dict[str, str] = {}
+        for path in self._partitions(datasets, user):
+            current = self._read_current(path)
+            found = dict((name, stats["first"]) for name, stats in current.get("exercises", {}).items())
+            segments = self._read_files(path, self._segment_names(path, current))
+            if not segments.empty:
+                dates = segments["date"].fillna("")
+                for name, first in dates.groupby(segments["exercise"]).min().items():
+                    found[name] = min(first, found.get(name, first))
+            for name, first in found.items():
+                if name not in first_dates or first < first_dates[name]:
+                    first_dates[name] = first
+        return sorted(first_dates, key=lambda name: (first_dates[name], name))
+
+    def count(self, datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET)) -> int:
+        """
+        Count the workouts in the given datasets.
+
+        Args:
+            datasets: Datasets to count
+
+        Returns:
+            Number of stored workouts
+        """
+        total = 0
+        for path in self._partitions(datasets, None):
+            current = self._read_current(path)
+            total += current.get("rows", 0)
+            for name in self._segment_names(path, current):
+                try:
+                    with open(os.path.join(path, name), "rb") as file:
+                        total += file.read().count(b"\n")
+                except FileNotFoundError:
+                    continue
+        return total
+
+    def seal(self) -> None:
+        """Seal all segments this writer has open, making them eligible for compaction."""
+        with self._lock:
+            for partition_dir in list(self._segments):
+                self._seal_segment(partition_dir)
+
+    def compact(self, datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET)) -> Dict[str, int]:
+        """
+        Merge sealed segments into the sorted data file of each partition.
+
+        This writer's own open segments are sealed first. Partitions being
+        compacted by another process are skipped.
+
+        Args:
+            datasets: Datasets to compact
+
+        Returns:
+            Dictionary with the number of 'partitions' compacted and 'segments' merged
+        """
+        self.seal()
+        stats = {"partitions": 0, "segments": 0}
+        for path in self._partitions(datasets, None):
+            merged = self._compact_partition(path)
+            if merged:
+                stats["partitions"] += 1
+                stats["segments"] += merged
+        return stats
+
+    def start_compaction(self, interval: float = 60.0) -> None:
+        """
+        Compact the store periodically in a daemon thread.
+
+        Args:
+            interval: Seconds between compactions
+        """
+        if self._compactor is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"Error compacting workout store: {e}")
+
+        self._stop.clear()
+        self._compactor = threading.Thread(target=run, name="workout-compactor", daemon=True)
+        self._compactor.start()
+
+    def close(self) -> None:
+        """Stop background compaction and seal this writer's segments."""
+        if self._compactor is not None:
+            self._stop.set()
+            self._compactor.join()
+            self._compactor = None
+        self.seal()
+
+    def _partition_dir(self, dataset: str, user: str) -> str:
+        return os.path.join(self.root_dir, f"dataset={dataset}", f"user={quote(str(user), safe='')}")
+
+    def _partitions(self, datasets: Optional[Sequence[str]], user: Optional[str]) -> List[str]:
+        paths = []
+        for entry in sorted(os.listdir(self.root_dir)):
+            if not entry.startswith("dataset="):
+                continue
+            if datasets is not None and entry[len("dataset="):] not in datasets:
+                continue
+            dataset_dir = os.path.join(self.root_dir, entry)
+            if user is not None:
+                path = os.path.join(dataset_dir, f"user={quote(user, safe='')}")
+                if os.path.isdir(path):
+                    paths.append(path)
+                continue
+            paths.extend(os.path.join(dataset_dir, name) for name in sorted(os.listdir(dataset_dir))
+                         if name.startswith("user="))
+        return paths
+
+    def _write_segment(self, partition_dir: str, data: bytes) -> None:
+        with self._lock:
+            if partition_dir in self._segments and os.fstat(self._segments[partition_dir][0]).st_nlink == 0:
+                # The segment was compacted as abandoned after a long idle period
+                os.close(self._segments.pop(partition_dir)[0])
+
+            if partition_dir not in self._segments:
+                os.makedirs(partition_dir, exist_ok=True)
+                self._segment_count += 1
+                name = f"seg-{self.writer_id}-{self._segment_count:06d}.open"
+                fd = os.open(os.path.join(partition_dir, name), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                self._segments[partition_dir] = (fd, name)
+
+            fd, _ = self._segments[partition_dir]
+            # One write call per batch, so readers never see a partial batch
+            # except at the very end of the segment
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+
+            if os.fstat(fd).st_size >= self.max_segment_bytes:
+                self._seal_segment(partition_dir)
+
+    def _seal_segment(self, partition_dir: str) -> None:
+        fd, name = self._segments.pop(partition_dir)
+        os.close(fd)
+        path = os.path.join(partition_dir, name)
+        if os.path.exists(path):
+            os.replace(path, path[:-len(".open")] + ".csv")
+
+    def _read_current(self, partition_dir: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(partition_dir, CURRENT_FILE)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _segment_names(self, partition_dir: str, current: Dict[str, Any]) -> List[str]:
+        # Segments already merged into the current data file may linger
+        # until the compaction that merged them deletes them
+        merged = set(current.get("merged", []))
+        return sorted(name for name in os.listdir(partition_dir)
+                      if name.startswith("seg-") and name.endswith((".csv", ".open")) and name not in merged)
+
+    def _read_partition(self, partition_dir: str, exercise: Any, since: Any, until: Any) -> pd.DataFrame:
+        """Read one partition: compacted rows in the date range plus unmerged segments."""
+        for attempt in range(_READ_RETRIES):
+            current = self._read_current(partition_dir)
+            try:
+                frames = []
+                if current.get("data") and (exercise is None or self._has_exercise(current, exercise)):
+                    frames.append(self._read_data(partition_dir, current, since, until))
+                frames.append(self._read_files(partition_dir, self._segment_names(partition_dir, current)))
+                break
+            except FileNotFoundError:
+                # A compaction replaced the files between listing and reading
+                if attempt == _READ_RETRIES - 1:
+                    raise
+                time.sleep(0.01)
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=WORKOUT_COLUMNS)
+        df = filter_workouts(pd.concat(frames, ignore_index=True), exercise, since, until)
+        return self._frame(df)
+
+    def _has_exercise(self, current: Dict[str, Any], exercise: Any) -> bool:
+        names = [exercise] if isinstance(exercise, str) else list(exercise)
+        return any(name in current.get("exercises", {}) for name in names)
+
+    def _read_data(self, partition_dir: str, current: Dict[str, Any], since: Any, until: Any) -> pd.DataFrame:
+        """Read the byte range of the compacted data file that can hold the date range."""
+        since, until = date_bounds(since, until)
+        index = current.get("index", [])
+        dates = [entry[0] for entry in index]
+
+        start = 0
+        end = None
+        if since is not None and index:
+            position = bisect.bisect_left(dates, since) - 1
+            start = index[position][1] if position >= 0 else 0
+        if until is not None and index:
+            position = bisect.bisect_right(dates, until)
+            end = index[position][1] if position < len(index) else None
+
+        with open(os.path.join(partition_dir, current["data"]), "rb") as file:
+            file.seek(start)
+            data = file.read() if end is None else file.read(end - start)
+        return self._parse(data)
+
+    def _read_files(self, partition_dir: str, names: List[str]) -> pd.DataFrame:
+        frames = []
+        for name in names:
+            try:
+                with open(os.path.join(partition_dir, name), "rb") as file:
+                    data = file.read()
+            except FileNotFoundError:
+                # Sealed (renamed) since the listing; read it under its new name
+                if not name.endswith(".open"):
+                    raise
+                with open(os.path.join(partition_dir, name[:-len(".open")] + ".csv"), "rb") as file:
+                    data = file.read()
+            frames.append(self._parse(data))
+        frames = [frame for frame in frames if not frame.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=WORKOUT_COLUMNS)
+
+    def _parse(self, data: bytes) -> pd.DataFrame:
+        # An unsealed segment may end with a partially written line
+        data = data[:data.rfind(b"\n") + 1]
+        if not data:
+            return pd.DataFrame(columns=WORKOUT_COLUMNS)
+        return pd.read_csv(io.BytesIO(data), header=None, names=WORKOUT_COLUMNS,
+                           dtype={"user": "string", "exercise": "string", "date": "string"})
+
+    def _compact_partition(self, partition_dir: str) -> int:
+        """Merge the sealed and abandoned segments of one partition into a new data file."""
+        lock_path = os.path.join(partition_dir, "compact.lock")
+        try:
+            fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            # Another compaction is running, unless its lock is left over from a crash
+            try:
+                if time.time() - os.path.getmtime(lock_path) < self.stale_after:
+                    return 0
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+            return 0
+        os.write(fd, self.writer_id.encode("utf-8"))
+        os.close(fd)
+
+        try:
+            current = self._read_current(partition_dir)
+            now = time.time()
+            names = [name for name in self._segment_names(partition_dir, current)
+                     if name.endswith(".csv") or now - os.path.getmtime(os.path.join(partition_dir, name)) > self.stale_after]
+            if not names:
+                return 0
+
+            frames = [self._read_files(partition_dir, names)]
+            if current.get("data"):
+                frames.insert(0, self._read_data(partition_dir, current, None, None))
+            df = pd.concat([frame for frame in frames if not frame.empty] or [pd.DataFrame(columns=WORKOUT_COLUMNS)],
+                           ignore_index=True)
+            df = df.sort_values("date", kind="stable", na_position="last").reset_index(drop=True)
+
+            # Write the new data file and build its sparse index from the row offsets
+            version = uuid.uuid4().hex
+            data_name = f"data-{version}.csv"
+            lines = df.to_csv(header=False, index=False).encode("utf-8").splitlines(keepends=True)
+            index = []
+            offset = 0
+            with open(os.path.join(partition_dir, data_name + ".tmp"), "wb") as file:
+                for row, line in enumerate(lines):
+                    if row % INDEX_INTERVAL == 0 and pd.notna(df["date"].iat[row]):
+                        index.append([df["date"].iat[row], offset])
+                    file.write(line)
+                    offset += len(line)
+            os.replace(os.path.join(partition_dir, data_name + ".tmp"), os.path.join(partition_dir, data_name))
+
+            exercise_stats = {}
+            for name, group in df.groupby("exercise"):
+                dates = group["date"].dropna()
+                exercise_stats[name] = {
+                    "rows": int(len(group)),
+                    "first": dates.iat[0] if len(dates) else "",
+                    "last": dates.iat[-1] if len(dates) else "",
+                }
+
+            new_current = {
+                "data": data_name,
+                "rows": int(len(df)),
+                "index": index,
+                "exercises": exercise_stats,
+                "merged": names,
+            }
+            tmp_current = os.path.join(partition_dir, CURRENT_FILE + ".tmp")
+            with open(tmp_current, "w") as file:
+                json.dump(new_current, file)
+            os.replace(tmp_current, os.path.join(partition_dir, CURRENT_FILE))
+
+            # Readers now use the new data file; remove what it replaced
+            for name in names + ([current["data"]] if current.get("data") else []):
+                try:
+                    os.remove(os.path.join(partition_dir, name))
+                except FileNotFoundError:
+                    pass
+            return len(names)
+        finally:
+            os.remove(lock_path)
+
+    def _check_columns(self, columns: Optional[List[str]]) -> List[str]:
+        columns = list(columns or WORKOUT_COLUMNS)
+        unknown = [col for col in columns if col not in WORKOUT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        return columns
+
+    def _frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        df["date"] = parse_dates(df["date"])
+        df["success"] = df["success"].map({True: True, False: False, "True": True, "False": False})
+        return df.sort_values("date", kind="stable").reset_index(drop=True)
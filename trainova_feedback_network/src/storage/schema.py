@@ -0,0 +1,213 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Fixed column order for stored workouts. Storage backends and bulk writers
+# use this schema so the layout does not depend on the keys of the first row.
+WORKOUT_COLUMNS = ["user", "exercise", "weight", "reps", "sets", "date", "rir", "rpe", "success"]
+
+REQUIRED_COLUMNS = ["exercise", "weight", "reps"]
+
+# Dataset names used to keep collected and pretraining workouts apart
+TRAINING_DATASET = "training"
+PRETRAINING_DATASET = "pretraining"
+
+
+def parse_dates(values: Any) -> pd.Series:
+    """
+    Parse ISO-8601 dates, accepting a mix of date-only and date-time strings.
+
+    Args:
+        values: Series or list of date strings / timestamps
+
+    Returns:
+        Series of datetimes
+    """
+    try:
+        return pd.to_datetime(values, format="ISO8601")
+    except (TypeError, ValueError):
+        # Older pandas versions without format="ISO8601" infer the format per element
+        return pd.to_datetime(values)
+
+
+def normalize_date(value: Any) -> Optional[str]:
+    """
+    Normalize a single date to the canonical 'YYYY-MM-DDTHH:MM:SS' string.
+
+    Canonical strings sort in chronological order, which lets storage
+    backends compare and index dates as plain text.
+
+    Args:
+        value: Date string, date, datetime or Timestamp
+
+    Returns:
+        Canonical date string, or None for missing values
+    """
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, str) and len(value) == 10 and value[4] == "-" and value[7] == "-":
+        # Plain ISO dates are by far the most common input; skip Timestamp parsing
+        return value + "T00:00:00"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%dT%H:%M:%S")
+    return pd.Timestamp(value).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def format_dates(dates: pd.Series) -> pd.Series:
+    """
+    Format a datetime Series as canonical 'YYYY-MM-DDTHH:MM:SS' strings.
+
+    Uses NumPy's datetime formatting, which is much faster than
+    `Series.dt.strftime` on large frames.
+
+    Args:
+        dates: Series of datetimes
+
+    Returns:
+        Series of canonical date strings (missing dates stay missing)
+    """
+    values = np.datetime_as_string(dates.to_numpy(dtype="datetime64[s]"), unit="s")
+    formatted = pd.Series(values, index=dates.index, dtype="string")
+    return formatted.where(dates.notna(), pd.NA)
+
+
+def date_bounds(since: Any = None, until: Any = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Convert date-range filters to inclusive canonical date strings.
+
+    A date-only `until` (e.g. '2024-03-31') covers that whole day.
+
+    Args:
+        since: Lower bound (inclusive) or None
+        until: Upper bound (inclusive) or None
+
+    Returns:
+        Tuple of canonical (since, until) strings, None where unbounded
+    """
+    since_str = normalize_date(since) if since is not None else None
+    until_str = None
+    if until is not None:
+        is_date_only = ((isinstance(until, str) and len(until.strip()) <= 10) or
+                        (isinstance(until, date) and not isinstance(until, datetime)))
+        until_str = normalize_date(until)
+        if is_date_only:
+            until_str = until_str[:10] + "T23:59:59"
+    return since_str, until_str
+
+
+def filter_workouts(df: pd.DataFrame,
+                    exercise: Any = None,
+                    since: Any = None,
+                    until: Any = None,
+                    user: Optional[str] = None) -> pd.DataFrame:
+    """
+    Apply exercise, date-range and user filters to a workout DataFrame.
+
+    Used where rows are read without a store that can filter them itself
+    (e.g. plain CSV files).
+
+    Args:
+        df: Workout DataFrame
+        exercise: Exercise name or list of names to keep
+        since: Keep workouts on or after this date
+        until: Keep workouts on or before this date
+        user: Keep workouts of this user only
+
+    Returns:
+        DataFrame containing the matching rows
+    """
+    mask = pd.Series(True, index=df.index)
+    if exercise is not None:
+        exercises = [exercise] if isinstance(exercise, str) else list(exercise)
+        mask &= df["exercise"].isin(exercises)
+    if user is not None:
+        mask &= (df["user"] == user) if "user" in df.columns else False
+
+    since, until = date_bounds(since, until)
+    if (since is not None or until is not None) and "date" in df.columns:
+        dates = parse_dates(df["date"])
+        if since is not None:
+            mask &= dates >= pd.Timestamp(since)
+        if until is not None:
+            mask &= dates <= pd.Timestamp(until)
+    return df[mask]
+
+
+def coerce_workouts(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce a workout DataFrame to the fixed storage schema.
+
+    Missing optional columns are added as nulls, columns outside the schema
+    are dropped, numeric columns are converted (invalid values become null)
+    and dates are normalized to canonical strings.
+
+    Args:
+        df: DataFrame with at least the required workout columns
+
+    Returns:
+        DataFrame with exactly WORKOUT_COLUMNS, in order
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    result = pd.DataFrame(index=df.index)
+    result["user"] = df["user"].astype("string") if "user" in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+    result["exercise"] = df["exercise"].astype("string").str.strip()
+    result["weight"] = pd.to_numeric(df["weight"], errors="coerce").astype("float64")
+    result["reps"] = pd.to_numeric(df["reps"], errors="coerce").round().astype("Int64")
+    result["sets"] = (pd.to_numeric(df["sets"], errors="coerce").round().astype("Int64")
+                      if "sets" in df.columns else pd.Series(pd.NA, index=df.index, dtype="Int64"))
+
+    if "date" in df.columns:
+        result["date"] = format_dates(parse_dates(df["date"]))
+    else:
+        result["date"] = pd.Series(pd.NA, index=df.index, dtype="string")
+
+    for col in ("rir", "rpe"):
+        result[col] = (pd.to_numeric(df[col], errors="coerce").astype("float64")
+                       if col in df.columns else pd.Series(float("nan"), index=df.index))
+
+    if "success" in df.columns:
+        success = df["success"].map(_parse_bool)
+        result["success"] = success.astype("boolean")
+    else:
+        result["success"] = pd.Series(pd.NA, index=df.index, dtype="boolean")
+
+    return result[WORKOUT_COLUMNS]
+
+
+def workout_row(workout: Dict[str, Any]) -> List[Any]:
+    """
+    Convert a single workout dictionary to a row in WORKOUT_COLUMNS order.
+
+    Args:
+        workout: Workout dictionary (extra keys are ignored)
+
+    Returns:
+        List of values in schema order
+    """
+    row = []
+    for col in WORKOUT_COLUMNS:
+        value = workout.get(col)
+        if col == "date":
+            value = normalize_date(value)
+        elif col == "success":
+            value = _parse_bool(value)
+        row.append(value)
+    return row
+
+
+def _parse_bool(value: Any) -> Optional[bool]:
+    if value is None or value is pd.NA or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "1", "yes", "y"):
+            return True
+        if lowered in ("false", "0", "no", "n"):
+            return False
+        return None
+    return bool(value)
@@ -0,0 +1,252 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .schema import (WORKOUT_COLUMNS, TRAINING_DATASET, PRETRAINING_DATASET,
+                     coerce_workouts, date_bounds, parse_dates, workout_row)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    id INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    "user" TEXT,
+    exercise TEXT NOT NULL,
+    weight REAL,
+    reps INTEGER,
+    sets INTEGER,
+    date TEXT,
+    rir REAL,
+    rpe REAL,
+    success INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_exercise_date ON workouts ("user", exercise, date);
+CREATE INDEX IF NOT EXISTS idx_workouts_exercise_date ON workouts (exercise, date);
+"""
+
+_QUOTED = {col: f'"{col}"' for col in WORKOUT_COLUMNS}
+
+
+class SQLiteWorkoutStore:
+    """
+    SQLite-backed workout store.
+
+    Workouts are kept in a single indexed table in WAL mode, so readers do not
+    block the writer and exercise, user and date-range filters are answered
+    from the (user, exercise, date) and (exercise, date) indexes instead of a
+    full scan. Each append runs in one transaction.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the workout database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def append(self, workouts: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+               dataset: str = TRAINING_DATASET) -> int:
+        """
+        Append workouts in a single transaction.
+
+        Args:
+            workouts: DataFrame or iterable of workout dictionaries
+            dataset: Dataset to append to ('training' or 'pretraining')
+
+        Returns:
+            Number of rows appended
+        """
+        rows = self._rows(workouts)
+        if not rows:
+            return 0
+
+        placeholders = ", ".join("?" for _ in range(len(WORKOUT_COLUMNS) + 1))
+        columns = ", ".join(["dataset"] + [_QUOTED[col] for col in WORKOUT_COLUMNS])
+        sql = f"INSERT INTO workouts ({columns}) VALUES ({placeholders})"
+
+        with self._connect() as conn:
+            with conn:
+                conn.executemany(sql, ([dataset] + row for row in rows))
+        return len(rows)
+
+    def replace(self, workouts: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                dataset: str = TRAINING_DATASET) -> int:
+        """
+        Replace all workouts of a dataset in a single transaction.
+
+        Args:
+            workouts: DataFrame or iterable of workout dictionaries
+            dataset: Dataset to replace
+
+        Returns:
+            Number of rows written
+        """
+        rows = self._rows(workouts)
+        placeholders = ", ".join("?" for _ in range(len(WORKOUT_COLUMNS) + 1))
+        columns = ", ".join(["dataset"] + [_QUOTED[col] for col in WORKOUT_COLUMNS])
+
+        with self._connect() as conn:
+            with conn:
+                conn.execute("DELETE FROM workouts WHERE dataset = ?", (dataset,))
+                conn.executemany(f"INSERT INTO workouts ({columns}) VALUES ({placeholders})",
+                                 ([dataset] + row for row in rows))
+        return len(rows)
+
+    def load(self,
+             datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+             exercise: Optional[Union[str, Sequence[str]]] = None,
+             since: Any = None,
+             until: Any = None,
+             user: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load workouts sorted by date, with filters applied in the query.
+
+        Args:
+            datasets: Datasets to read from
+            exercise: Exercise name or list of names to keep
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all schema columns)
+
+        Returns:
+            DataFrame containing the matching workouts
+        """
+        chunks = list(self.iter_chunks(datasets, exercise, since, until, user, columns))
+        if not chunks:
+            return pd.DataFrame(columns=columns or WORKOUT_COLUMNS)
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    def iter_chunks(self,
+                    datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+                    exercise: Optional[Union[str, Sequence[str]]] = None,
+                    since: Any = None,
+                    until: Any = None,
+                    user: Optional[str] = None,
+                    columns: Optional[List[str]] = None,
+                    chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Stream matching workouts in date order as DataFrame chunks.
+
+        Args:
+            datasets: Datasets to read from
+            exercise: Exercise name or list of names to keep
+            since: Keep workouts on or after this date
+            until: Keep workouts on or before this date
+            user: Keep workouts of this user only
+            columns: Columns to return (default: all schema columns)
+            chunksize: Maximum rows per chunk
+
+        Yields:
+            DataFrames of at most `chunksize` rows
+        """
+        columns = columns or WORKOUT_COLUMNS
+        unknown = [col for col in columns if col not in WORKOUT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+        where, params = self._where(datasets, exercise, since, until, user)
+        select = ", ".join(_QUOTED[col] for col in columns)
+        sql = f"SELECT {select} FROM workouts{where} ORDER BY date, id"
+
+        with self._connect() as conn:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                yield self._frame(rows, columns)
+
+    def exercises(self, datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET),
+                  user: Optional[str] = None) -> List[str]:
+        """
+        List the distinct exercises in the store.
+
+        Args:
+            datasets: Datasets to read from
+            user: Restrict to this user's workouts
+
+        Returns:
+            Exercise names in order of first appearance by date
+        """
+        where, params = self._where(datasets, None, None, None, user)
+        sql = f"SELECT exercise, MIN(date) AS first_date FROM workouts{where} GROUP BY exercise ORDER BY first_date"
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(sql, params)]
+
+    def count(self, datasets: Sequence[str] = (TRAINING_DATASET, PRETRAINING_DATASET)) -> int:
+        """
+        Count the workouts in the given datasets.
+
+        Args:
+            datasets: Datasets to count
+
+        Returns:
+            Number of stored workouts
+        """
+        where, params = self._where(datasets, None, None, None, None)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM workouts{where}", params).fetchone()[0]
+
+    def _where(self, datasets, exercise, since, until, user) -> Tuple[str, List[Any]]:
+        clauses = []
+        params: List[Any] = []
+
+        if datasets is not None:
+            clauses.append(f"dataset IN ({', '.join('?' for _ in datasets)})")
+            params.extend(datasets)
+        if exercise is not None:
+            exercises = [exercise] if isinstance(exercise, str) else list(exercise)
+            clauses.append(f"exercise IN ({', '.join('?' for _ in exercises)})")
+            params.extend(exercises)
+        if user is not None:
+            clauses.append('"user" = ?')
+            params.append(user)
+        since, until = date_bounds(since, until)
+        if since is not None:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("date <= ?")
+            params.append(until)
+
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def _rows(self, workouts: Union[pd.DataFrame, Iterable[Dict[str, Any]]]) -> List[List[Any]]:
+        if isinstance(workouts, pd.DataFrame):
+            df = coerce_workouts(workouts)
+            df = df.astype(object).where(df.notna(), None)
+            return df.values.tolist()
+        return [workout_row(workout) for workout in workouts]
+
+    def _frame(self, rows: List[Tuple], columns: List[str]) -> pd.DataFrame:
+        df = pd.DataFrame.from_records(rows, columns=columns)
+        for col in ("weight", "reps", "sets", "rir", "rpe"):
+            if col in df.columns and df[col].dtype == object:
+                df[col] = pd.to_numeric(df[col])
+        if "date" in df.columns:
+            df["date"] = parse_dates(df["date"])
+        if "success" in df.columns:
+            df["success"] = df["success"].map({1: True, 0: False})
+        return df
+
@@ -0,0 +1,311 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = "manifest.json"
+
+DEFAULT_EXERCISES = ["Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row"]
+
+# Range of starting weights (kg) per exercise
+BASE_WEIGHT_RANGES: Dict[str, Tuple[float, float]] = {
+    "Squat": (60, 100),
+    "Bench Press": (40, 80),
+    "Deadlift": (80, 120),
+    "Overhead Press": (30, 50),
+}
+DEFAULT_BASE_WEIGHT_RANGE = (40, 70)
+
+# Progression model: per workout, a 15% chance of +2.5kg, otherwise a 5% chance
+# of a -2.5kg deload; after 5 workouts at the same weight each further one has
+# a 50% chance of breaking the plateau with +2.5kg
+INCREASE_PROBABILITY = 0.15
+DELOAD_PROBABILITY = 0.05
+PLATEAU_LENGTH = 5
+PLATEAU_BREAK_PROBABILITY = 0.5
+WEIGHT_STEP = 2.5
+MIN_WEIGHT = 20.0
+
+
+def generate_workouts(num_samples: int,
+                      exercises: Optional[List[str]] = None,
+                      users: int = 1,
+                      seed: Any = None,
+                      chunksize: int = 100000,
+                      end_date: Optional[date] = None,
+                      days: int = 180,
+                      first_user: int = 0,
+                      include_user: Optional[bool] = None) -> Iterator[pd.DataFrame]:
+    """
+    Generate synthetic workouts with NumPy, in chunks of whole users.
+
+    Every (user, exercise) series gets `num_samples // (users * len(exercises))`
+    workouts on random days of the `days` before `end_date`, following the
+    progression, deload and plateau rules above. All series of a chunk are
+    simulated together, so the cost is a few array operations per chunk
+    instead of Python work per row.
+
+    Args:
+        num_samples: Total number of workouts to generate
+        exercises: Exercises to generate (default: DEFAULT_EXERCISES)
+        users: Number of simulated users
+        seed: Seed, SeedSequence or Generator for reproducible output
+        chunksize: Approximate number of rows per chunk (a chunk holds at least one user)
+        end_date: Last possible workout date (default: today)
+        days: Length of the date range in days
+        first_user: Index of the first simulated user (for user names across shards)
+        include_user: Whether to add a 'user' column (default: when users > 1)
+
+    Yields:
+        DataFrames of workouts, each sorted by date; labels and dates are
+        categoricals of strings
+    """
+    exercises = list(exercises or DEFAULT_EXERCISES)
+    rng = np.random.default_rng(seed)
+    end_date = end_date or datetime.now().date()
+    start_date = np.datetime64(end_date - timedelta(days=days), "D")
+
+    per_series = num_samples // (users * len(exercises))
+    if per_series <= 0:
+        return
+
+    if include_user is None:
+        include_user = users > 1
+
+    users_per_chunk = max(1, chunksize // (per_series * len(exercises)))
+    for offset in range(0, users, users_per_chunk):
+        chunk_users = min(users_per_chunk, users - offset)
+        yield _generate_chunk(rng, exercises, first_user + offset, chunk_users, per_series,
+                              start_date, days + 1, include_user)
+
+
+def generate_shards(output_dir: str,
+                    num_samples: int,
+                    exercises: Optional[List[str]] = None,
+                    users: int = 1,
+                    seed: Optional[int] = None,
+                    shards: Optional[int] = None,
+                    workers: Optional[int] = None,
+                    chunksize: int = 100000,
+                    end_date: Optional[date] = None,
+                    days: int = 180) -> Dict[str, Any]:
+    """
+    Generate synthetic workouts as CSV shards in parallel and write a manifest.
+
+    Simulated users are split evenly across shards. Each shard is written by
+    a worker process with its own seed stream spawned from `seed`, so the
+    output does not depend on the number of workers. The manifest lists the
+    shards with their row counts and records the seed entropy and end date
+    needed to reproduce them.
+
+    Args:
+        output_dir: Directory for the shard files and the manifest
+        num_samples: Total number of workouts to generate
+        exercises: Exercises to generate (default: DEFAULT_EXERCISES)
+        users: Number of simulated users
+        seed: Root seed (default: fresh entropy, recorded in the manifest)
+        shards: Number of shard files (default: number of workers)
+        workers: Number of worker processes (default: CPU count)
+        chunksize: Approximate number of rows generated and written at a time
+        end_date: Last possible workout date (default: today)
+        days: Length of the date range in days
+
+    Returns:
+        The manifest dictionary
+    """
+    exercises = list(exercises or DEFAULT_EXERCISES)
+    workers = workers or os.cpu_count() or 1
+    shards = max(1, min(shards or workers, users))
+    end_date = end_date or datetime.now().date()
+    os.makedirs(output_dir, exist_ok=True)
+
+    root = np.random.SeedSequence(seed)
+    per_user = (num_samples // (users * len(exercises))) * len(exercises)
+    shard_users = [len(part) for part in np.array_split(np.arange(users), shards)]
+    first_users = np.concatenate([[0], np.cumsum(shard_users)[:-1]])
+
+    tasks = []
+    for index, (child, first_user, count) in enumerate(zip(root.spawn(shards), first_users, shard_users)):
+        tasks.append(dict(
+            path=os.path.join(output_dir, f"shard-{index:05d}.csv"),
+            num_samples=per_user * count,
+            exercises=exercises,
+            users=count,
+            first_user=int(first_user),
+            seed=child,
+            chunksize=chunksize,
+            end_date=end_date,
+            days=days,
+            include_user=users > 1,
+        ))
+
+    if workers == 1:
+        rows = [_write_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, shards)) as executor:
+            rows = list(executor.map(_write_shard, tasks))
+
+    manifest = {
+        "num_samples": int(sum(rows)),
+        "users": users,
+        "exercises": exercises,
+        "seed": str(root.entropy),
+        "end_date": end_date.isoformat(),
+        "days": days,
+        "shards": [
+            {
+                "path": os.path.basename(task["path"]),
+                "rows": int(count),
+                "first_user": task["first_user"],
+                "users": task["users"],
+                "spawn_key": list(task["seed"].spawn_key),
+            }
+            for task, count in zip(tasks, rows)
+        ],
+    }
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+def shard_paths(manifest_path: str) -> List[str]:
+    """
+    List the shard files of a generated dataset.
+
+    Args:
+        manifest_path: Path to a manifest written by `generate_shards`
+
+    Returns:
+        Paths of the shard CSV files, in shard order
+    """
+    with open(manifest_path) as file:
+        manifest = json.load(file)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    return [os.path.join(base_dir, shard["path"]) for shard in manifest["shards"]]
+
+
+def _write_shard(task: Dict[str, Any]) -> int:
+    """Generate one shard into a temporary file and move it into place."""
+    tmp_path = task["path"] + ".tmp"
+    rows = 0
+    chunks = generate_workouts(task["num_samples"], exercises=task["exercises"], users=task["users"],
+                               seed=task["seed"], chunksize=task["chunksize"], end_date=task["end_date"],
+                               days=task["days"], first_user=task["first_user"],
+                               include_user=task["include_user"])
+    with open(tmp_path, "w", newline="") as file:
+        for chunk in chunks:
+            chunk.to_csv(file, header=rows == 0, index=False)
+            rows += len(chunk)
+    os.replace(tmp_path, task["path"])
+    return rows
+
+
+def _generate_chunk(rng: np.random.Generator, exercises: List[str], first_user: int, num_users: int,
+                    per_series: int, start_date: np.datetime64, num_days: int,
+                    with_user: bool) -> pd.DataFrame:
+    """Simulate all (user, exercise) series of a chunk as one (series, workouts) array."""
+    num_series = num_users * len(exercises)
+    shape = (num_series, per_series)
+
+    # Starting weights, one per series
+    low = np.array([BASE_WEIGHT_RANGES.get(name, DEFAULT_BASE_WEIGHT_RANGE)[0] for name in exercises], dtype=float)
+    high = np.array([BASE_WEIGHT_RANGES.get(name, DEFAULT_BASE_WEIGHT_RANGE)[1] for name in exercises], dtype=float)
+    base_weight = rng.uniform(np.tile(low, num_users), np.tile(high, num_users))
+
+    weights = _simulate_weights(rng, base_weight, shape)
+    day_offsets = _workout_days(rng, num_series, per_series, num_days)
+
+    reps = rng.integers(3, 13, size=shape)
+    sets = rng.integers(1, 6, size=shape)
+    rir = np.where(rng.random(shape) < 0.8, rng.integers(0, 5, size=shape), np.nan)
+    rpe = np.where(rng.random(shape) < 0.6, np.round(rng.uniform(6, 10, size=shape), 1), np.nan)
+
+    # Sort the chunk by date; series order breaks ties
+    order = np.argsort(day_offsets.ravel(), kind="stable")
+    series = order // per_series
+
+    # Labels are built as categoricals from small lookup tables, which is
+    # much cheaper than materializing one string per row
+    data = {}
+    if with_user:
+        user_names = [f"user_{user_id + 1:05d}" for user_id in range(first_user, first_user + num_users)]
+        data["user"] = pd.Categorical.from_codes(series // len(exercises), user_names)
+    data["exercise"] = pd.Categorical.from_codes(series % len(exercises), exercises)
+    data["weight"] = weights.ravel()[order]
+    data["reps"] = reps.ravel()[order]
+    data["sets"] = sets.ravel()[order]
+    day_names = np.datetime_as_string(start_date + np.arange(num_days), unit="D")
+    data["date"] = pd.Categorical.from_codes(day_offsets.ravel()[order], day_names)
+    data["rir"] = rir.ravel()[order]
+    data["rpe"] = rpe.ravel()[order]
+    return pd.DataFrame(data)
+
+
+def _simulate_weights(rng: np.random.Generator, base_weight: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Simulate the working weight of each series over its workouts.
+
+    Increases and deloads are independent per workout. The plateau counter
+    only depends on runs of unchanged workouts, so it is advanced for all
+    runs at once, one position per iteration (runs are short). Finally the
+    weight changes are accumulated with a floor at MIN_WEIGHT.
+    """
+    increase = rng.random(shape) < INCREASE_PROBABILITY
+    deload = ~increase & (rng.random(shape) < DELOAD_PROBABILITY)
+    unchanged = ~increase & ~deload
+    # The first workout of a series uses the starting weight
+    increase[:, 0] = deload[:, 0] = unchanged[:, 0] = False
+
+    plateau_break = _plateau_breaks(rng, unchanged.ravel()).reshape(shape)
+
+    delta = np.zeros(shape)
+    delta[increase | plateau_break] = WEIGHT_STEP
+    delta[deload] = -WEIGHT_STEP
+
+    start = np.maximum(np.round(base_weight / WEIGHT_STEP) * WEIGHT_STEP, MIN_WEIGHT)
+    unclamped = start[:, None] + np.cumsum(delta, axis=1)
+    # max(w + d, floor) applied step by step equals the unclamped sum lifted
+    # by the largest shortfall below the floor seen so far
+    shortfall = np.maximum.accumulate(np.maximum(MIN_WEIGHT - unclamped, 0), axis=1)
+    return unclamped + shortfall
+
+
+def _plateau_breaks(rng: np.random.Generator, unchanged: np.ndarray) -> np.ndarray:
+    """Mark the unchanged workouts that break a plateau."""
+    breaks = np.zeros(len(unchanged), dtype=bool)
+    positions = np.flatnonzero(unchanged)
+    if len(positions) == 0:
+        return breaks
+
+    # Split unchanged workouts into runs of consecutive positions
+    run_starts = np.flatnonzero(np.diff(positions, prepend=-2) != 1)
+    run_lengths = np.diff(np.append(run_starts, len(positions)))
+    counters = np.zeros(len(run_starts), dtype=np.int64)
+
+    for step in range(run_lengths.max()):
+        active = np.flatnonzero(run_lengths > step)
+        counters[active] += 1
+        hit = counters[active] >= PLATEAU_LENGTH
+        hit[hit] = rng.random(int(hit.sum())) < PLATEAU_BREAK_PROBABILITY
+        counters[active[hit]] = 0
+        breaks[positions[run_starts[active[hit]] + step]] = True
+    return breaks
+
+
+def _workout_days(rng: np.random.Generator, num_series: int, per_series: int, num_days: int) -> np.ndarray:
+    """
+    Draw sorted workout days for each series.
+
+    Days are drawn without replacement from the date range, repeated as
+    often as needed to cover `per_series` workouts.
+    """
+    repeats = per_series // num_days + 1
+    counts = rng.multivariate_hypergeometric(np.full(num_days, repeats), per_series, size=num_series)
+    return np.repeat(np.tile(np.arange(num_days), num_series), counts.ravel()).reshape(num_series, per_series)
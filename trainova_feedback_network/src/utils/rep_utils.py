@@ -1,6 +1,7 @@
-from typing import List, Dict, Any
+from bisect import bisect_left
+from typing import List, Dict, Any, Union
 import numpy as np
-from .weight_calculation import calculate_one_rep_max
+from .weight_calculation import _is_scalar, calculate_one_rep_max
 
 def generate_suggested_reps(base_reps: int) -> List[int]:
     """
@@ -15,6 +16,94 @@ def generate_suggested_reps(base_reps: int) -> List[int]:
     # Default to 3 sets with a descending pattern
     return [base_reps, max(base_reps - 1, 1), max(base_reps - 2, 1)]
 
+# Standard intensity-rep mapping based on strength training principles:
+# fraction of 1RM (sorted breakpoints) -> base reps
+INTENSITY_BREAKPOINTS = np.array([0.60, 0.65, 0.70, 0.73, 0.75, 0.77, 0.80, 0.83, 0.85, 0.87, 0.90, 0.93, 0.95, 1.00])
+INTENSITY_BASE_REPS = np.array([20, 15, 12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1])
+
+# Reps dropped by the second and third set: none for low-rep/high-intensity work,
+# a slight drop-off for moderate and a more pronounced one for higher rep ranges
+INTENSITY_REP_SCHEMES = INTENSITY_BASE_REPS[:, None] - np.where(
+    INTENSITY_BASE_REPS[:, None] <= 5, [0, 0, 0], np.where(INTENSITY_BASE_REPS[:, None] <= 8, [0, 1, 1], [0, 2, 3]))
+
+# Single-set mapping focused on the 4-8 rep range: each intensity maps to
+# several possible rep counts (padded with 0), used by the prediction model
+SINGLE_SET_BREAKPOINTS = np.array([0.75, 0.77, 0.80, 0.83, 0.85, 0.87, 0.90, 0.92])
+SINGLE_SET_REP_OPTIONS = np.array([
+    [7, 8, 0],     # Very low intensity: 7-8 reps
+    [6, 7, 8],     # Low intensity: 6-8 reps
+    [6, 7, 0],     # Medium-low intensity: 6-7 reps
+    [5, 6, 7],     # Medium intensity: 5-7 reps
+    [5, 6, 0],     # Medium-high intensity: 5-6 reps
+    [4, 5, 6],     # Moderately high intensity: 4-6 reps
+    [4, 5, 0],     # High intensity: 4-5 reps
+    [4, 0, 0],     # Very high intensity: only 4 reps
+])
+SINGLE_SET_OPTION_COUNTS = (SINGLE_SET_REP_OPTIONS > 0).sum(axis=1)
+
+
+def _single_set_plan() -> np.ndarray:
+    # Suggested reps per (intensity row, previous reps 8+ / 4 or fewer / in between, variety shift)
+    count = SINGLE_SET_OPTION_COUNTS[:, None]
+    option = np.column_stack([np.zeros_like(SINGLE_SET_OPTION_COUNTS), count - 1, count // 2])
+    shifted = np.where(count > 1, (option + 1) % count, option)
+    rows = np.arange(len(count))[:, None]
+    plan = np.stack([SINGLE_SET_REP_OPTIONS[rows, option], SINGLE_SET_REP_OPTIONS[rows, shifted]], axis=-1)
+    # Ensure reps stay within the 4-8 range
+    return np.clip(plan, 4, 8)
+
+
+SINGLE_SET_PLAN = _single_set_plan()
+
+# Plain-list copies for the scalar paths, which skip NumPy's per-call overhead
+_INTENSITY_KEYS = INTENSITY_BREAKPOINTS.tolist()
+_INTENSITY_SCHEMES = INTENSITY_REP_SCHEMES.tolist()
+_SINGLE_SET_KEYS = SINGLE_SET_BREAKPOINTS.tolist()
+_SINGLE_SET_PLAN = SINGLE_SET_PLAN.tolist()
+
+ArrayLike = Union[float, np.ndarray]
+
+
+def nearest_breakpoint(breakpoints: np.ndarray, values: ArrayLike) -> ArrayLike:
+    """
+    Find the breakpoint closest to each value by binary search
+
+    Args:
+        breakpoints: Sorted breakpoints (a list for scalar lookups)
+        values: Values to look up (scalar or array)
+
+    Returns:
+        Index of the closest breakpoint; ties go to the higher breakpoint
+    """
+    if isinstance(breakpoints, list) and _is_scalar(values):
+        upper = min(bisect_left(breakpoints, values), len(breakpoints) - 1)
+        lower = max(upper - 1, 0)
+        return lower if abs(breakpoints[lower] - values) < abs(breakpoints[upper] - values) else upper
+    upper = np.minimum(np.searchsorted(breakpoints, values), len(breakpoints) - 1)
+    lower = np.maximum(upper - 1, 0)
+    closer_below = np.abs(breakpoints[lower] - values) < np.abs(breakpoints[upper] - values)
+    return np.where(closer_below, lower, upper)
+
+
+def estimate_intensity(previous_weight: ArrayLike, previous_reps: ArrayLike, predicted_weight: ArrayLike) -> ArrayLike:
+    """
+    Intensity of the predicted weight as a fraction of the previous workout's Brzycki 1RM
+
+    Args:
+        previous_weight: Weight from previous workout
+        previous_reps: Reps from previous workout
+        predicted_weight: Predicted weight for next workout
+
+    Returns:
+        Intensity (0.75 without a 1RM estimate)
+    """
+    estimated_1rm = calculate_one_rep_max(previous_weight, previous_reps, formula='brzycki')
+    if _is_scalar(estimated_1rm):
+        return (predicted_weight / estimated_1rm) if estimated_1rm > 0 else 0.75
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(estimated_1rm > 0, np.asarray(predicted_weight, dtype=float) / estimated_1rm, 0.75)
+
+
 def generate_intensity_based_reps(previous_weight: float, previous_reps: int, predicted_weight: float) -> List[int]:
     """
     Generate rep scheme based on intensity relationship 
@@ -27,43 +116,61 @@ def generate_intensity_based_reps(previous_weight: float, previous_reps: int, pr
     Returns:
         List of suggested rep counts for sets
     """
-    # Calculate estimated 1RM based on previous performance
-    estimated_1rm = calculate_one_rep_max(previous_weight, previous_reps, formula='brzycki')
-    
-    # Calculate intensity percentage of the predicted weight relative to 1RM
-    intensity = (predicted_weight / estimated_1rm) if estimated_1rm > 0 else 0.75
-    
-    # Map intensity to appropriate rep ranges
-    # Standard intensity-rep mapping based on strength training principles
-    intensity_mapping = {
-        1.00: 1,    # 100% 1RM = 1 rep
-        0.95: 2,    # 95% 1RM = 2 reps
-        0.93: 3,    # 93% 1RM = 3 reps
-        0.90: 4,    # 90% 1RM = 4 reps
-        0.87: 5,    # 87% 1RM = 5 reps
-        0.85: 6,    # 85% 1RM = 6 reps
-        0.83: 7,    # 83% 1RM = 7 reps
-        0.80: 8,    # 80% 1RM = 8 reps
-        0.77: 9,    # 77% 1RM = 9 reps
-        0.75: 10,   # 75% 1RM = 10 reps
-        0.73: 11,   # 73% 1RM = 11 reps
-        0.70: 12,   # 70% 1RM = 12 reps
-        0.65: 15,   # 65% 1RM = 15 reps
-        0.60: 20,   # 60% 1RM = 20 reps
-    }
-    
-    # Find the closest intensity level in our mapping
-    closest_intensity = min(intensity_mapping.keys(), key=lambda x: abs(x - intensity))
-    suggested_base_reps = intensity_mapping[closest_intensity]
-    
-    # Create a rep scheme based on the base rep count
-    # For intermediate and advanced lifters, a slight rep drop is common across sets
-    if suggested_base_reps <= 5:
-        # For low-rep/high-intensity work, keep reps consistent to maintain intensity
-        return [suggested_base_reps] * 3
-    elif suggested_base_reps <= 8:
-        # For moderate rep ranges, use a slight drop-off
-        return [suggested_base_reps, suggested_base_reps - 1, suggested_base_reps - 1]
-    else:
-        # For higher rep ranges, use a more pronounced drop-off
-        return [suggested_base_reps, suggested_base_reps - 2, suggested_base_reps - 3]
\ No newline at end of file
+    intensity = estimate_intensity(previous_weight, previous_reps, predicted_weight)
+    return list(_INTENSITY_SCHEMES[nearest_breakpoint(_INTENSITY_KEYS, intensity)])
+
+
+def generate_intensity_based_reps_batch(previous_weight: np.ndarray,
+                                        previous_reps: np.ndarray,
+                                        predicted_weight: np.ndarray) -> np.ndarray:
+    """
+    Generate the rep schemes of many predictions at once
+
+    Args:
+        previous_weight: Weight from previous workout, per prediction
+        previous_reps: Reps from previous workout, per prediction
+        predicted_weight: Predicted weight for next workout, per prediction
+
+    Returns:
+        Suggested rep counts, shape (predictions, 3)
+    """
+    intensity = estimate_intensity(np.asarray(previous_weight, dtype=float),
+                                   np.asarray(previous_reps, dtype=float),
+                                   predicted_weight)
+    return INTENSITY_REP_SCHEMES[nearest_breakpoint(INTENSITY_BREAKPOINTS, np.atleast_1d(intensity))]
+
+
+def generate_single_set_reps(previous_weight: ArrayLike,
+                             previous_reps: ArrayLike,
+                             predicted_weight: ArrayLike,
+                             workout_counter: ArrayLike = 0) -> ArrayLike:
+    """
+    Suggest the reps of a single set in the 4-8 rep range
+
+    The intensity (capped at 75-95% of 1RM) selects a range of rep options
+    (SINGLE_SET_PLAN holds the resulting suggestion for every case).
+    After high-rep workouts (8+) the lowest option is suggested, after
+    low-rep workouts (4 or fewer) the highest and otherwise the middle one.
+    Every third workout (`workout_counter` divisible by 3) moves to the next
+    option for variety. All arguments may be arrays.
+
+    Args:
+        previous_weight: Weight from previous workout
+        previous_reps: Reps from previous workout
+        predicted_weight: Predicted weight for next workout
+        workout_counter: Number of rep suggestions made before this one
+
+    Returns:
+        Suggested reps
+    """
+    intensity = estimate_intensity(previous_weight, previous_reps, predicted_weight)
+    if _is_scalar(intensity) and _is_scalar(previous_reps) and _is_scalar(workout_counter):
+        # No exercise should really be performed above 95% of 1RM for reps
+        row = nearest_breakpoint(_SINGLE_SET_KEYS, min(max(intensity, 0.75), 0.95))
+        previous = 0 if previous_reps >= 8 else 1 if previous_reps <= 4 else 2
+        return _SINGLE_SET_PLAN[row][previous][int(workout_counter % 3 == 0)]
+
+    row = nearest_breakpoint(SINGLE_SET_BREAKPOINTS, np.clip(intensity, 0.75, 0.95))
+    previous_reps = np.asarray(previous_reps)
+    previous = np.where(previous_reps >= 8, 0, np.where(previous_reps <= 4, 1, 2))
+    return SINGLE_SET_PLAN[row, previous, (np.asarray(workout_counter) % 3 == 0).astype(int)]
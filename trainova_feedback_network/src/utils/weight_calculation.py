@@ -1,65 +1,138 @@
 import numpy as np
-from typing import List, Dict, Any
+from typing import Callable, Dict, List, Any, Union
 
-def calculate_one_rep_max(weight: float, reps: int, formula: str = 'brzycki') -> float:
+ArrayLike = Union[float, np.ndarray]
+
+
+def _is_scalar(value: Any) -> bool:
+    # Plain numbers skip the slower np.ndim check
+    return type(value) in (int, float) or np.ndim(value) == 0
+
+
+def _epley(reps: ArrayLike) -> ArrayLike:
+    # Epley formula: 1RM = w * (1 + r/30)
+    return 1 + reps / 30
+
+
+def _brzycki(reps: ArrayLike) -> ArrayLike:
+    # Brzycki formula: 1RM = w * 36 / (37 - r), capped at 1.8 * w from 37 reps
+    if _is_scalar(reps):
+        return 36 / (37 - reps) if reps < 37 else 1.8
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(reps < 37, 36 / (37 - reps), 1.8)
+
+
+def _lombardi(reps: ArrayLike) -> ArrayLike:
+    # Lombardi formula: 1RM = w * r^0.1
+    return np.power(reps, 0.1)
+
+
+def _mayhew(reps: ArrayLike) -> ArrayLike:
+    # Mayhew formula: 1RM = 100 * w / (52.2 + 41.9 * e^(-0.055 r))
+    return 100 / (52.2 + 41.9 * np.exp(-0.055 * reps))
+
+
+def _wathan(reps: ArrayLike) -> ArrayLike:
+    # Wathan formula: 1RM = 100 * w / (48.8 + 53.8 * e^(-0.075 r))
+    return 100 / (48.8 + 53.8 * np.exp(-0.075 * reps))
+
+
+# Ratio of the 1RM to the weight lifted for a number of reps, per formula
+ONE_REP_MAX_FORMULAS: Dict[str, Callable[[ArrayLike], ArrayLike]] = {
+    'epley': _epley,
+    'brzycki': _brzycki,
+    'lombardi': _lombardi,
+    'mayhew': _mayhew,
+    'wathan': _wathan,
+}
+
+
+def one_rep_max_factor(reps: ArrayLike, formula: str = 'brzycki') -> ArrayLike:
+    """
+    Ratio of the estimated 1RM to the weight lifted for a number of reps
+
+    Args:
+        reps: Number of reps performed (scalar or array)
+        formula: Which formula to use (a key of ONE_REP_MAX_FORMULAS; others use Brzycki)
+
+    Returns:
+        1RM / weight for each rep count
+    """
+    factor = ONE_REP_MAX_FORMULAS.get(formula)
+    if factor is None:
+        # Default to Brzycki
+        factor = ONE_REP_MAX_FORMULAS.get(formula.lower(), _brzycki)
+    return factor(reps)
+
+
+def calculate_one_rep_max(weight: ArrayLike, reps: ArrayLike, formula: str = 'brzycki') -> ArrayLike:
     """
     Calculate estimated one-rep max based on weight and reps performed
-    
+
+    Weight and reps may be NumPy arrays (broadcast against each other), in
+    which case the 1RM of every element is computed at once.
+
     Args:
         weight: Weight used in the set
         reps: Number of reps performed
-        formula: Which formula to use ('epley', 'brzycki', etc.)
-        
+        formula: Which formula to use ('epley', 'brzycki', 'lombardi', 'mayhew' or 'wathan')
+
     Returns:
-        Estimated 1RM
+        Estimated 1RM (0 without weight or reps)
     """
-    if reps <= 0 or weight <= 0:
-        return 0
-        
-    if formula.lower() == 'epley':
-        # Epley formula: 1RM = w * (1 + r/30)
-        return weight * (1 + reps / 30)
-    elif formula.lower() == 'brzycki':
-        # Brzycki formula: 1RM = w * 36 / (37 - r)
-        return weight * 36 / (37 - reps) if reps < 37 else weight * 1.8
-    else:
-        # Default to Brzycki
-        return weight * 36 / (37 - reps) if reps < 37 else weight * 1.8
+    if _is_scalar(weight) and _is_scalar(reps):
+        if reps <= 0 or weight <= 0:
+            return 0
+        return weight * one_rep_max_factor(reps, formula)
+
+    weight = np.asarray(weight, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+    valid = (reps > 0) & (weight > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(valid, weight * one_rep_max_factor(np.where(valid, reps, 1.0), formula), 0.0)
+
 
-def calculate_weight_for_reps(one_rep_max: float, target_reps: int, formula: str = 'brzycki') -> float:
+def calculate_weight_for_reps(one_rep_max: ArrayLike, target_reps: ArrayLike, formula: str = 'brzycki') -> ArrayLike:
     """
     Calculate the appropriate weight to use for a specific rep target
-    
+
+    This inverts `calculate_one_rep_max`: the 1RM is divided by the formula's
+    1RM-to-weight ratio at the target reps. For Brzycki that ratio is capped
+    at 1.8 from 37 reps, so those targets give 1RM / 1.8 (the previous
+    rearranged formula, 1RM * (37 - r) / 36, gave zero or negative weights).
+
     Args:
-        one_rep_max: Estimated 1RM
-        target_reps: Desired number of reps
-        formula: Which formula to use ('epley', 'brzycki', etc.)
-        
+        one_rep_max: Estimated 1RM (scalar or array)
+        target_reps: Desired number of reps (scalar or array)
+        formula: Which formula to use ('epley', 'brzycki', 'lombardi', 'mayhew' or 'wathan')
+
     Returns:
         Appropriate weight for the target rep count
     """
-    if target_reps <= 1:
-        return one_rep_max
-        
-    if formula.lower() == 'epley':
-        # Rearranged Epley formula: w = 1RM / (1 + r/30)
-        return one_rep_max / (1 + target_reps/30)
-    elif formula.lower() == 'brzycki':
-        # Rearranged Brzycki formula: w = 1RM × (37 - r) / 36
-        return one_rep_max * (37 - target_reps) / 36
-    else:
-        # Default to Brzycki
-        return one_rep_max * (37 - target_reps) / 36
-    
-def round_to_increment(weight: float, increment: float = 2.5) -> float:
+    if _is_scalar(one_rep_max) and _is_scalar(target_reps):
+        if target_reps <= 1:
+            return one_rep_max
+        return one_rep_max / one_rep_max_factor(target_reps, formula)
+
+    one_rep_max = np.asarray(one_rep_max, dtype=float)
+    target_reps = np.asarray(target_reps, dtype=float)
+    single = target_reps <= 1
+    return np.where(single, one_rep_max, one_rep_max / one_rep_max_factor(np.where(single, 2.0, target_reps), formula))
+
+
+def round_to_increment(weight: ArrayLike, increment: float = 2.5) -> ArrayLike:
     """
     Round a weight to the nearest increment (usually 2.5kg/5lb)
-    
+
+    Arrays are rounded element-wise; halves round to even, like round().
+
     Args:
         weight: Weight to round
         increment: Increment to round to (default 2.5)
-        
+
     Returns:
         Rounded weight
     """
-    return round(weight / increment) * increment
\ No newline at end of file
+    if _is_scalar(weight):
+        return round(weight / increment) * increment
+    return np.round(np.asarray(weight, dtype=float) / increment) * increment
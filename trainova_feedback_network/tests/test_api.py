@@ -0,0 +1,178 @@
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+
+from flask import Flask, jsonify
+
+from src.api.coalescing import SingleFlight, request_fingerprint
+from src.api.loadgen import LoadGenerator, _summarize, build_payloads, parse_mix, prime_feedback, start_local_server
+from src.api.profiling import RequestProfiler
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_computation(self):
+        coalescer = SingleFlight(ttl=0)
+        calls = []
+        results = []
+        barrier = threading.Barrier(5)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"weight": 100}
+
+        def worker():
+            barrier.wait()
+            results.append(coalescer.do("key", compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"weight": 100}] * 5)
+
+    def test_result_cached_for_ttl_and_cleared(self):
+        coalescer = SingleFlight(ttl=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(coalescer.do("key", compute), 1)
+        self.assertEqual(coalescer.do("key", compute), 1)
+        coalescer.clear()
+        self.assertEqual(coalescer.do("key", compute), 2)
+
+    def test_clear_during_computation_skips_caching(self):
+        coalescer = SingleFlight(ttl=60)
+        started, release = threading.Event(), threading.Event()
+        results = []
+
+        def stale():
+            started.set()
+            release.wait()
+            return "stale"
+
+        leader = threading.Thread(target=lambda: results.append(coalescer.do("key", stale)))
+        leader.start()
+        started.wait()
+        coalescer.clear()
+        # A caller after the clear does not join the stale computation
+        self.assertEqual(coalescer.do("key", lambda: "fresh"), "fresh")
+        release.set()
+        leader.join()
+
+        self.assertEqual(results, ["stale"])
+        self.assertEqual(coalescer.do("key", lambda: "recomputed"), "fresh")
+
+    def test_errors_are_not_cached(self):
+        coalescer = SingleFlight(ttl=60)
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            coalescer.do("key", fail)
+        self.assertEqual(coalescer.do("key", lambda: "ok"), "ok")
+
+    def test_fingerprint_ignores_key_order(self):
+        first = request_fingerprint({"exercise": "Squat", "debug": False})
+        second = request_fingerprint({"debug": False, "exercise": "Squat"})
+        self.assertEqual(first, second)
+
+
+class TestRequestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.profiler = RequestProfiler(self.profile_dir, token="secret", max_files=2)
+        app = Flask(__name__)
+
+        @app.route('/predict', methods=['POST'])
+        @self.profiler.profiled
+        def predict():
+            return jsonify({"weight": 100})
+
+        self.client = app.test_client()
+        self.payload = {"exercise": "Squat", "previous_workouts": [{"weight": 100, "reps": 5}] * 3}
+
+    def test_profiles_only_with_matching_token(self):
+        self.client.post('/predict', json=self.payload)
+        self.client.post('/predict', json=self.payload, headers={"X-Trainova-Profile": "wrong"})
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+        response = self.client.post('/predict', json=self.payload, headers={"X-Trainova-Profile": "secret"})
+        self.assertEqual(response.get_json(), {"weight": 100})
+        profiles = os.listdir(self.profile_dir)
+        self.assertEqual(len(profiles), 1)
+        self.assertIn("_predict_n3_", profiles[0])
+
+    def test_header_ignored_without_token(self):
+        profiler = RequestProfiler(self.profile_dir)
+        app = Flask(__name__)
+        app.add_url_rule('/predict', 'predict', profiler.profiled(lambda: jsonify({"weight": 100})), methods=['POST'])
+        app.test_client().post('/predict', json=self.payload, headers={"X-Trainova-Profile": "1"})
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_concurrent_request_runs_unprofiled(self):
+        with self.profiler._profile_lock:
+            response = self.client.post('/predict', json=self.payload, headers={"X-Trainova-Profile": "secret"})
+        self.assertEqual(response.get_json(), {"weight": 100})
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_rotates_old_profiles(self):
+        for _ in range(4):
+            self.client.post('/predict', json=self.payload, headers={"X-Trainova-Profile": "secret"})
+        self.assertEqual(len(os.listdir(self.profile_dir)), 2)
+
+
+
+class TestLoadGenerator(unittest.TestCase):
+
+    def test_payloads_are_seeded_locally(self):
+        random.seed(0)
+        expected = random.random()
+        random.seed(0)
+        payloads = build_payloads([4, 6], ["Squat", "Bench Press"], payloads_per_length=2, seed=1)
+        self.assertEqual(random.random(), expected)
+
+        self.assertEqual([len(p["previous_workouts"]) for p in payloads["predict"]], [4, 4, 6, 6])
+        self.assertEqual([p["user"] for p in payloads["feedback"]], [p["user"] for p in payloads["predict"]])
+        self.assertEqual(build_payloads([4, 6], ["Squat", "Bench Press"], payloads_per_length=2, seed=1), payloads)
+
+    def test_summary(self):
+        results = [("predict", 200, 0.010), ("predict", 500, 0.030), ("feedback", None, 0.020), ("feedback", 200, 0.040)]
+        summary = _summarize(results, elapsed=2.0)
+        self.assertEqual(summary["requests"], 4)
+        self.assertEqual(summary["errors"], 2)
+        self.assertEqual(summary["error_rate"], 0.5)
+        self.assertEqual(summary["throughput_rps"], 2.0)
+        self.assertEqual(summary["latency_ms"]["p50"], 25.0)
+        self.assertEqual(summary["latency_ms"]["max"], 40.0)
+        self.assertEqual(summary["status_codes"], {"200": 2, "500": 1, "connection_error": 1})
+        self.assertEqual(_summarize([], 1.0)["requests"], 0)
+
+    def test_smoke_run_against_local_server(self):
+        server, base_url = start_local_server(threads=2)
+        try:
+            payloads = build_payloads([5], ["Squat"], payloads_per_length=2, seed=2)
+            self.assertEqual(prime_feedback(base_url, payloads), 2)
+            report = LoadGenerator(base_url, payloads, parse_mix("predict=0.5,feedback=0.5"),
+                                   rate=50, duration=0.2, concurrency=2, seed=3).run()
+        finally:
+            server.close()
+        self.assertEqual(report["requests"], 10)
+        self.assertEqual(report["errors"], 0)
+        self.assertEqual(sum(endpoint["requests"] for endpoint in report["by_endpoint"].values()), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import copy
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.models.feedback_prediction_model import FeedbackBasedPredictionModel
+from src.prediction.backtest import backtest, iter_series, predict_series, series_features
+from src.prediction.sweep import parameter_grid, parse_parameter_space, random_parameters, run_sweep
+from src.storage.synthetic import generate_workouts
+
+
+class TestBacktest(unittest.TestCase):
+
+    def test_matches_predict_on_every_prefix(self):
+        rng = np.random.default_rng(1)
+        weights = np.round(rng.uniform(20, 150, 40) / 1.25) * 1.25
+        weights[10:20] = weights[10]
+        reps = rng.integers(0, 16, 40).astype(float)
+
+        model = FeedbackBasedPredictionModel()
+        predicted = predict_series(series_features(weights, reps), model.prediction_weights)
+
+        history = [{"exercise": "Squat", "weight": w, "reps": r} for w, r in zip(weights, reps)]
+        expected = [FeedbackBasedPredictionModel().predict("Squat", [dict(h) for h in history[:i]])["weight"]
+                    for i in range(1, len(history))]
+        self.assertEqual(list(predicted), expected)
+
+    def test_calibrated_matches_predict_on_every_prefix(self):
+        rng = np.random.default_rng(2)
+        weights = np.round(rng.uniform(40, 120, 30) / 1.25) * 1.25
+        reps = rng.integers(0, 12, 30).astype(float)
+        calibration = {"progression_rate": 1.5, "rep_mean": 7.5, "rep_std": 2.0, "volume_scale": 600.0,
+                       "consistency": 0.2,
+                       "prediction_weights": {"last_weight": 0.7, "avg_progress": 0.2, "consistency": 0.05,
+                                              "volume": 0.1}}
+        predicted = predict_series(series_features(weights, reps, calibration), calibration["prediction_weights"])
+
+        model = FeedbackBasedPredictionModel()
+        model.calibration["Squat"] = calibration
+        history = [{"exercise": "Squat", "weight": w, "reps": r} for w, r in zip(weights, reps)]
+        expected = [model.predict("Squat", [dict(h) for h in history[:i]])["weight"] for i in range(1, len(history))]
+        self.assertEqual(list(predicted), expected)
+
+        workouts = pd.DataFrame(history)
+        self.assertAlmostEqual(backtest(workouts, calibration={"Squat": calibration})["mae"].iloc[0],
+                               np.abs(predicted - weights[1:]).mean())
+
+    def test_vectorized_parameters(self):
+        features = series_features(np.array([100.0, 102.5, 105.0]), np.array([5.0, 5.0, 5.0]))
+        weights = {"last_weight": np.array([[0.8], [1.0]]), "avg_progress": 0.1, "consistency": 0.05, "volume": 0.05}
+        self.assertEqual(predict_series(features, weights).shape, (2, 2))
+
+    def test_metrics_per_exercise(self):
+        workouts = pd.DataFrame([
+            {"exercise": "Squat", "weight": 100.0, "reps": 6, "date": "2024-01-01", "success": True},
+            {"exercise": "Squat", "weight": 110.0, "reps": 6, "date": "2024-01-03", "success": True},
+            {"exercise": "Squat", "weight": 110.0, "reps": 6, "date": "2024-01-05", "success": False},
+            {"exercise": "Bench Press", "weight": 60.0, "reps": 8, "date": "2024-01-02", "success": True},
+        ])
+        results = backtest(workouts)
+        self.assertEqual(list(results["exercise"]), ["Squat"])
+
+        model = FeedbackBasedPredictionModel()
+        history = workouts[workouts["exercise"] == "Squat"].to_dict("records")
+        first = model.predict("Squat", [dict(history[0])])["weight"]
+        second = FeedbackBasedPredictionModel().predict("Squat", [dict(h) for h in history[:2]])["weight"]
+        errors = np.array([first - 110.0, second - 110.0])
+
+        row = results.iloc[0]
+        self.assertEqual(row["predictions"], 2)
+        self.assertAlmostEqual(row["mae"], np.abs(errors).mean())
+        self.assertAlmostEqual(row["bias"], errors.mean())
+        self.assertAlmostEqual(row["success_rate"], (first <= 110.0) / 2)
+
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        chunks = generate_workouts(400, exercises=["Squat", "Bench Press"], users=2, seed=3)
+        self.workouts = pd.concat(chunks, ignore_index=True).astype({"user": str, "exercise": str})
+        self.workouts["date"] = pd.to_datetime(self.workouts["date"].astype(str))
+
+    def test_parse_and_sample_parameters(self):
+        space = parse_parameter_space(["push=0,0.025", "last_weight=0.6:0.9"])
+        self.assertEqual(space, {"push": [0.0, 0.025], "last_weight": (0.6, 0.9)})
+        with self.assertRaises(ValueError):
+            parse_parameter_space(["momentum=1"])
+        with self.assertRaises(ValueError):
+            parameter_grid(space)
+
+        trials = random_parameters(space, 20, seed=1)
+        self.assertTrue(trials["last_weight"].between(0.6, 0.9).all())
+        self.assertTrue(set(trials["push"]) <= {0.0, 0.025})
+        self.assertEqual(len(parameter_grid({"push": [0, 0.05], "volume": [0, 0.1, 0.2]})), 6)
+
+    def test_fixed_sweep_matches_backtest(self):
+        trials = parameter_grid({"push": [0.0, 0.025], "last_weight": [0.7, 0.8]})
+        results = run_sweep(self.workouts, trials, workers=2)
+        self.assertEqual(list(results["rank"]), [1, 2, 3, 4])
+        self.assertTrue(results["mae"].is_monotonic_increasing)
+
+        default = results[(results["push"] == 0.025) & (results["last_weight"] == 0.8)].iloc[0]
+        summary = backtest(self.workouts)
+        self.assertEqual(default["predictions"], summary["predictions"].sum())
+        self.assertAlmostEqual(default["mae"], (summary["mae"] * summary["predictions"]).sum() / default["predictions"])
+
+    def test_feedback_replay_matches_model(self):
+        self._check_feedback_replay(calibrated=False)
+
+    def test_calibrated_feedback_replay_matches_model(self):
+        self._check_feedback_replay(calibrated=True)
+
+    def _check_feedback_replay(self, calibrated):
+        model = FeedbackBasedPredictionModel()
+        if calibrated:
+            model.fit(self.workouts[self.workouts["exercise"] == "Squat"])
+            self.assertEqual(list(model.calibration), ["Squat"])
+        trials = parameter_grid({"feedback_influence": [0.3]})
+        result = run_sweep(self.workouts, trials, workers=1, feedback=True,
+                           calibration=copy.deepcopy(model.calibration)).iloc[0]
+
+        # Replay the same feedback loop through the model itself
+        model.feedback_influence = 0.3
+        steps = [(series["date"][step + 1], exercise, series, step)
+                 for exercise, series in iter_series(self.workouts) for step in range(len(series["weight"]) - 1)]
+        errors = []
+        for _, exercise, series, step in sorted(steps, key=lambda item: item[0]):
+            history = [{"exercise": exercise, "weight": w, "reps": r}
+                       for w, r in zip(series["weight"][:step + 1], series["reps"][:step + 1])]
+            predicted = model.predict(exercise, history)["weight"]
+            actual, rir = series["weight"][step + 1], series["rir"][step + 1]
+            errors.append(predicted - actual)
+            model.provide_feedback(exercise, predicted, actual, bool(series["success"][step + 1]),
+                                   rir=None if np.isnan(rir) else rir)
+        self.assertAlmostEqual(result["mae"], np.abs(errors).mean())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import pandas as pd
+
+from src.prediction.batch import predict_all
+from src.prediction.predictor import WorkoutPredictor
+from src.storage.synthetic import generate_workouts
+
+
+class TestBatchPrediction(unittest.TestCase):
+
+    def setUp(self):
+        chunks = generate_workouts(600, exercises=["Squat", "Bench Press"], users=2, seed=7)
+        self.workouts = pd.concat(chunks, ignore_index=True).astype({"user": str, "exercise": str})
+        self.workouts["date"] = pd.to_datetime(self.workouts["date"].astype(str))
+
+    def test_one_row_per_user_and_exercise(self):
+        df = pd.concat(predict_all(self.workouts, workers=1, batch_size=1), ignore_index=True)
+        self.assertEqual(len(df), 4)
+        self.assertEqual(sorted(zip(df["user"], df["exercise"])), [
+            ("user_00001", "Bench Press"), ("user_00001", "Squat"), ("user_00002", "Bench Press"), ("user_00002", "Squat"),
+        ])
+        self.assertEqual(df["history"].sum(), len(self.workouts))
+
+        # Same prediction as the single-exercise CLI path
+        history = self.workouts[(self.workouts["user"] == "user_00002") & (self.workouts["exercise"] == "Squat")]
+        expected = WorkoutPredictor().predict_workout("Squat", history.sort_values("date").to_dict("records"))
+        row = df[(df["user"] == "user_00002") & (df["exercise"] == "Squat")].iloc[0]
+        self.assertEqual(row["weight"], expected["weight"])
+        self.assertEqual(row["suggested_reps"], ",".join(str(reps) for reps in expected["suggested_reps"]))
+        self.assertEqual(row["message"], expected["message"])
+
+    def test_batched_reps_match_single_predictions(self):
+        df = pd.concat(predict_all(self.workouts, workers=1, batch_size=4), ignore_index=True)
+        for _, row in df.iterrows():
+            history = self.workouts[(self.workouts["user"] == row["user"]) & (self.workouts["exercise"] == row["exercise"])]
+            expected = WorkoutPredictor().predict_workout(row["exercise"], history.sort_values("date").to_dict("records"))
+            self.assertEqual(row["reps"], expected["suggested_reps"][0])
+            self.assertEqual(row["message"], expected["message"])
+
+    def test_workers_give_identical_results(self):
+        serial = pd.concat(predict_all(self.workouts, workers=1, batch_size=1), ignore_index=True)
+        parallel = pd.concat(predict_all(self.workouts, workers=2, batch_size=1), ignore_index=True)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    def test_without_users(self):
+        df = pd.concat(predict_all(self.workouts.drop(columns=["user"]), workers=1))
+        self.assertNotIn("user", df.columns)
+        self.assertEqual(sorted(df["exercise"]), ["Bench Press", "Squat"])
+        self.assertEqual(list(predict_all(pd.DataFrame())), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
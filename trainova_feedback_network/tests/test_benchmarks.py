@@ -0,0 +1,64 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.hot_paths import BENCHMARKS, compare_results, main
+
+
+def _results(**medians):
+    return {"results": {name: {"100": {"median_s": median}} for name, median in medians.items()}}
+
+
+class TestBenchmarkBaseline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_flags_slowdowns_above_threshold(self):
+        baseline = _results(predict=0.010, calculate_trend=0.020, analyze_trend=0.0)
+        current = _results(predict=0.013, calculate_trend=0.022, analyze_trend=0.001, calculate_one_rep_max=0.5)
+        comparisons = {c["benchmark"]: c for c in compare_results(baseline, current, threshold=0.2)}
+
+        # Cases missing from the baseline (or timed at zero) are not compared
+        self.assertEqual(set(comparisons), {"predict", "calculate_trend"})
+        self.assertTrue(comparisons["predict"]["regression"])
+        self.assertEqual(comparisons["predict"]["ratio"], 1.3)
+        self.assertFalse(comparisons["calculate_trend"]["regression"])
+        self.assertEqual(comparisons["calculate_trend"]["size"], 100)
+
+    def test_save_and_compare_round_trip(self):
+        path = os.path.join(self.tmp_dir, "baseline.json")
+        args = ["--benchmarks", "calculate_one_rep_max", "--sizes", "10", "--repeats", "1"]
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main(args + ["--save", path]), 0)
+            with open(path) as file:
+                saved = json.load(file)
+            self.assertIn("median_s", saved["results"]["calculate_one_rep_max"]["10"])
+
+            # A baseline far faster than any real run is flagged, a far slower one is not
+            saved["results"]["calculate_one_rep_max"]["10"]["median_s"] = 1e-12
+            with open(path, "w") as file:
+                json.dump(saved, file)
+            self.assertEqual(main(args + ["--compare", path]), 1)
+
+            saved["results"]["calculate_one_rep_max"]["10"]["median_s"] = 1e3
+            with open(path, "w") as file:
+                json.dump(saved, file)
+            self.assertEqual(main(args + ["--compare", path]), 0)
+
+    def test_committed_baseline_covers_the_suite(self):
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "baseline.json")
+        with open(path) as file:
+            baseline = json.load(file)
+        self.assertEqual(set(baseline["results"]), set(BENCHMARKS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import pandas as pd
+
+from src.models.calibration import calibrate
+from src.models.feedback_prediction_model import FeedbackBasedPredictionModel
+from src.storage.synthetic import generate_workouts
+
+
+class TestCalibration(unittest.TestCase):
+
+    def setUp(self):
+        chunks = generate_workouts(2000, exercises=["Squat", "Bench Press"], users=4, seed=7)
+        self.workouts = pd.concat(chunks, ignore_index=True).astype({"user": str, "exercise": str})
+        self.workouts["date"] = pd.to_datetime(self.workouts["date"].astype(str))
+
+    def test_grouped_statistics(self):
+        model = FeedbackBasedPredictionModel()
+        calibration = calibrate(self.workouts, model.prediction_weights, model.progression_factors)
+        self.assertEqual(sorted(calibration), ["Bench Press", "Squat"])
+
+        squat = self.workouts[self.workouts["exercise"] == "Squat"].sort_values(["user", "date"], kind="stable")
+        changes = squat.groupby("user")["weight"].diff().dropna()
+        values = calibration["Squat"]
+        self.assertEqual(values["rows"], len(squat))
+        self.assertAlmostEqual(values["progression_rate"], changes.mean())
+        self.assertAlmostEqual(values["rep_mean"], squat.loc[squat["reps"] > 0, "reps"].mean())
+        self.assertAlmostEqual(values["volume_scale"], (squat["weight"] * squat["reps"]).mean())
+        self.assertTrue(all(weight >= 0 for weight in values["prediction_weights"].values()))
+
+    def test_small_exercises_are_not_calibrated(self):
+        workouts = pd.DataFrame({"exercise": ["Squat"] * 5, "weight": [100.0, 102.5, 105.0, 105.0, 107.5],
+                                 "reps": [5] * 5, "date": pd.date_range("2024-01-01", periods=5)})
+        model = FeedbackBasedPredictionModel()
+        self.assertEqual(model.fit(workouts), {})
+        self.assertEqual(model.calibration, {})
+
+    def test_predict_uses_calibration(self):
+        history = self.workouts[(self.workouts["exercise"] == "Squat") & (self.workouts["user"] == "user_00001")]
+        history = history.to_dict("records")
+        baseline = FeedbackBasedPredictionModel().predict("Squat", [dict(h) for h in history])
+
+        model = FeedbackBasedPredictionModel()
+        model.fit(self.workouts[self.workouts["exercise"] == "Squat"])
+        self.assertEqual(list(model.calibration), ["Squat"])
+        calibrated = model.predict("Squat", [dict(h) for h in history])
+        self.assertGreater(calibrated["weight"], 0)
+        self.assertEqual(calibrated["analysis"]["progression_rate"],
+                         f"{model.calibration['Squat']['progression_rate'] * 1.25:.2f} kg per session")
+
+        # Clearing the calibration restores the history-based prediction
+        model.calibration = {}
+        self.assertEqual(model.predict("Squat", [dict(h) for h in history])["weight"], baseline["weight"])
+
+    def test_feedback_adjusts_calibrated_blend(self):
+        model = FeedbackBasedPredictionModel()
+        model.fit(self.workouts)
+        model.feedback_buffer.batch_size = 1
+        squat = dict(model.calibration["Squat"]["prediction_weights"])
+        bench = dict(model.calibration["Bench Press"]["prediction_weights"])
+
+        history = self.workouts[self.workouts["exercise"] == "Squat"].head(20).to_dict("records")
+        predicted = model.predict("Squat", history)["weight"]
+        self.assertTrue(model.provide_feedback("Squat", predicted, predicted * 1.2, True)["weights_updated"])
+
+        updated = model.calibration["Squat"]["prediction_weights"]
+        self.assertTrue(all(updated[name] > squat[name] for name in squat))
+        self.assertEqual(model.calibration["Bench Press"]["prediction_weights"], bench)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from src.cli.daemon import CLIDaemon, _environment, _forwardable, daemon_status, forward, request, stop_daemon
+
+
+class TestCLIDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, "trainova.sock")
+
+    def tearDown(self):
+        stop_daemon(self.socket_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def _start(self):
+        thread = threading.Thread(target=CLIDaemon(self.socket_path).serve_forever, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 30
+        while daemon_status(self.socket_path) is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return thread
+
+    def test_only_non_interactive_commands_are_forwarded(self):
+        self.assertTrue(_forwardable(["--storage", "sqlite", "predict", "--exercise", "Squat"]))
+        self.assertTrue(_forwardable(["predict-all", "--output", "out.csv"]))
+        self.assertFalse(_forwardable(["predict"]))
+        self.assertFalse(_forwardable(["interactive", "--exercise", "Squat"]))
+        self.assertFalse(_forwardable(["export", "--help"]))
+
+    def test_falls_back_without_daemon(self):
+        self.assertIsNone(forward(["predict-all"], socket_path=self.socket_path))
+
+    def test_runs_commands_and_stops(self):
+        thread = self._start()
+        self.assertEqual(daemon_status(self.socket_path)["requests"], 0)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = forward(["predict", "--exercise", "Squat", "--user", "nobody"], socket_path=self.socket_path)
+        self.assertEqual(status, 0)
+        self.assertIn("=== Making a Prediction ===", output.getvalue())
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(forward(["predict-all", "--format", "xml"], socket_path=self.socket_path), 2)
+        self.assertEqual(daemon_status(self.socket_path)["requests"], 2)
+
+        self.assertTrue(stop_daemon(self.socket_path))
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_refuses_other_environment(self):
+        self._start()
+        env = dict(_environment(), TRAINOVA_MODEL_DIR=os.path.join(self.tmp_dir, "other-models"))
+        response = request({"argv": ["predict-all"], "cwd": os.getcwd(), "env": env}, self.socket_path)
+        self.assertTrue(response["refused"])
+        self.assertEqual(daemon_status(self.socket_path)["requests"], 0)
+
+    def test_fresh_predictor_per_request(self):
+        daemon = CLIDaemon(self.socket_path)
+        handler = daemon._handler(None)
+        predictor = handler.predictor
+        predictor.model._workout_counter = 5
+        self.assertIs(daemon._handler(None), handler)
+        self.assertIsNot(handler.predictor, predictor)
+        self.assertFalse(hasattr(handler.predictor.model, "_workout_counter"))
+
+
+if __name__ == '__main__':
+    unittest.main()
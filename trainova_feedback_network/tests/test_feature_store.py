@@ -0,0 +1,83 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.cli.data_collection import DataCollector
+from src.features.feature_store import FeatureStore, compute_features, feature_columns
+from src.storage.synthetic import generate_workouts
+
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        chunks = generate_workouts(600, exercises=["Squat", "Bench Press"], users=3, seed=11)
+        self.workouts = pd.concat(chunks, ignore_index=True).astype({"user": str, "exercise": str})
+        self.workouts["date"] = pd.to_datetime(self.workouts["date"].astype(str))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_features_match_per_history_computation(self):
+        features = compute_features(self.workouts)
+        self.assertEqual(len(features), len(self.workouts))
+        self.assertEqual(list(features.columns), ["user", "exercise", "date"] + feature_columns())
+
+        history = self.workouts[(self.workouts["user"] == "user_00002") & (self.workouts["exercise"] == "Squat")]
+        history = history.sort_values("date", kind="stable")
+        rows = features[(features["user"] == "user_00002") & (features["exercise"] == "Squat")]
+        weights, reps = history["weight"].to_numpy(), history["reps"].to_numpy()
+        for i in (0, 1, 4, 20, len(weights) - 1):
+            row = rows.iloc[i]
+            window = weights[max(0, i - 9):i + 1]
+            self.assertEqual(row["session"], i + 1)
+            self.assertAlmostEqual(row["avg_weight_10"], window.mean())
+            self.assertAlmostEqual(row["avg_volume_5"], (weights * reps)[max(0, i - 4):i + 1].mean())
+            expected_slope = np.polyfit(np.arange(len(window)), window, 1)[0] if len(window) > 1 else 0.0
+            self.assertAlmostEqual(row["weight_slope_10"], expected_slope, places=6)
+            self.assertAlmostEqual(row["best_one_rep_max"], rows["one_rep_max"].iloc[:i + 1].max())
+
+    def test_lookup_save_and_load(self):
+        store = FeatureStore.build(self.workouts)
+        history = self.workouts[(self.workouts["user"] == "user_00001") & (self.workouts["exercise"] == "Squat")]
+        history = history.sort_values("date", kind="stable")
+
+        latest = store.lookup("Squat", user="user_00001")
+        self.assertEqual(latest["session"], len(history))
+        # The last workout on or before the date (several may share it)
+        as_of = store.lookup("Squat", user="user_00001", date=history["date"].iloc[9])
+        last = history["date"].searchsorted(history["date"].iloc[9], side="right") - 1
+        self.assertEqual(as_of["session"], last + 1)
+        self.assertIsNone(store.lookup("Squat", user="user_00001", date="1990-01-01"))
+        self.assertIsNone(store.lookup("Deadlift"))
+
+        directory = os.path.join(self.tmp_dir, "features")
+        store.save(directory, signature="abc")
+        self.assertIsNone(FeatureStore.load(directory, signature="other"))
+        loaded = FeatureStore.load(directory, signature="abc")
+        self.assertEqual(loaded.lookup("Squat", user="user_00001"), latest)
+        pd.testing.assert_frame_equal(loaded.frame(), store.frame())
+
+    def test_data_collector_caches_features(self):
+        collector = DataCollector(self.tmp_dir)
+        self.workouts.to_csv(collector.training_data_path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(collector.load_features(build=False))
+            store = collector.load_features()
+            self.assertEqual(len(store), len(self.workouts))
+            self.assertIsNotNone(collector.load_features(build=False))
+
+            # Appending workouts invalidates the cached store
+            self.workouts.head(1).to_csv(collector.training_data_path, mode="a", header=False, index=False)
+            self.assertIsNone(collector.load_features(build=False))
+            self.assertEqual(len(collector.load_features()), len(self.workouts) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.models.feedback_prediction_model import FeedbackBasedPredictionModel
+from src.models.model_state import load_state, save_state
+from src.prediction.predictor import WorkoutPredictor
+
+
+class TestModelState(unittest.TestCase):
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.model_dir, "model_state.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.model_dir)
+
+    def test_round_trip(self):
+        model = FeedbackBasedPredictionModel()
+        model.provide_feedback("Squat", 100.0, 102.5, True, reps=5, rir=2)
+        model.provide_feedback("Bench Press", 60.0, 57.5, False)
+        model.calibration = {"Squat": {"rows": 40, "progression_rate": 1.25, "rep_mean": 6.5, "rep_std": 1.5,
+                                       "volume_scale": 650.0, "consistency": 0.1,
+                                       "prediction_weights": dict(model.prediction_weights)}}
+        model.feedback_buffer.remember("Squat", 110.0, [100.0, 101.0, 5.0, 100.0], 1.1, user="user_00001")
+        model.feedback_buffer.remember("Squat", 110.0, [90.0, 91.0, 4.0, 90.0], 1.2, user="user_00002")
+        model.feedback_buffer.append("Squat", 110.0, 112.5, user="user_00002")
+        save_state(model, self.path)
+
+        restored = FeedbackBasedPredictionModel()
+        self.assertTrue(load_state(restored, self.path))
+        self.assertEqual(restored.prediction_weights, model.prediction_weights)
+        self.assertEqual(restored.feedback_influence, model.feedback_influence)
+        self.assertEqual(restored.feedback_history, model.feedback_history)
+        self.assertEqual(restored.calibration, model.calibration)
+        self.assertEqual(restored.feedback_buffer.state(), model.feedback_buffer.state())
+        self.assertEqual(os.listdir(self.model_dir), ["model_state.bin"])
+
+    def test_missing_and_corrupt_files(self):
+        model = FeedbackBasedPredictionModel()
+        self.assertFalse(load_state(model, self.path))
+
+        save_state(model, self.path)
+        with open(self.path, "r+b") as file:
+            file.seek(10)
+            file.write(b"\xff")
+        with self.assertRaises(ValueError):
+            load_state(model, self.path)
+
+    def test_buffered_feedback_carries_over(self):
+        history = [{"exercise": "Squat", "weight": w, "reps": 6} for w in (100.0, 102.5, 105.0)]
+        predictor = WorkoutPredictor(model_dir=self.model_dir)
+        predicted = predictor.predict_workout("Squat", history, user="user_00001")["weight"]
+        result = predictor.record_feedback("Squat", predicted, predicted + 2.5, True, user="user_00001")
+        self.assertTrue(result["sample_buffered"])
+        self.assertFalse(result["weights_updated"])
+
+        # The sample waits for a full batch instead of being applied on save
+        reloaded = WorkoutPredictor(model_dir=self.model_dir)
+        self.assertEqual(reloaded.model.prediction_weights, predictor.model.prediction_weights)
+        self.assertEqual(len(reloaded.model.feedback_buffer), 1)
+
+    def test_predictor_persists_feedback_and_reset(self):
+        predictor = WorkoutPredictor(model_dir=self.model_dir)
+        predictor.record_feedback("Squat", 100.0, 105.0, True, reps=5)
+        weights = dict(predictor.model.prediction_weights)
+
+        reloaded = WorkoutPredictor(model_dir=self.model_dir)
+        self.assertEqual(reloaded.model.prediction_weights, weights)
+        self.assertEqual(len(reloaded.model.feedback_history), 1)
+
+        reloaded.reset_model("feedback")
+        self.assertEqual(WorkoutPredictor(model_dir=self.model_dir).model.feedback_history, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import numpy as np
+
+from src.models.feedback_prediction_model import FeedbackBasedPredictionModel
+from src.models.online_learning import FeedbackBuffer, gradient_step, grouped_gradient_step
+
+
+class TestOnlineLearning(unittest.TestCase):
+
+    def setUp(self):
+        self.history = [{"exercise": "Squat", "weight": w, "reps": 6} for w in (100.0, 102.5, 105.0, 107.5)]
+
+    def test_buffer_matches_feedback_to_predictions(self):
+        buffer = FeedbackBuffer(batch_size=2)
+        self.assertFalse(buffer.append("Squat", 110.0, 112.5))
+
+        buffer.remember("Squat", 110.0, [100.0, 101.0, 5.0, 100.0], 1.1)
+        self.assertTrue(buffer.append("Squat", 110.0, 112.5))
+        self.assertFalse(buffer.append("Squat", 110.0, 0))
+        self.assertFalse(buffer.ready)
+        self.assertTrue(buffer.append("Squat", 110.0, 107.5))
+        self.assertTrue(buffer.ready)
+
+        batch = buffer.pop_batch()
+        self.assertEqual(batch["terms"].shape, (2, 4))
+        self.assertEqual(list(batch["actual"]), [112.5, 107.5])
+        self.assertEqual(len(buffer), 0)
+        self.assertIsNone(buffer.pop_batch())
+
+    def test_predictions_are_kept_per_user(self):
+        buffer = FeedbackBuffer()
+        buffer.remember("Squat", 110.0, [100.0, 101.0, 5.0, 100.0], 1.1, user="user_00001")
+        self.assertFalse(buffer.append("Squat", 110.0, 112.5))
+        self.assertFalse(buffer.append("Squat", 110.0, 112.5, user="user_00002"))
+        # Float-noisy echoes of the predicted weight still match
+        self.assertTrue(buffer.append("Squat", 110.000000001, 112.5, user="user_00001"))
+
+    def test_gradient_steps_converge(self):
+        rng = np.random.default_rng(0)
+        terms = rng.uniform(50, 150, (64, 4))
+        multiplier = rng.uniform(1.0, 1.2, 64)
+        target = np.array([0.6, 0.2, 0.1, 0.1])
+        actual = terms @ target * multiplier
+
+        weights = np.array([0.25, 0.25, 0.25, 0.25])
+        start_error = np.abs(terms @ weights * multiplier - actual).mean()
+        for _ in range(500):
+            weights = gradient_step(weights, terms, multiplier, actual, 0.5)
+        self.assertLess(np.abs(terms @ weights * multiplier - actual).mean(), start_error / 10)
+
+        # Several weight vectors (e.g. sweep trials) step at once
+        stacked = gradient_step(np.tile([0.25, 0.25, 0.25, 0.25], (3, 1)), terms, multiplier, actual,
+                                np.array([[0.0], [0.5], [1.0]]))
+        self.assertEqual(stacked.shape, (3, 4))
+        self.assertEqual(list(stacked[0]), [0.25, 0.25, 0.25, 0.25])
+
+    def test_grouped_step_only_moves_groups_with_samples(self):
+        weights = np.full((3, 4), 0.25)
+        terms = np.full((2, 4), 100.0)
+        updated = grouped_gradient_step(weights, np.array([0, 0]), terms, np.ones(2), np.array([150.0, 150.0]), 1.0)
+        self.assertTrue((updated[0] > 0.25).all())
+        self.assertEqual(updated[1:].tolist(), weights[1:].tolist())
+        self.assertAlmostEqual(updated[0].sum() * 100, 150.0)
+
+    def test_feedback_updates_weights_once_per_batch(self):
+        model = FeedbackBasedPredictionModel()
+        model.feedback_buffer.batch_size = 3
+        initial = dict(model.prediction_weights)
+
+        results = []
+        for _ in range(3):
+            predicted = model.predict("Squat", [dict(h) for h in self.history])["weight"]
+            results.append(model.provide_feedback("Squat", predicted, predicted - 10, True))
+        self.assertEqual([result["weights_updated"] for result in results], [False, False, True])
+        self.assertEqual(len(model.feedback_history), 3)
+        # Lifting less than predicted lowers all weights
+        self.assertTrue(all(model.prediction_weights[name] < initial[name] for name in initial))
+        self.assertFalse(model.update_prediction_weights())
+
+    def test_unknown_prediction_is_reported(self):
+        model = FeedbackBasedPredictionModel()
+        result = model.provide_feedback("Squat", 123.4, 120.0, True)
+        self.assertTrue(result["feedback_recorded"])
+        self.assertFalse(result["sample_buffered"])
+        self.assertFalse(result["weights_updated"])
+        self.assertEqual(len(model.feedback_buffer), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
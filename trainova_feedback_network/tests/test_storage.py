@@ -0,0 +1,468 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+import numpy as np
+
+from src.cli.data_collection import DataCollector
+from src.storage.dataset_cache import DatasetCache
+from src.storage.importer import HashIndex
+from src.storage.partitioned_store import PartitionedWorkoutStore
+from src.storage.sqlite_store import SQLiteWorkoutStore
+from src.storage.synthetic import generate_shards, generate_workouts, shard_paths
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class TestSQLiteWorkoutStore(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.store = SQLiteWorkoutStore(os.path.join(self.data_dir, "workouts.db"))
+        self.store.append([
+            {"exercise": "Squat", "weight": 100, "reps": 5, "date": "2024-01-03"},
+            {"exercise": "Bench Press", "weight": 60, "reps": 8, "date": "2024-01-02"},
+            {"exercise": "Squat", "weight": 97.5, "reps": 5, "date": "2024-01-01", "user": "alice"},
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_load_sorted_by_date(self):
+        df = self.store.load()
+        self.assertEqual(list(df["weight"]), [97.5, 60, 100])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["date"]))
+
+    def test_filters_pushed_into_query(self):
+        squats = self.store.load(exercise="Squat", columns=["weight", "date"])
+        self.assertEqual(list(squats.columns), ["weight", "date"])
+        self.assertEqual(list(squats["weight"]), [97.5, 100])
+
+        self.assertEqual(len(self.store.load(since="2024-01-02")), 2)
+        self.assertEqual(len(self.store.load(until="2024-01-02")), 2)
+        self.assertEqual(len(self.store.load(user="alice")), 1)
+
+    def test_datasets_are_separate(self):
+        self.store.append([{"exercise": "Deadlift", "weight": 140, "reps": 3, "date": "2024-01-04"}],
+                          dataset="pretraining")
+        self.assertEqual(self.store.count(["training"]), 3)
+        self.assertEqual(self.store.count(["pretraining"]), 1)
+        self.store.replace([], dataset="training")
+        self.assertEqual(self.store.count(), 1)
+
+
+class TestPartitionedWorkoutStore(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def _workouts(self, user, count, start_day=0):
+        return [{"user": user, "exercise": "Squat" if i % 2 else "Bench Press", "weight": 50 + i,
+                 "reps": 5, "date": (pd.Timestamp("2024-01-01") + pd.Timedelta(days=start_day + i)).strftime("%Y-%m-%d")}
+                for i in range(count)]
+
+    def test_concurrent_writers_and_compaction(self):
+        writers = [PartitionedWorkoutStore(self.data_dir, max_segment_bytes=512) for _ in range(4)]
+        threads = [threading.Thread(target=lambda w=writer, n=n: [w.append(self._workouts(f"user{n % 2}", 10, 10 * k))
+                                                                  for k in range(5)])
+                   for n, writer in enumerate(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reader = PartitionedWorkoutStore(self.data_dir)
+        before = reader.load()
+        self.assertEqual(len(before), 200)
+
+        for writer in writers:
+            writer.seal()
+        stats = reader.compact()
+        self.assertEqual(stats["partitions"], 2)
+
+        after = reader.load()
+        self.assertEqual(len(after), 200)
+        self.assertTrue(after["date"].is_monotonic_increasing)
+        self.assertEqual(reader.count(), 200)
+        for name in os.listdir(os.path.join(self.data_dir, "dataset=training", "user=user0")):
+            self.assertFalse(name.startswith("seg-"))
+
+    def test_filters_use_partitions_and_index(self):
+        store = PartitionedWorkoutStore(self.data_dir)
+        store.append(self._workouts("alice", 30))
+        store.append(self._workouts("bob", 30))
+        store.compact()
+        store.append(self._workouts("alice", 2, start_day=100))
+
+        df = store.load(user="alice", exercise="Squat", since="2024-01-10", until="2024-01-15")
+        self.assertEqual(list(df["date"].dt.day), [10, 12, 14])
+        self.assertEqual(len(store.load(user="alice")), 32)
+        self.assertEqual(store.exercises(user="bob"), ["Bench Press", "Squat"])
+
+
+class TestDataCollectorStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_migrate_csv_to_sqlite(self):
+        csv_collector = DataCollector(self.data_dir, backend="csv")
+        csv_collector.generate_and_save_mock_data(num_samples=20, exercises=["Squat", "Deadlift"])
+        csv_collector.save_workout_data({"exercise": "Squat", "weight": 100, "reps": 5, "date": "2024-01-01"})
+
+        migrated = csv_collector.migrate_storage(target="sqlite")
+        self.assertEqual(migrated, {"training": 1, "pretraining": 20})
+
+        sqlite_collector = DataCollector(self.data_dir, backend="sqlite")
+        self.assertEqual(len(sqlite_collector.load_training_data()), 21)
+        self.assertEqual(len(sqlite_collector.load_training_data(include_pretraining=False)), 1)
+
+        # Re-running replaces the target, also for datasets the source no longer has
+        os.remove(csv_collector.pretraining_data_path)
+        self.assertEqual(csv_collector.migrate_storage(target="sqlite"), {"training": 1, "pretraining": 0})
+        self.assertEqual(len(DataCollector(self.data_dir, backend="sqlite").load_training_data()), 1)
+
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_round_trip_and_partition_pruning(self):
+        csv_collector = DataCollector(self.data_dir, backend="csv")
+        pd.DataFrame([
+            {"exercise": "Squat", "weight": 100, "reps": 5, "sets": 3, "date": "2024-01-15"},
+            {"exercise": "Squat", "weight": 102.5, "reps": 5, "sets": 3, "date": "2024-02-01"},
+            {"exercise": "Bench Press", "weight": 60, "reps": 8, "sets": 3, "date": "2024-01-20"},
+        ]).to_csv(csv_collector.training_data_path, index=False)
+
+        csv_collector.migrate_storage(target="parquet")
+        partition = os.path.join(csv_collector.parquet_dir, "dataset=training", "exercise=Squat", "month=2024-02")
+        self.assertTrue(os.path.isdir(partition))
+
+        store = DataCollector(self.data_dir, backend="parquet").store
+        squats = store.load(exercise="Squat", since="2024-02-01", columns=["weight"])
+        self.assertEqual(list(squats.columns), ["weight"])
+        self.assertEqual(list(squats["weight"]), [102.5])
+        self.assertEqual(sorted(store.exercises()), ["Bench Press", "Squat"])
+        chunks = list(store.iter_chunks(chunksize=1))
+        self.assertEqual([len(chunk) for chunk in chunks], [1, 1, 1])
+
+        os.remove(csv_collector.training_data_path)
+        DataCollector(self.data_dir, backend="parquet").migrate_storage(target="csv", source="parquet")
+        restored = pd.read_csv(csv_collector.training_data_path)
+        self.assertEqual(list(restored["weight"]), [100, 60, 102.5])
+
+
+class TestBufferedAppender(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.collector = DataCollector(self.data_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_flushes_on_size_and_close(self):
+        appender = self.collector.bulk_appender(max_rows=3, max_delay=0)
+        for weight in (100, 102.5, 105, 107.5):
+            appender.append({"exercise": "Squat", "weight": weight, "reps": 5, "date": "2024-01-01"})
+        self.assertEqual(appender.rows_written, 3)
+        appender.close()
+        self.assertEqual(appender.rows_written, 4)
+
+        df = pd.read_csv(self.collector.training_data_path)
+        self.assertEqual(list(df.columns), ["user", "exercise", "weight", "reps", "sets", "date",
+                                            "rir", "rpe", "success"])
+        self.assertEqual(list(df["weight"]), [100, 102.5, 105, 107.5])
+
+    def test_keeps_existing_header(self):
+        with open(self.collector.training_data_path, "w") as file:
+            file.write("exercise,weight,reps,date\n")
+
+        # Keys in a different order, plus keys that are not in the header
+        self.collector.save_workout_data({"date": "2024-01-02", "reps": 5, "rir": 2,
+                                          "weight": 100, "exercise": "Squat"})
+
+        with open(self.collector.training_data_path) as file:
+            self.assertEqual(file.read().splitlines(), ["exercise,weight,reps,date", "Squat,100,5,2024-01-02"])
+
+    def test_flushes_after_delay(self):
+        appender = self.collector.bulk_appender(max_rows=100, max_delay=0.05)
+        appender.append({"exercise": "Squat", "weight": 100, "reps": 5, "date": "2024-01-01"})
+        time.sleep(0.3)
+        self.assertEqual(appender.rows_written, 1)
+        appender.close()
+
+
+class TestStreamingImport(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.data_dir, "export.csv")
+        pd.DataFrame([
+            {"exercise": "Squat", "weight": 100, "reps": 5, "sets": 3, "date": "2024-01-01"},
+            {"exercise": "Squat", "weight": 100, "reps": 5, "sets": 3, "date": "2024-01-01"},
+            {"exercise": "Squat", "weight": "heavy", "reps": 5, "sets": 3, "date": "2024-01-02"},
+            {"exercise": "Bench Press", "weight": 60, "reps": 8, "sets": 3, "date": "2024-01-03"},
+        ]).to_csv(self.source, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_appends_and_drops_duplicates(self):
+        collector = DataCollector(self.data_dir)
+        collector.save_workout_data({"exercise": "Deadlift", "weight": 140, "reps": 3, "sets": 1,
+                                     "date": "2023-12-30"})
+
+        stats = collector.import_from_csv_streaming(self.source, chunksize=2)
+        self.assertEqual(stats, {"read": 4, "imported": 2, "duplicates": 1, "invalid": 1})
+
+        stats = collector.import_from_csv_streaming(self.source, chunksize=2)
+        self.assertEqual(stats["imported"], 0)
+        self.assertEqual(stats["duplicates"], 3)
+
+        df = collector.load_training_data(include_pretraining=False)
+        self.assertEqual(list(df["exercise"]), ["Deadlift", "Squat", "Bench Press"])
+
+    def test_failed_replace_keeps_dataset(self):
+        collector = DataCollector(self.data_dir)
+        collector.save_workout_data({"exercise": "Deadlift", "weight": 140, "reps": 3, "sets": 1,
+                                     "date": "2023-12-30"})
+        bad_source = os.path.join(self.data_dir, "bad.csv")
+        pd.DataFrame([{"exercise": "Squat", "weight": 100}]).to_csv(bad_source, index=False)
+
+        self.assertIsNone(collector.import_from_csv_streaming(os.path.join(self.data_dir, "missing.csv"), replace=True))
+        self.assertIsNone(collector.import_from_csv_streaming(bad_source, replace=True))
+        df = collector.load_training_data(include_pretraining=False)
+        self.assertEqual(list(df["exercise"]), ["Deadlift"])
+
+        df = collector.import_from_csv(self.source)
+        self.assertEqual(list(df["exercise"]), ["Squat", "Squat", "Bench Press"])
+        self.assertFalse(os.path.exists(collector.training_data_path + ".importing"))
+
+    def test_hash_index_membership(self):
+        index = HashIndex()
+        for start in range(0, 1000, 100):
+            index.add(np.arange(start, start + 100, dtype=np.uint64))
+        self.assertEqual(len(index), 1000)
+        found = index.contains(np.array([0, 999, 1000, 5000], dtype=np.uint64))
+        self.assertEqual(list(found), [True, True, False, False])
+
+
+
+class TestDatasetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.data_dir, "training_data.csv")
+        pd.DataFrame([
+            {"exercise": "Squat", "weight": 100, "reps": 5, "sets": 3, "date": "2024-01-03"},
+            {"exercise": "Bench Press", "weight": 60, "reps": 8, "sets": 3, "date": "2024-01-02"},
+            {"exercise": "Squat", "weight": 97.5, "reps": 5, "sets": 3, "date": "2024-01-01"},
+        ]).to_csv(self.csv_path, index=False)
+        self.cache = DatasetCache(os.path.join(self.data_dir, ".cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_matches_csv_and_filters_by_exercise(self):
+        df = self.cache.load(self.csv_path)
+        self.assertEqual(list(df["weight"]), [97.5, 60.0, 100.0])
+        self.assertEqual(list(df["date"]), list(pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"])))
+
+        squats = self.cache.load(self.csv_path, exercise="Squat", since="2024-01-02")
+        self.assertEqual(list(squats["weight"]), [100.0])
+        self.assertEqual(self.cache.exercises(self.csv_path), ["Squat", "Bench Press"])
+
+    def test_appended_rows_are_merged(self):
+        self.cache.load(self.csv_path)
+        with open(self.csv_path, "a") as file:
+            file.write("Squat,102.5,5,3,2023-12-31\n")
+
+        df = self.cache.load(self.csv_path, exercise="Squat")
+        self.assertEqual(list(df["weight"]), [102.5, 97.5, 100.0])
+        meta = self.cache._read_meta(self.csv_path)
+        self.assertEqual(meta["rows"], 4)
+        self.assertEqual(meta["parsed_bytes"], os.path.getsize(self.csv_path))
+
+    def test_last_line_without_newline(self):
+        with open(self.csv_path, "rb+") as file:
+            file.seek(-1, os.SEEK_END)
+            file.truncate()
+        df = self.cache.load(self.csv_path)
+        self.assertEqual(len(df), 3)
+        self.assertEqual(self.cache._read_meta(self.csv_path)["parsed_bytes"], os.path.getsize(self.csv_path))
+
+        with open(self.csv_path, "a") as file:
+            file.write("\nDeadlift,140,3,1,2024-01-04\n")
+        self.assertEqual(list(self.cache.load(self.csv_path)["exercise"]),
+                         ["Squat", "Bench Press", "Squat", "Deadlift"])
+
+    def test_rewritten_file_is_rebuilt(self):
+        self.cache.load(self.csv_path)
+        pd.DataFrame([
+            {"exercise": "Deadlift", "weight": 140, "reps": 3, "sets": 1, "date": "2024-02-01"},
+        ]).to_csv(self.csv_path, index=False)
+        stat = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+        df = self.cache.load(self.csv_path)
+        self.assertEqual(list(df["exercise"]), ["Deadlift"])
+
+
+
+class TestStreamingExport(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.collector = DataCollector(data_dir=self.data_dir)
+        pd.DataFrame([
+            {"exercise": "Squat", "weight": 100, "reps": 5, "sets": 3, "date": "2024-01-03"},
+            {"exercise": "Bench Press", "weight": 60, "reps": 8, "sets": 3, "date": "2024-01-02"},
+            {"exercise": "Squat", "weight": 97.5, "reps": 5, "sets": 3, "date": "2024-01-01"},
+        ]).to_csv(self.collector.training_data_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_filtered_compressed_exports(self):
+        csv_path = os.path.join(self.data_dir, "squats.csv.gz")
+        self.assertTrue(self.collector.export_data(csv_path, exercise="Squat", since="2024-01-02", chunksize=1))
+        df = pd.read_csv(csv_path)
+        self.assertEqual(df.to_dict("records"), [
+            {"exercise": "Squat", "weight": 100.0, "reps": 5, "sets": 3, "date": "2024-01-03"}
+        ])
+
+        ndjson_path = os.path.join(self.data_dir, "all.ndjson.gz")
+        self.assertTrue(self.collector.export_data(ndjson_path, chunksize=2))
+        df = pd.read_json(ndjson_path, lines=True)
+        self.assertEqual(list(df["weight"]), [97.5, 60.0, 100.0])
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd_export(self):
+        csv_path = os.path.join(self.data_dir, "export.csv")
+        self.assertTrue(self.collector.export_data(csv_path, compression="zstd"))
+        df = pd.read_csv(csv_path, compression="zstd")
+        self.assertEqual(len(df), 3)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_export(self):
+        parquet_path = os.path.join(self.data_dir, "export.parquet")
+        self.assertTrue(self.collector.export_data(parquet_path, until="2024-01-02", chunksize=1))
+        df = pd.read_parquet(parquet_path)
+        self.assertEqual(list(df["exercise"]), ["Squat", "Bench Press"])
+
+    def test_datasets_with_different_columns(self):
+        pd.DataFrame([
+            {"exercise": "Deadlift", "weight": 140, "reps": 3, "sets": 1, "date": "2024-01-04", "rir": 2.0},
+        ]).to_csv(self.collector.pretraining_data_path, index=False)
+        pd.DataFrame([
+            {"user": "user_00001", "exercise": "Squat", "weight": 100, "reps": 5, "sets": 3,
+             "date": "2024-01-03", "success": True},
+        ]).to_csv(self.collector.training_data_path, index=False)
+
+        csv_path = os.path.join(self.data_dir, "export.csv")
+        self.assertTrue(self.collector.export_data(csv_path))
+        df = pd.read_csv(csv_path)
+        self.assertEqual(list(df.columns), ["user", "exercise", "weight", "reps", "sets", "date", "success", "rir"])
+        self.assertEqual(list(df["exercise"]), ["Squat", "Deadlift"])
+        self.assertEqual(df["user"].isna().tolist(), [False, True])
+        self.assertEqual(df["rir"].tolist()[1], 2.0)
+
+        if pyarrow is not None:
+            parquet_path = os.path.join(self.data_dir, "export.parquet")
+            self.assertTrue(self.collector.export_data(parquet_path))
+            self.assertEqual(list(pd.read_parquet(parquet_path)["exercise"]), ["Squat", "Deadlift"])
+
+    def test_empty_export_writes_nothing(self):
+        csv_path = os.path.join(self.data_dir, "none.csv")
+        self.assertFalse(self.collector.export_data(csv_path, exercise="Deadlift"))
+        self.assertFalse(os.path.exists(csv_path))
+
+
+class TestFilteredReads(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        pd.DataFrame([
+            {"user": "ana", "exercise": "Squat", "weight": 100, "reps": 5, "sets": 3, "date": "2024-01-03"},
+            {"user": "ben", "exercise": "Bench Press", "weight": 60, "reps": 8, "sets": 3, "date": "2024-01-02"},
+            {"user": "ana", "exercise": "Squat", "weight": 97.5, "reps": 5, "sets": 3, "date": "2024-01-01"},
+        ]).to_csv(DataCollector(data_dir=self.data_dir).training_data_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_filters_with_and_without_cache(self):
+        for use_cache in (True, False):
+            collector = DataCollector(data_dir=self.data_dir, use_cache=use_cache)
+            df = collector.load_training_data(exercise="Squat", until="2024-01-02", columns=["weight", "date"])
+            self.assertEqual(list(df.columns), ["weight", "date"])
+            self.assertEqual(list(df["weight"]), [97.5])
+
+            self.assertEqual(sorted(collector.list_exercises()), ["Bench Press", "Squat"])
+            self.assertEqual(collector.list_exercises(user="ben"), ["Bench Press"])
+            self.assertTrue(collector.load_training_data(user="carl").empty)
+
+
+class TestSyntheticWorkouts(unittest.TestCase):
+
+    def test_seeded_chunks_are_reproducible(self):
+        kwargs = dict(users=10, seed=42, chunksize=1000, end_date=datetime(2024, 6, 30).date())
+        chunks = list(generate_workouts(5000, **kwargs))
+        again = pd.concat(generate_workouts(5000, **kwargs), ignore_index=True)
+
+        self.assertEqual([len(chunk) for chunk in chunks], [1000] * 5)
+        df = pd.concat(chunks, ignore_index=True)
+        pd.testing.assert_frame_equal(df, again)
+        self.assertEqual(df["user"].nunique(), 10)
+        self.assertTrue((df.groupby(["user", "exercise"], observed=True).size() == 100).all())
+
+    def test_progression_rules(self):
+        df = pd.concat(generate_workouts(20000, exercises=["Squat"], seed=1), ignore_index=True)
+        weights = df["weight"].to_numpy()
+
+        self.assertTrue(df["date"].astype(str).is_monotonic_increasing)
+        self.assertTrue((weights >= 20).all())
+        self.assertTrue(np.allclose(weights % 2.5, 0))
+        self.assertTrue(np.isin(np.diff(weights), [-2.5, 0, 2.5]).all())
+        self.assertTrue(df["reps"].between(3, 12).all())
+
+    def test_shards_do_not_depend_on_workers(self):
+        data_dir = tempfile.mkdtemp()
+        try:
+            kwargs = dict(users=6, seed=7, shards=3, end_date=datetime(2024, 6, 30).date())
+            serial = generate_shards(os.path.join(data_dir, "serial"), 3000, workers=1, **kwargs)
+            generate_shards(os.path.join(data_dir, "parallel"), 3000, workers=2, **kwargs)
+
+            self.assertEqual([shard["rows"] for shard in serial["shards"]], [1000] * 3)
+            serial_paths = shard_paths(os.path.join(data_dir, "serial", "manifest.json"))
+            parallel_paths = shard_paths(os.path.join(data_dir, "parallel", "manifest.json"))
+            for serial_path, parallel_path in zip(serial_paths, parallel_paths):
+                pd.testing.assert_frame_equal(pd.read_csv(serial_path), pd.read_csv(parallel_path))
+
+            users = pd.concat([pd.read_csv(path) for path in serial_paths])["user"]
+            self.assertEqual(users.nunique(), 6)
+        finally:
+            shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
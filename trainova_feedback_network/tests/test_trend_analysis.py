@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+from src.features.trend_analysis import (
+    analyze_trend,
+    calculate_weight_trend,
+    latest_trends,
+    rolling_trends,
+    weekly_trends,
+)
+
+
+class TestTrendAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.groups = np.repeat([0, 1, 2], [40, 1, 25])
+        self.values = 100 + rng.normal(0.5, 3.0, len(self.groups)).cumsum()
+
+    def test_rolling_trends_match_polyfit_per_history(self):
+        trends = rolling_trends(self.values, self.groups, windows=(3, 10, 30))
+        for i in (0, 1, 2, 20, 39, 40, 41, 42, 65):
+            start = np.flatnonzero(self.groups == self.groups[i])[0]
+            for window in (3, 10, 30):
+                begin = max(start, i - window + 1)
+                if i == begin:
+                    self.assertEqual(trends[f"slope_{window}"][i], 0.0)
+                    self.assertAlmostEqual(trends[f"fit_{window}"][i], self.values[i])
+                    continue
+                x = np.arange(begin, i + 1)
+                slope, intercept = np.polyfit(x, self.values[begin:i + 1], 1)
+                self.assertAlmostEqual(trends[f"slope_{window}"][i], slope)
+                self.assertAlmostEqual(trends[f"fit_{window}"][i], slope * i + intercept)
+                self.assertEqual(trends[f"direction_{window}"][i], np.sign(slope))
+
+    def test_weekly_trends_use_calendar_windows(self):
+        values = np.array([100.0, 105.0, 110.0, 200.0, 50.0, 60.0])
+        dates = np.array(["2024-01-01", "2024-01-08", "2024-03-04", "2024-03-11",
+                          "2024-01-01", "NaT"], dtype="datetime64[ns]")
+        groups = np.array([0, 0, 0, 0, 1, 1])
+        trends = weekly_trends(values, dates, groups, weeks=(4,))
+        # One point per week at the start, then a gap longer than the window
+        self.assertAlmostEqual(trends["slope_4w"][1], 5.0)
+        self.assertEqual(trends["slope_4w"][2], 0.0)
+        self.assertAlmostEqual(trends["slope_4w"][3], 90.0)
+        self.assertEqual(trends["slope_4w"][4], 0.0)
+        self.assertTrue(np.isnan(trends["slope_4w"][5]))
+
+    def test_latest_trends(self):
+        last, trends = latest_trends(self.values, self.groups, windows=(5,))
+        np.testing.assert_array_equal(last, [39, 40, 65])
+        full = rolling_trends(self.values, self.groups, windows=(5,))
+        np.testing.assert_array_equal(trends["slope_5"], full["slope_5"][last])
+
+    def test_legacy_functions(self):
+        workouts = [{"weight": w} for w in (100, 102, 101, 105)]
+        result = analyze_trend(workouts)
+        self.assertEqual(result["trend"], "increasing")
+        self.assertAlmostEqual(result["average_weight"], 102.0)
+        self.assertAlmostEqual(result["slopes"][3], 1.5)
+        self.assertAlmostEqual(calculate_weight_trend(workouts), 5 / 3)
+        self.assertEqual(analyze_trend([])["trend"], "no_data")
+        self.assertEqual(analyze_trend([{"weight": 80}])["trend"], "insufficient_data")
+        self.assertEqual(calculate_weight_trend([{"weight": 80}]), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,17 @@
 import unittest
-from src.utils.weight_calculation import calculate_weight_for_reps
-from src.utils.rep_utils import generate_suggested_reps
+import numpy as np
+from src.utils.weight_calculation import (
+    ONE_REP_MAX_FORMULAS,
+    calculate_one_rep_max,
+    calculate_weight_for_reps,
+    round_to_increment,
+)
+from src.utils.rep_utils import (
+    generate_intensity_based_reps,
+    generate_intensity_based_reps_batch,
+    generate_single_set_reps,
+    generate_suggested_reps,
+)
 from src.utils.feedback_utils import generate_feedback_message, update_prediction_weights
 
 class TestUtils(unittest.TestCase):
@@ -12,12 +23,70 @@ class TestUtils(unittest.TestCase):
         calculated_weight = calculate_weight_for_reps(one_rep_max, target_reps, formula='brzycki')
         self.assertAlmostEqual(calculated_weight, expected_weight, places=2)
 
+    def test_one_rep_max_arrays_match_scalars(self):
+        weights = np.array([100.0, 80.0, 0.0, 60.0, 50.0])
+        reps = np.array([5, 10, 3, 0, 40])
+        for formula in ONE_REP_MAX_FORMULAS:
+            estimates = calculate_one_rep_max(weights, reps, formula=formula)
+            expected = [calculate_one_rep_max(float(w), int(r), formula=formula) for w, r in zip(weights, reps)]
+            np.testing.assert_allclose(estimates, expected)
+            # Converting back recovers the lifted weight
+            recovered = calculate_weight_for_reps(estimates[:2], reps[:2], formula=formula)
+            np.testing.assert_allclose(recovered, weights[:2])
+        self.assertAlmostEqual(calculate_one_rep_max(100, 5, formula='Epley'), 100 * (1 + 5 / 30))
+        self.assertAlmostEqual(calculate_one_rep_max(100, 5, formula='unknown'), 112.5)
+
+    def test_one_rep_max_formula_values(self):
+        # 100kg x 10 reps, worked out by hand from each formula
+        expected = {
+            'epley': 100 * (1 + 10 / 30),
+            'brzycki': 100 * 36 / 27,
+            'lombardi': 125.8925,
+            'mayhew': 130.9343,
+            'wathan': 134.7467,
+        }
+        for formula, value in expected.items():
+            self.assertAlmostEqual(calculate_one_rep_max(100, 10, formula=formula), value, places=3)
+
+    def test_brzycki_from_37_reps(self):
+        # The ratio is capped at 1.8 instead of dividing by 37 - r <= 0
+        self.assertAlmostEqual(calculate_one_rep_max(50, 40), 90.0)
+        self.assertAlmostEqual(calculate_weight_for_reps(90, 40), 50.0)
+        self.assertAlmostEqual(calculate_weight_for_reps(90, 37), 50.0)
+        np.testing.assert_allclose(calculate_weight_for_reps(90.0, np.array([36, 37, 45])), [90 / 36, 50.0, 50.0])
+
+    def test_round_to_increment_arrays(self):
+        weights = np.array([101.25, 103.75, 102.0, 98.9])
+        expected = [round_to_increment(float(w)) for w in weights]
+        np.testing.assert_array_equal(round_to_increment(weights), expected)
+
     def test_generate_suggested_reps(self):
         base_reps = 10
         expected_reps = [10, 9, 8]
         suggested_reps = generate_suggested_reps(base_reps)
         self.assertEqual(suggested_reps, expected_reps)
 
+    def test_intensity_based_reps(self):
+        # 100kg x 5 is a Brzycki 1RM of 112.5kg
+        self.assertEqual(generate_intensity_based_reps(100, 5, 112.5), [1, 1, 1])
+        self.assertEqual(generate_intensity_based_reps(100, 5, 90), [8, 7, 7])
+        self.assertEqual(generate_intensity_based_reps(100, 5, 60), [20, 18, 17])
+        self.assertEqual(generate_intensity_based_reps(0, 5, 60), [10, 8, 7])
+
+    def test_rep_batches_match_single_calls(self):
+        rng = np.random.default_rng(5)
+        previous_weight = rng.uniform(20, 200, 500).round(1)
+        previous_reps = rng.integers(0, 15, 500)
+        predicted_weight = previous_weight * rng.uniform(0.7, 1.3, 500)
+        counter = np.arange(500)
+        schemes = generate_intensity_based_reps_batch(previous_weight, previous_reps, predicted_weight)
+        single_set = generate_single_set_reps(previous_weight, previous_reps, predicted_weight, counter)
+        for i in range(500):
+            args = (float(previous_weight[i]), int(previous_reps[i]), float(predicted_weight[i]))
+            self.assertEqual(schemes[i].tolist(), generate_intensity_based_reps(*args))
+            self.assertEqual(single_set[i], generate_single_set_reps(*args, workout_counter=i))
+            self.assertTrue(4 <= single_set[i] <= 8)
+
     def test_generate_feedback_message(self):
         score = 0.1
         expected_message = "The prediction was slightly conservative. Minor adjustments will be made."